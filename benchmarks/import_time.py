@@ -0,0 +1,89 @@
+"""
+Mesure du temps de démarrage d'un worker de l'API.
+
+Lance `python -X importtime` dans un sous-processus qui importe l'application
+puis exécute le préchargement (warmup) du lifespan, et rapporte :
+- le temps total d'import et le temps jusqu'au modèle prêt ;
+- les modules les plus coûteux (temps cumulé) ;
+- la présence des dépendances lourdes (pandas, scikit-learn, imblearn...).
+
+Usage:
+    python benchmarks/import_time.py [--top 15] [--budget-ms 1500]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+HEAVY_MODULES = ("pandas", "sklearn", "imblearn", "scipy", "joblib", "matplotlib")
+
+STARTUP_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+import src.api.main
+t1 = time.perf_counter()
+from src.api.model_loader import warmup
+warmup()
+t2 = time.perf_counter()
+print(json.dumps({"import_s": t1 - t0, "ready_s": t2 - t0}))
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    """Parse la sortie de -X importtime en (module, self_us, cumulative_us, profondeur)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, payload = line.split(":", 1)
+        self_us, cumulative_us, name = payload.split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def run(top: int, budget_ms: float) -> int:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        print(proc.stderr, file=sys.stderr)
+        return proc.returncode
+
+    timings = json.loads(proc.stdout.strip().splitlines()[-1])
+    rows = parse_importtime(proc.stderr)
+    loaded = {name.split(".")[0] for name, *_ in rows}
+
+    print("=" * 60)
+    print("Démarrage de l'API (import + warmup)")
+    print("=" * 60)
+    print(f"Import de src.api.main : {timings['import_s'] * 1000:8.1f} ms")
+    print(f"Modèle prêt après      : {timings['ready_s'] * 1000:8.1f} ms")
+
+    print(f"\nTop {top} des imports (temps cumulé, modules de premier niveau):")
+    top_level = sorted((r for r in rows if r[3] <= 1), key=lambda r: r[2], reverse=True)
+    for name, _, cumulative_us, _ in top_level[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    print("\nDépendances lourdes chargées:")
+    for module in HEAVY_MODULES:
+        print(f"  {module:<12} {'oui' if module in loaded else 'non'}")
+
+    ready_ms = timings["ready_s"] * 1000
+    if budget_ms and ready_ms > budget_ms:
+        print(f"\nBudget dépassé: {ready_ms:.1f} ms > {budget_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15, help="Nombre de modules à afficher")
+    parser.add_argument("--budget-ms", type=float, default=0, help="Budget de démarrage (0 = pas de contrôle)")
+    args = parser.parse_args()
+    sys.exit(run(args.top, args.budget_ms))
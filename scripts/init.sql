@@ -1,9 +1,11 @@
 -- Script d'initialisation de la base de données HR Analytics
 -- Ce script est exécuté automatiquement au premier démarrage du conteneur PostgreSQL
+-- Base existante : appliquer scripts/migrate.sql
 
 -- Table des employés analysés
 CREATE TABLE IF NOT EXISTS employees (
     id SERIAL PRIMARY KEY,
+    id_employee INTEGER UNIQUE,
     age INTEGER NOT NULL CHECK (age >= 18 AND age <= 100),
     genre VARCHAR(1) NOT NULL CHECK (genre IN ('M', 'F')),
     revenu_mensuel FLOAT NOT NULL,
@@ -20,6 +22,29 @@ CREATE TABLE IF NOT EXISTS employees (
     satisfaction_employee_equilibre_pro_perso INTEGER CHECK (satisfaction_employee_equilibre_pro_perso BETWEEN 1 AND 4),
     heure_supplementaires VARCHAR(3) CHECK (heure_supplementaires IN ('Oui', 'Non')),
     distance_domicile_travail INTEGER DEFAULT 0,
+    nombre_heures_travailless FLOAT,
+    note_evaluation_precedente INTEGER,
+    niveau_hierarchique_poste INTEGER,
+    note_evaluation_actuelle INTEGER,
+    augementation_salaire_precedente INTEGER,
+    nombre_participation_pee INTEGER,
+    nb_formations_suivies INTEGER,
+    nombre_employee_sous_responsabilite INTEGER,
+    niveau_education INTEGER,
+    domaine_etude VARCHAR(100),
+    ayant_enfants VARCHAR(1),
+    frequence_deplacement VARCHAR(50),
+    annees_depuis_la_derniere_promotion INTEGER,
+    annes_sous_responsable_actuel INTEGER,
+    -- Vecteur de features encodé (float32) et version de l'encodeur
+    features BYTEA,
+    encoder_version VARCHAR(16),
+    -- Empreinte des champs bruts (détection des changements)
+    content_hash VARCHAR(32),
+    -- Dernière prédiction (dénormalisée pour le classement par risque)
+    risk_probability FLOAT,
+    risk_model_version VARCHAR(20),
+    risk_predicted_at TIMESTAMP WITH TIME ZONE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -31,13 +56,18 @@ CREATE TABLE IF NOT EXISTS predictions (
     probability FLOAT NOT NULL CHECK (probability >= 0 AND probability <= 1),
     label VARCHAR(50) NOT NULL,
     model_version VARCHAR(20) DEFAULT '1.0.0',
+    content_hash VARCHAR(32),
     predicted_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Index pour améliorer les performances des requêtes
-CREATE INDEX idx_predictions_employee_id ON predictions(employee_id);
-CREATE INDEX idx_predictions_predicted_at ON predictions(predicted_at);
-CREATE INDEX idx_employees_departement ON employees(departement);
+-- Historique d'un employé (couvrant : la trajectoire se lit dans l'index seul)
+CREATE INDEX IF NOT EXISTS idx_predictions_employee_predicted_at ON predictions(employee_id, predicted_at) INCLUDE (probability);
+CREATE INDEX IF NOT EXISTS idx_predictions_predicted_at ON predictions(predicted_at);
+CREATE INDEX IF NOT EXISTS idx_employees_departement ON employees(departement);
+-- Top-K des employés à risque (par département ou sur toute l'entreprise)
+CREATE INDEX IF NOT EXISTS idx_employees_departement_risk ON employees(departement, risk_probability DESC);
+CREATE INDEX IF NOT EXISTS idx_employees_risk ON employees(risk_probability DESC);
 
 -- Insertion d'exemples de données
 INSERT INTO employees (age, genre, revenu_mensuel, statut_marital, departement, poste, 
@@ -58,6 +88,11 @@ VALUES
     (2, 1, 0.72, 'Risque de départ'),
     (3, 0, 0.08, 'Stable');
 
+UPDATE employees e
+SET risk_probability = p.probability, risk_model_version = p.model_version, risk_predicted_at = p.predicted_at
+FROM predictions p
+WHERE p.employee_id = e.id;
+
 -- Vue pour faciliter l'analyse des prédictions
 CREATE OR REPLACE VIEW v_employee_predictions AS
 SELECT 
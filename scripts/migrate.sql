@@ -0,0 +1,55 @@
+-- Migration d'une base HR Analytics existante vers le schéma courant
+-- init.sql ne s'exécute qu'à la création du volume PostgreSQL et create_all ne modifie
+-- pas les tables existantes : ce script ajoute les colonnes et index manquants.
+-- Idempotent : il peut être rejoué sans erreur (psql -f scripts/migrate.sql).
+
+-- Données complètes de l'employé et vecteur de features encodé
+ALTER TABLE employees
+    ADD COLUMN IF NOT EXISTS nombre_heures_travailless FLOAT,
+    ADD COLUMN IF NOT EXISTS note_evaluation_precedente INTEGER,
+    ADD COLUMN IF NOT EXISTS niveau_hierarchique_poste INTEGER,
+    ADD COLUMN IF NOT EXISTS note_evaluation_actuelle INTEGER,
+    ADD COLUMN IF NOT EXISTS augementation_salaire_precedente INTEGER,
+    ADD COLUMN IF NOT EXISTS nombre_participation_pee INTEGER,
+    ADD COLUMN IF NOT EXISTS nb_formations_suivies INTEGER,
+    ADD COLUMN IF NOT EXISTS nombre_employee_sous_responsabilite INTEGER,
+    ADD COLUMN IF NOT EXISTS niveau_education INTEGER,
+    ADD COLUMN IF NOT EXISTS domaine_etude VARCHAR(100),
+    ADD COLUMN IF NOT EXISTS ayant_enfants VARCHAR(1),
+    ADD COLUMN IF NOT EXISTS frequence_deplacement VARCHAR(50),
+    ADD COLUMN IF NOT EXISTS annees_depuis_la_derniere_promotion INTEGER,
+    ADD COLUMN IF NOT EXISTS annes_sous_responsable_actuel INTEGER,
+    ADD COLUMN IF NOT EXISTS features BYTEA,
+    ADD COLUMN IF NOT EXISTS encoder_version VARCHAR(16);
+
+-- Détection des changements et dernière prédiction (classement par risque)
+ALTER TABLE employees
+    ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32),
+    ADD COLUMN IF NOT EXISTS risk_probability FLOAT,
+    ADD COLUMN IF NOT EXISTS risk_model_version VARCHAR(20),
+    ADD COLUMN IF NOT EXISTS risk_predicted_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE predictions
+    ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32);
+
+-- Dernière prédiction des employés déjà scorés
+UPDATE employees e
+SET risk_probability = p.probability, risk_model_version = p.model_version, risk_predicted_at = p.predicted_at
+FROM (
+    SELECT DISTINCT ON (employee_id) employee_id, probability, model_version, predicted_at
+    FROM predictions
+    ORDER BY employee_id, predicted_at DESC, id DESC
+) p
+WHERE p.employee_id = e.id AND e.risk_predicted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_employees_departement_risk ON employees(departement, risk_probability DESC);
+CREATE INDEX IF NOT EXISTS idx_employees_risk ON employees(risk_probability DESC);
+
+-- Historique d'un employé : l'index couvrant remplace l'index sur employee_id seul
+DROP INDEX IF EXISTS idx_predictions_employee_id;
+CREATE INDEX IF NOT EXISTS idx_predictions_employee_predicted_at ON predictions(employee_id, predicted_at) INCLUDE (probability);
+
+-- Identifiant SIRH : clé de fusion des imports (INSERT ... ON CONFLICT (id_employee))
+ALTER TABLE employees
+    ADD COLUMN IF NOT EXISTS id_employee INTEGER;
+-- Même nom que la contrainte UNIQUE créée par init.sql : ignoré sur une base récente
+CREATE UNIQUE INDEX IF NOT EXISTS employees_id_employee_key ON employees(id_employee);
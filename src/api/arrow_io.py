@@ -0,0 +1,96 @@
+"""
+Entrées/sorties binaires columnaires (Apache Arrow IPC stream et Parquet).
+
+Les colonnes de la table correspondent aux champs d'EmployeeInput. Les
+colonnes numériques sans valeur nulle sont lues en tableaux numpy sans
+passer par des objets Python (sans copie pour un seul chunk ; la validation
+convertit ensuite les colonnes entières en float64, ce qui les copie) ; les
+résultats sont ajoutés à la table sous forme de colonnes `prediction` et
+`probability`.
+
+pyarrow est une dépendance optionnelle (pip install -e .[arrow]), importée
+seulement au premier appel : les workers ne la chargent pas au démarrage.
+"""
+
+import importlib.util
+import io
+
+import numpy as np
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+SUPPORTED_MEDIA_TYPES = (ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE)
+
+
+def is_available() -> bool:
+    """Indique si pyarrow est installé (sans l'importer)."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def read_table(body: bytes, media_type: str) -> "pa.Table":
+    """
+    Lit une table Arrow depuis un flux IPC ou un fichier Parquet.
+
+    Raises:
+        ValueError: si le contenu ne peut pas être décodé
+    """
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+    import pyarrow.parquet as pq
+
+    try:
+        if media_type == PARQUET_MEDIA_TYPE:
+            return pq.read_table(io.BytesIO(body))
+        with pa.ipc.open_stream(pa.BufferReader(body)) as reader:
+            return reader.read_all()
+    except (pa.ArrowException, OSError) as e:
+        raise ValueError(str(e)) from e
+
+
+def table_to_columns(table: "pa.Table", fields: list) -> dict:
+    """
+    Extrait les colonnes utiles sous forme de tableaux numpy.
+
+    Les colonnes contenant des nulls passent par des listes Python pour que
+    les valeurs manquantes soient signalées par ligne à la validation.
+    """
+    import pyarrow as pa
+
+    columns = {}
+    for name in fields:
+        if name not in table.column_names:
+            continue
+        column = table.column(name)
+        if column.null_count:
+            columns[name] = column.to_pylist()
+        elif pa.types.is_integer(column.type) or pa.types.is_floating(column.type):
+            columns[name] = column.to_numpy()
+        else:
+            columns[name] = column.to_numpy(zero_copy_only=False)
+    return columns
+
+
+def append_predictions(table: "pa.Table", predictions: np.ndarray, probabilities: np.ndarray) -> "pa.Table":
+    """Ajoute (ou remplace) les colonnes `prediction` et `probability`."""
+    import pyarrow as pa
+
+    for name in ("prediction", "probability"):
+        if name in table.column_names:
+            table = table.drop_columns([name])
+    table = table.append_column("prediction", pa.array(predictions.astype(np.int8)))
+    return table.append_column("probability", pa.array(probabilities.astype(np.float64)))
+
+
+def write_table(table: "pa.Table", media_type: str) -> bytes:
+    """Sérialise une table au format demandé."""
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+    import pyarrow.parquet as pq
+
+    sink = io.BytesIO()
+    if media_type == PARQUET_MEDIA_TYPE:
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue()
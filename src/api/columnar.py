@@ -0,0 +1,212 @@
+"""
+Validation colonne par colonne des lots d'employés.
+
+Pour les gros lots, construire un EmployeeInput Pydantic par ligne coûte plus
+cher que le modèle lui-même. Ici, les contraintes d'EmployeeInput (types,
+bornes ge/gt/le/lt, vocabulaires Literal) sont extraites une seule fois puis
+vérifiées par des opérations numpy sur des colonnes entières. Les erreurs
+restent rapportées par ligne, au format des erreurs de validation FastAPI.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Literal, Optional, get_args, get_origin
+
+import numpy as np
+from pydantic import BaseModel
+
+from .schemas import EmployeeInput
+
+
+# Valeur sentinelle pour un champ absent d'une ligne
+MISSING = object()
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """Contraintes d'un champ d'EmployeeInput."""
+    name: str
+    kind: str  # "int", "float" ou "literal"
+    choices: tuple = ()
+    ge: Optional[float] = None
+    gt: Optional[float] = None
+    le: Optional[float] = None
+    lt: Optional[float] = None
+
+
+def build_column_specs(model: type[BaseModel]) -> list[ColumnSpec]:
+    """Extrait les contraintes de chaque champ d'un modèle Pydantic."""
+    specs = []
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+        if get_origin(annotation) is Literal:
+            specs.append(ColumnSpec(name, "literal", choices=get_args(annotation)))
+            continue
+
+        # Contraintes annotated_types (Ge, Gt, Le, Lt) posées par Field(...)
+        bounds = {}
+        for constraint in field.metadata:
+            for attr in ("ge", "gt", "le", "lt"):
+                if getattr(constraint, attr, None) is not None:
+                    bounds[attr] = getattr(constraint, attr)
+        specs.append(ColumnSpec(name, "int" if annotation is int else "float", **bounds))
+    return specs
+
+
+EMPLOYEE_SPECS = build_column_specs(EmployeeInput)
+SPECS_BY_NAME = {spec.name: spec for spec in EMPLOYEE_SPECS}
+
+# (attribut, comparaison invalide, type d'erreur, libellé) au format Pydantic
+_BOUND_CHECKS = (
+    ("ge", np.less, "greater_than_equal", "greater than or equal to"),
+    ("gt", np.less_equal, "greater_than", "greater than"),
+    ("le", np.greater, "less_than_equal", "less than or equal to"),
+    ("lt", np.greater_equal, "less_than", "less than"),
+)
+
+
+def rows_to_columns(rows: list) -> tuple[dict, list]:
+    """
+    Transpose une liste de dictionnaires en colonnes.
+
+    Returns:
+        (colonnes, erreurs) - les lignes qui ne sont pas des objets sont signalées
+    """
+    errors = []
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append(_error("model_type", ("body", "employees", i),
+                                 "Input should be a valid dictionary or object to extract fields from", row))
+    if errors:
+        return {}, errors
+
+    columns = {spec.name: [row.get(spec.name, MISSING) for row in rows] for spec in EMPLOYEE_SPECS}
+    return columns, errors
+
+
+def _error(error_type: str, loc: tuple, msg: str, value: Any = None) -> dict:
+    error = {"type": error_type, "loc": list(loc), "msg": msg}
+    if value is not MISSING:
+        # Valeurs issues de tableaux numpy/Arrow : rendre l'entrée sérialisable en JSON
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float) and not np.isfinite(value):
+            value = str(value)
+        error["input"] = value
+    return error
+
+
+def _to_float_array(values: list) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convertit une colonne en float64.
+
+    Returns:
+        (tableau, masque des valeurs non convertibles)
+    """
+    try:
+        array = np.asarray(values, dtype=np.float64)
+        if array.ndim != 1:
+            raise ValueError("colonne imbriquée")
+        invalid = ~np.isfinite(array)
+    except (TypeError, ValueError):
+        # Chemin lent, uniquement si la colonne contient des valeurs invalides
+        array = np.full(len(values), np.nan)
+        invalid = np.zeros(len(values), dtype=bool)
+        for i, value in enumerate(values):
+            try:
+                if value is MISSING or value is None or isinstance(value, (dict, list)):
+                    raise TypeError
+                array[i] = float(value)
+            except (TypeError, ValueError):
+                invalid[i] = True
+        invalid |= ~np.isfinite(array)
+    return array, invalid
+
+
+def validate_column(spec: ColumnSpec, values, loc) -> tuple[np.ndarray, list]:
+    """
+    Valide une colonne contre les contraintes d'un champ.
+
+    Args:
+        spec: contraintes du champ
+        values: valeurs de la colonne (MISSING pour une valeur absente)
+        loc: fonction index -> chemin d'erreur
+
+    Returns:
+        (tableau validé, erreurs au format FastAPI)
+    """
+    errors = []
+    if spec.kind == "literal":
+        array = np.fromiter(values, dtype=object, count=len(values))
+        invalid = ~np.isin(array, np.asarray(spec.choices, dtype=object))
+        expected = " or ".join(f"'{c}'" for c in spec.choices)
+        for i in np.flatnonzero(invalid):
+            if values[i] is MISSING:
+                errors.append(_error("missing", loc(i), "Field required", MISSING))
+            else:
+                errors.append(_error("literal_error", loc(i), f"Input should be {expected}", values[i]))
+        return array, errors
+
+    array, invalid = _to_float_array(values)
+    type_name = "integer" if spec.kind == "int" else "number"
+    for i in np.flatnonzero(invalid):
+        if values[i] is MISSING:
+            errors.append(_error("missing", loc(i), "Field required", MISSING))
+        else:
+            errors.append(_error(f"{spec.kind}_parsing", loc(i), f"Input should be a valid {type_name}", values[i]))
+
+    valid = ~invalid
+    if spec.kind == "int":
+        fractional = valid & (array != np.floor(array))
+        for i in np.flatnonzero(fractional):
+            errors.append(_error("int_from_float", loc(i),
+                                 "Input should be a valid integer, got a number with a fractional part",
+                                 values[i]))
+        valid &= ~fractional
+
+    for attr, is_invalid, error_type, label in _BOUND_CHECKS:
+        bound = getattr(spec, attr)
+        if bound is None:
+            continue
+        out_of_range = valid & is_invalid(array, bound)
+        for i in np.flatnonzero(out_of_range):
+            errors.append(_error(error_type, loc(i), f"Input should be {label} {bound}", values[i]))
+        valid &= ~out_of_range
+
+    return array, errors
+
+
+def validate_columns(columns: dict, n_rows: int, loc_prefix: tuple, row_major: bool = True) -> tuple[dict, list]:
+    """
+    Valide des colonnes brutes contre les contraintes d'EmployeeInput.
+
+    Args:
+        columns: champ -> liste de valeurs (MISSING pour un champ absent)
+        n_rows: nombre de lignes attendu
+        loc_prefix: début du chemin d'erreur, ex. ("body", "employees")
+        row_major: chemins d'erreur (index, champ) si True, (champ, index) sinon
+
+    Returns:
+        (colonnes validées, erreurs au format FastAPI)
+    """
+    validated, errors = {}, []
+    for spec in EMPLOYEE_SPECS:
+        values = columns.get(spec.name)
+        if values is None:
+            errors.append(_error("missing", loc_prefix + (spec.name,), "Field required", MISSING))
+            continue
+        if len(values) != n_rows:
+            errors.append(_error("length_mismatch", loc_prefix + (spec.name,),
+                                 f"Column should have {n_rows} values, got {len(values)}", MISSING))
+            continue
+
+        if row_major:
+            def loc(i, name=spec.name):
+                return loc_prefix + (int(i), name)
+        else:
+            def loc(i, name=spec.name):
+                return loc_prefix + (name, int(i))
+
+        validated[spec.name], column_errors = validate_column(spec, values, loc)
+        errors.extend(column_errors)
+
+    return validated, errors
@@ -0,0 +1,36 @@
+"""
+Router FastAPI pour la surveillance de la dérive des données.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+
+from .model_loader import get_drift_monitor, get_registry
+from .router import ModelVersionQuery, select_model_version
+
+
+router = APIRouter(prefix="/drift", tags=["Monitoring"])
+
+
+@router.get(
+    "",
+    summary="Dérive des données entrantes",
+    description="Compare le trafic reçu par ce worker à la population d'entraînement (PSI / KS)"
+)
+async def drift_report(model_version: Optional[str] = ModelVersionQuery) -> dict:
+    """
+    Retourne, pour chaque feature, l'écart entre le trafic observé et la
+    référence enregistrée par train.py.
+
+    - **psi**: Population Stability Index (< 0.1 stable, >= 0.25 dérive)
+    - **ks**: distance de Kolmogorov-Smirnov approchée (features numériques)
+    - **drifted**: features dont le PSI dépasse le seuil de dérive
+
+    Les statistiques sont propres à chaque worker uvicorn.
+    """
+    version = select_model_version(model_version) if model_version else get_registry().config()["active"]
+    monitor = get_drift_monitor(version)
+    if monitor is None:
+        raise HTTPException(status_code=404, detail=f"Aucune référence de dérive pour la version {version}")
+    return {"model_version": version, **monitor.report()}
@@ -0,0 +1,185 @@
+"""
+Router FastAPI pour les employés et prédictions stockés en base.
+
+La base n'est pas nécessaire pour prédire : SQLAlchemy et les pilotes
+ne sont importés qu'au premier appel. Les lectures passent par la session
+asynchrone (get_async_session) ; le scoring en base, limité par la base et
+le CPU, reste synchrone dans le pool de threads.
+"""
+
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from .model_loader import get_registry, load_scorer
+from .router import ModelVersionQuery, select_model_version
+from .schemas import (
+    AtRiskEmployee,
+    AtRiskRankingResponse,
+    EmployeeScoringResponse,
+    PredictionStatisticsResponse,
+    RiskTrajectoryResponse
+)
+
+
+router = APIRouter(prefix="/employees", tags=["Employees"])
+
+
+def get_engine():
+    """Moteur SQLAlchemy de l'application (dépendance FastAPI)."""
+    try:
+        from src.database.connection import engine
+    except ImportError:
+        from ..database.connection import engine
+    return engine
+
+
+async def get_async_session():
+    """Session asynchrone de l'application (dépendance FastAPI)."""
+    try:
+        from src.database.connection import get_async_db
+    except ImportError:
+        from ..database.connection import get_async_db
+    async for db in get_async_db():
+        yield db
+
+
+@router.get(
+    "/statistics",
+    response_model=PredictionStatisticsResponse,
+    summary="Statistiques des prédictions",
+    description="Nombre de prédictions enregistrées, dont à risque de départ"
+)
+async def prediction_statistics(db=Depends(get_async_session)) -> PredictionStatisticsResponse:
+    """Statistiques agrégées des prédictions enregistrées (requête asynchrone)."""
+    try:
+        from src.database import async_crud
+    except ImportError:
+        from ..database import async_crud
+
+    try:
+        return PredictionStatisticsResponse(**await async_crud.get_statistics(db))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur de base de données: {str(e)}")
+
+
+@router.get(
+    "/at-risk",
+    response_model=AtRiskRankingResponse,
+    summary="Employés les plus à risque",
+    description="Les k employés de plus forte probabilité de départ (dernière prédiction)"
+)
+async def top_at_risk_employees(
+    k: int = Query(50, ge=1, le=1000, description="Nombre d'employés retournés"),
+    departement: Optional[str] = Query(None, description="Département (tous par défaut)"),
+    poste: Optional[str] = Query(None, description="Poste (tous par défaut)"),
+    db=Depends(get_async_session)
+) -> AtRiskRankingResponse:
+    """
+    Classe les employés stockés par leur dernière probabilité de départ.
+
+    La requête parcourt l'index (departement, risk_probability DESC) et
+    s'arrête après k lignes, quel que soit le nombre d'employés.
+    """
+    try:
+        from src.database import async_crud
+    except ImportError:
+        from ..database import async_crud
+
+    try:
+        employees = await async_crud.get_top_at_risk(db, k, departement, poste)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur de base de données: {str(e)}")
+
+    ranking = [
+        AtRiskEmployee(
+            rank=rank,
+            employee_id=employee.id,
+            id_employee=employee.id_employee,
+            departement=employee.departement,
+            poste=employee.poste,
+            probability=employee.risk_probability,
+            model_version=employee.risk_model_version,
+            predicted_at=employee.risk_predicted_at
+        )
+        for rank, employee in enumerate(employees, start=1)
+    ]
+    return AtRiskRankingResponse(employees=ranking, total=len(ranking))
+
+
+@router.get(
+    "/{employee_id}/trajectory",
+    response_model=RiskTrajectoryResponse,
+    summary="Trajectoire de risque d'un employé",
+    description="Probabilité de départ d'un employé au fil du temps, agrégée par intervalle"
+)
+async def employee_risk_trajectory(
+    employee_id: int,
+    start: Optional[datetime] = Query(None, description="Début de la période (première prédiction par défaut)"),
+    end: Optional[datetime] = Query(None, description="Fin de la période (dernière prédiction par défaut)"),
+    interval: Optional[Literal["hour", "day", "week"]] = Query(
+        None, description="Largeur des intervalles (automatique par défaut)"
+    ),
+    max_points: int = Query(200, ge=1, le=5000, description="Nombre maximal de points"),
+    db=Depends(get_async_session)
+) -> RiskTrajectoryResponse:
+    """
+    Renvoie la trajectoire de risque d'un employé pour un graphique.
+
+    Les prédictions sont agrégées (moyenne, min, max) par intervalle dans la
+    base : la réponse compte au plus **max_points** points quelle que soit la
+    longueur de l'historique, et la requête est un parcours de plage de
+    l'index (employee_id, predicted_at).
+    """
+    try:
+        from src.database import async_crud
+    except ImportError:
+        from ..database import async_crud
+
+    try:
+        trajectory = await async_crud.get_risk_trajectory(db, employee_id, start, end, interval, max_points)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur de base de données: {str(e)}")
+    return RiskTrajectoryResponse(**trajectory)
+
+
+@router.post(
+    "/score",
+    response_model=EmployeeScoringResponse,
+    summary="Scoring des employés stockés",
+    description="Score les employés de la table employees et enregistre leurs prédictions"
+)
+def score_stored_employees(
+    departement: Optional[str] = Query(None, description="Département à scorer (tous par défaut)"),
+    id_min: Optional[int] = Query(None, ge=1, description="Identifiant minimal (inclus)"),
+    id_max: Optional[int] = Query(None, ge=1, description="Identifiant maximal (inclus)"),
+    chunk_size: Optional[int] = Query(None, ge=100, le=100_000, description="Employés lus par bloc"),
+    incremental: bool = Query(False, description="Ne scorer que les employés nouveaux ou modifiés"),
+    model_version: Optional[str] = ModelVersionQuery,
+    engine=Depends(get_engine)
+) -> EmployeeScoringResponse:
+    """
+    Score les employés directement depuis la base, sans aller-retour client.
+
+    Les lignes sont lues par blocs avec un curseur côté serveur et les
+    prédictions sont insérées par lot : la mémoire reste constante.
+
+    - **incremental**: seuls les employés sans prédiction, modifiés depuis leur
+      dernière prédiction ou scorés par une autre version du modèle sont rescorés
+    """
+    version = select_model_version(model_version) if model_version else get_registry().config()["active"]
+    try:
+        from src.database.batch_scoring import DEFAULT_CHUNK_SIZE, score_employees
+    except ImportError:
+        from ..database.batch_scoring import DEFAULT_CHUNK_SIZE, score_employees
+
+    try:
+        stats = score_employees(
+            engine, load_scorer(version), version,
+            departement=departement, id_min=id_min, id_max=id_max,
+            chunk_size=chunk_size or DEFAULT_CHUNK_SIZE, incremental=incremental
+        )
+        return EmployeeScoringResponse(**stats)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur de scoring: {str(e)}")
@@ -0,0 +1,171 @@
+"""
+Router FastAPI pour les jobs de scoring asynchrones (lots volumineux).
+"""
+
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+
+from .jobs import INPUT_FORMATS, JobManager, JobQueueFull, get_job_manager, resolve_input_path
+from .router import ModelVersionQuery, select_model_version
+from .schemas import JobListResponse, JobStatusResponse
+
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+# Format d'un fichier serveur selon son extension
+SUFFIX_FORMATS = {".csv": "csv", ".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+def job_response(job: dict) -> JobStatusResponse:
+    """Statut d'un job, avec sa progression (fraction des employés traités)."""
+    if job["status"] == "succeeded":
+        progress = 1.0
+    elif job["total_rows"]:
+        progress = min(1.0, job["processed_rows"] / job["total_rows"])
+    else:
+        progress = None
+    return JobStatusResponse(**{field: job[field] for field in JobStatusResponse.model_fields if field in job},
+                             progress=progress)
+
+
+async def _get_job(manager: JobManager, job_id: str) -> dict:
+    # Le store (SQLite) est bloquant : lu hors de la boucle d'événements
+    job = await run_in_threadpool(manager.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job inconnu: {job_id}")
+    return job
+
+
+@router.post(
+    "",
+    status_code=202,
+    response_model=JobStatusResponse,
+    summary="Soumettre un job de scoring",
+    description="Lot CSV, JSON ou NDJSON (corps de la requête ou fichier serveur), scoré en arrière-plan",
+    openapi_extra={
+        "requestBody": {
+            "required": False,
+            "content": {media_type: {"schema": {"type": "string"}} for media_type in INPUT_FORMATS}
+        }
+    }
+)
+async def submit_job(
+    request: Request,
+    path: Optional[str] = Query(None, description="Fichier serveur, relatif à JOB_INPUT_DIR (au lieu du corps)"),
+    model_version: Optional[str] = ModelVersionQuery,
+    manager: JobManager = Depends(get_job_manager)
+) -> JobStatusResponse:
+    """
+    Soumet un lot à scorer et renvoie immédiatement l'identifiant du job.
+
+    - Content-Type `text/csv` (une colonne par champ d'EmployeeInput),
+      `application/x-ndjson` (un employé par ligne) ou `application/json`
+      (liste d'employés, ou objet `{"employees": [...]}`)
+    - **path**: fichier déjà présent sur le serveur, dans JOB_INPUT_DIR
+    - Le lot est écrit sur disque avant d'être scoré : le job ne dépend plus
+      de la requête (délais d'expiration, déconnexion du client)
+
+    Suivre le job avec `GET /jobs/{job_id}`, puis télécharger `GET /jobs/{job_id}/result`.
+    """
+    version = select_model_version(model_version)
+
+    if path is not None:
+        try:
+            input_path = await run_in_threadpool(resolve_input_path, path)
+        except PermissionError as e:
+            raise HTTPException(status_code=403, detail=str(e))
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        input_format = SUFFIX_FORMATS.get(input_path.suffix.lower())
+        if input_format is None:
+            raise HTTPException(status_code=415, detail=f"Extension attendue: {', '.join(SUFFIX_FORMATS)}")
+    else:
+        media_type = request.headers.get("content-type", "").split(";")[0].strip()
+        input_format = INPUT_FORMATS.get(media_type)
+        if input_format is None:
+            raise HTTPException(status_code=415, detail=f"Content-Type attendu: {' ou '.join(INPUT_FORMATS)}")
+
+    try:
+        job_id = await run_in_threadpool(manager.new_job_id, input_format, version)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    if path is None:
+        # Écriture en flux : le lot n'est jamais entièrement en mémoire
+        input_path = manager.input_path(job_id, input_format)
+        # Écritures disque dans le pool de threads : la boucle d'événements reste libre
+        try:
+            f = await run_in_threadpool(open, input_path, "wb")
+            try:
+                async for block in request.stream():
+                    await run_in_threadpool(f.write, block)
+            finally:
+                await run_in_threadpool(f.close)
+        except BaseException:
+            # Envoi interrompu : libère la place réservée et l'entrée partielle
+            await run_in_threadpool(manager.discard, job_id)
+            raise
+
+    job = await run_in_threadpool(manager.submit, job_id, Path(input_path))
+    return job_response(job)
+
+
+@router.get(
+    "",
+    response_model=JobListResponse,
+    summary="Liste des jobs",
+    description="Jobs les plus récents, du plus récent au plus ancien"
+)
+async def list_jobs(
+    limit: int = Query(50, ge=1, le=1000, description="Nombre de jobs retournés"),
+    manager: JobManager = Depends(get_job_manager)
+) -> JobListResponse:
+    """Liste les derniers jobs soumis."""
+    jobs = [job_response(job) for job in await run_in_threadpool(manager.store.list, limit)]
+    return JobListResponse(jobs=jobs, total=len(jobs))
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobStatusResponse,
+    summary="Statut d'un job",
+    description="Statut et progression d'un job de scoring"
+)
+async def job_status(job_id: str, manager: JobManager = Depends(get_job_manager)) -> JobStatusResponse:
+    """Renvoie le statut (uploading, queued, running, succeeded, failed, cancelled) et la progression."""
+    return job_response(await _get_job(manager, job_id))
+
+
+@router.get(
+    "/{job_id}/result",
+    summary="Résultats d'un job",
+    description="CSV des prédictions (row, prediction, probability, label, error)",
+    response_class=FileResponse
+)
+async def job_result(job_id: str, manager: JobManager = Depends(get_job_manager)) -> FileResponse:
+    """
+    Télécharge les résultats d'un job terminé.
+
+    Une ligne par employé, dans l'ordre du lot ; les lignes invalides ont une
+    prédiction vide et le détail des erreurs dans la colonne `error`.
+    """
+    job = await _get_job(manager, job_id)
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job {job['status']} : résultats indisponibles")
+    return FileResponse(manager.result_path(job_id), media_type="text/csv", filename=f"job_{job_id}.csv")
+
+
+@router.delete(
+    "/{job_id}",
+    response_model=JobStatusResponse,
+    summary="Annuler un job",
+    description="Annule un job en attente, ou l'interrompt au prochain bloc s'il est en cours"
+)
+async def cancel_job(job_id: str, manager: JobManager = Depends(get_job_manager)) -> JobStatusResponse:
+    """Annule un job (sans effet sur un job déjà terminé)."""
+    await _get_job(manager, job_id)
+    return job_response(await run_in_threadpool(manager.cancel, job_id))
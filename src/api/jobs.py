@@ -0,0 +1,517 @@
+"""
+Jobs de scoring asynchrones pour les très gros lots.
+
+Un lot (CSV, JSON ou NDJSON) est d'abord écrit sur disque, puis scoré en
+arrière-plan, bloc par bloc, indépendamment de la requête HTTP qui l'a
+soumis. Les blocs sont validés et scorés dans un pool de processus local :
+chaque processus charge le modèle une fois (cache du registre) et le
+réutilise pour tous les blocs. Les résultats sont écrits au fil de l'eau
+dans un CSV (une ligne par employé, dans l'ordre du lot).
+
+L'état des jobs est conservé en mémoire ou dans une base SQLite locale
+(JOB_BACKEND=sqlite) : avec SQLite, l'état et l'annulation sont partagés
+entre les workers uvicorn d'une même machine, sans broker externe.
+"""
+
+import csv
+import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+try:
+    from src.scoring import LABELS
+except ImportError:
+    from ..scoring import LABELS
+
+from .columnar import rows_to_columns, validate_columns
+from .model_loader import load_scorer
+
+
+# Configuration
+JOB_BACKEND = os.getenv("JOB_BACKEND", "memory")                   # "memory" ou "sqlite"
+JOB_SPOOL_DIR = Path(os.getenv("JOB_SPOOL_DIR", str(Path(__file__).parent.parent.parent / "jobs")))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(min(4, os.cpu_count() or 1))))  # 0 = scoring dans le thread du job
+JOB_MAX_RUNNING = int(os.getenv("JOB_MAX_RUNNING", "2"))            # jobs exécutés simultanément
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "10"))             # jobs en attente ou en cours acceptés
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "10000"))          # employés par bloc
+# Durée de conservation des jobs terminés (entrée, résultats et état) ; 0 = sans limite
+JOB_RETENTION_HOURS = float(os.getenv("JOB_RETENTION_HOURS", "24"))
+# Répertoire des fichiers soumis par chemin serveur (désactivé si vide)
+JOB_INPUT_DIR = os.getenv("JOB_INPUT_DIR", "")
+
+# Formats d'entrée par Content-Type
+INPUT_FORMATS = {"text/csv": "csv", "application/json": "json", "application/x-ndjson": "ndjson"}
+# « uploading » : job réservé dont l'entrée est en cours d'écriture (compte dans la file)
+ACTIVE_STATUSES = ("uploading", "queued", "running")
+FINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+RESULT_FILE = "result.csv"
+RESULT_COLUMNS = ["row", "prediction", "probability", "label", "error"]
+
+JOB_FIELDS = (
+    "job_id", "status", "input_format", "input_path", "model_version", "total_rows", "processed_rows",
+    "failed_rows", "error", "cancel_requested", "worker_pid", "created_at", "started_at", "finished_at",
+)
+
+
+class JobQueueFull(Exception):
+    """Trop de jobs en attente ou en cours."""
+
+
+# ==================== STOCKAGE DE L'ÉTAT ====================
+
+class MemoryJobStore:
+    """État des jobs en mémoire (un seul worker uvicorn)."""
+
+    def __init__(self):
+        self._jobs: dict = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: dict) -> None:
+        with self._lock:
+            self._jobs[job["job_id"]] = dict(job)
+
+    def create_if_below(self, job: dict, statuses: tuple, limit: int) -> bool:
+        """Crée le job si moins de `limit` jobs ont l'un de ces statuts (comptage et insertion atomiques)."""
+        with self._lock:
+            if sum(other["status"] in statuses for other in self._jobs.values()) >= limit:
+                return False
+            self._jobs[job["job_id"]] = dict(job)
+            return True
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def list(self, limit: int = 50) -> list:
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda job: job["created_at"], reverse=True)
+            return [dict(job) for job in jobs[:limit]]
+
+    def count(self, statuses: tuple) -> int:
+        with self._lock:
+            return sum(job["status"] in statuses for job in self._jobs.values())
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def finished_before(self, cutoff: str) -> list:
+        """Identifiants des jobs terminés avant `cutoff` (ISO 8601)."""
+        with self._lock:
+            return [
+                job["job_id"] for job in self._jobs.values()
+                if job["status"] in FINAL_STATUSES and (job["finished_at"] or "") < cutoff
+            ]
+
+
+class SQLiteJobStore:
+    """État des jobs dans une base SQLite locale (partagée entre workers d'une machine)."""
+
+    def __init__(self, path: Path):
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, input_format TEXT, input_path TEXT, "
+                "model_version TEXT, total_rows INTEGER, processed_rows INTEGER, failed_rows INTEGER, "
+                "error TEXT, cancel_requested INTEGER, worker_pid INTEGER, "
+                "created_at TEXT, started_at TEXT, finished_at TEXT)"
+            )
+
+    _INSERT = f"INSERT INTO jobs ({', '.join(JOB_FIELDS)}) VALUES ({', '.join('?' for _ in JOB_FIELDS)})"
+
+    def create(self, job: dict) -> None:
+        with self._lock:
+            self._conn.execute(self._INSERT, [job[field] for field in JOB_FIELDS])
+
+    def create_if_below(self, job: dict, statuses: tuple, limit: int) -> bool:
+        """
+        Crée le job si moins de `limit` jobs ont l'un de ces statuts.
+
+        BEGIN IMMEDIATE prend le verrou d'écriture avant le comptage : deux
+        workers ne peuvent pas compter puis insérer en même temps.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                count = self._conn.execute(
+                    f"SELECT COUNT(*) FROM jobs WHERE status IN ({', '.join('?' for _ in statuses)})", statuses
+                ).fetchone()[0]
+                created = count < limit
+                if created:
+                    self._conn.execute(self._INSERT, [job[field] for field in JOB_FIELDS])
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return created
+
+    def update(self, job_id: str, **fields) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", [*fields.values(), job_id])
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row is not None else None
+
+    def list(self, limit: int = 50) -> list:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def count(self, statuses: tuple) -> int:
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM jobs WHERE status IN ({', '.join('?' for _ in statuses)})", statuses
+            ).fetchone()[0]
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def finished_before(self, cutoff: str) -> list:
+        """Identifiants des jobs terminés avant `cutoff` (ISO 8601)."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT job_id FROM jobs WHERE status IN ({', '.join('?' for _ in FINAL_STATUSES)}) "
+                "AND COALESCE(finished_at, '') < ?", (*FINAL_STATUSES, cutoff)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# ==================== LECTURE DES LOTS ====================
+
+def count_rows(path: Path, input_format: str) -> Optional[int]:
+    """Nombre approximatif d'employés d'un CSV/NDJSON (fins de ligne, sans parser) ; None pour un JSON."""
+    if input_format == "json":
+        return None
+    n_lines, last = 0, b"\n"
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            n_lines += block.count(b"\n")
+            last = block[-1:]
+    n_lines += last != b"\n"
+    return max(0, n_lines - 1) if input_format == "csv" else n_lines
+
+
+def iter_row_chunks(path: Path, input_format: str, chunk_size: int) -> Iterator[list]:
+    """
+    Lit un lot par blocs de `chunk_size` employés (dictionnaires).
+
+    CSV et NDJSON sont lus en flux ; un JSON (liste d'employés, ou objet avec
+    la clé `employees`) est chargé en entier.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if input_format == "csv":
+            rows = csv.DictReader(f)
+        elif input_format == "ndjson":
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            payload = json.load(f)
+            rows = iter(payload["employees"] if isinstance(payload, dict) else payload)
+
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+# ==================== SCORING D'UN BLOC ====================
+
+def score_chunk(rows: list, model_version: str) -> tuple:
+    """
+    Valide et score un bloc d'employés (exécuté dans un processus du pool).
+
+    Les lignes invalides ne sont pas scorées : leurs erreurs sont renvoyées.
+    Le modèle est chargé au premier bloc puis réutilisé par le processus.
+
+    Returns:
+        (predictions, probabilities, erreurs) - prédictions des lignes valides
+        dans l'ordre, erreurs {index de la ligne: message}
+    """
+    messages = {i: ["Ligne invalide: objet attendu"] for i, row in enumerate(rows) if not isinstance(row, dict)}
+    columns, _ = rows_to_columns([row if isinstance(row, dict) else {} for row in rows])
+    validated, errors = validate_columns(columns, len(rows), ("rows",))
+    for error in errors:
+        _, i, field = error["loc"]
+        if isinstance(rows[i], dict):
+            messages.setdefault(i, []).append(f"{field}: {error['msg']}")
+    row_errors = {i: "; ".join(m) for i, m in messages.items()}
+
+    valid = np.ones(len(rows), dtype=bool)
+    valid[list(row_errors)] = False
+    n_valid = int(valid.sum())
+    if not n_valid:
+        return np.empty(0, dtype=int), np.empty(0), row_errors
+
+    scorer = load_scorer(model_version)
+    X = scorer.encode_columns({name: values[valid] for name, values in validated.items()}, n_valid)
+    return scorer.predict(X), scorer.predict_proba(X), row_errors
+
+
+# ==================== GESTIONNAIRE ====================
+
+class JobManager:
+    """
+    Soumission, exécution et suivi des jobs de scoring.
+
+    Args:
+        store: État des jobs (MemoryJobStore ou SQLiteJobStore)
+        spool_dir: Répertoire des entrées et résultats
+        workers: Processus de scoring (0 = scoring dans le thread du job)
+        max_running: Jobs exécutés simultanément par ce worker
+        max_queued: Jobs en attente ou en cours acceptés (tous workers confondus avec SQLite)
+        chunk_size: Employés par bloc
+        retention_hours: Conservation des jobs terminés (0 = sans limite)
+    """
+
+    def __init__(self, store, spool_dir: Path, workers: int = JOB_WORKERS, max_running: int = JOB_MAX_RUNNING,
+                 max_queued: int = JOB_MAX_QUEUED, chunk_size: int = JOB_CHUNK_SIZE,
+                 retention_hours: float = JOB_RETENTION_HOURS):
+        self.store = store
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.max_queued = max_queued
+        self.chunk_size = chunk_size
+        self.retention_hours = retention_hours
+        self._runner = ThreadPoolExecutor(max_workers=max_running, thread_name_prefix="job")
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._recover()
+
+    def _recover(self) -> None:
+        """Marque en échec les jobs actifs dont le processus propriétaire a disparu."""
+        for job in self.store.list(limit=1000):
+            if job["status"] in ACTIVE_STATUSES and not _pid_alive(job["worker_pid"]):
+                self.store.update(job["job_id"], status="failed", error="Interrompu (arrêt du service)",
+                                  finished_at=datetime.utcnow().isoformat())
+        self.purge_expired()
+
+    def discard(self, job_id: str) -> None:
+        """Supprime un job : son répertoire (entrée envoyée, résultats) et son état."""
+        shutil.rmtree(self.spool_dir / job_id, ignore_errors=True)
+        self.store.delete(job_id)
+
+    def purge_expired(self, now: Optional[datetime] = None) -> int:
+        """
+        Supprime les jobs terminés depuis plus de retention_hours.
+
+        Returns:
+            Nombre de jobs supprimés
+        """
+        if self.retention_hours <= 0:
+            return 0
+        cutoff = ((now or datetime.utcnow()) - timedelta(hours=self.retention_hours)).isoformat()
+        expired = self.store.finished_before(cutoff)
+        for job_id in expired:
+            self.discard(job_id)
+        return len(expired)
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Pool de processus de scoring, créé au premier job (spawn : sûr avec les threads de l'API)."""
+        if self.workers <= 0:
+            return None
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def new_job_id(self, input_format: str, model_version: str) -> str:
+        """
+        Réserve un job (statut « uploading ») avant l'écriture de son entrée.
+
+        La place dans la file est prise au moment de la réservation : des
+        soumissions simultanées ne peuvent pas dépasser max_queued.
+
+        Raises:
+            JobQueueFull: si max_queued jobs sont déjà réservés, en attente ou en cours
+        """
+        self.purge_expired()
+        job = {field: None for field in JOB_FIELDS}
+        job.update(
+            job_id=uuid.uuid4().hex,
+            status="uploading",
+            input_format=input_format,
+            model_version=model_version,
+            processed_rows=0,
+            failed_rows=0,
+            cancel_requested=False,
+            worker_pid=os.getpid(),
+            created_at=datetime.utcnow().isoformat(),
+        )
+        if not self.store.create_if_below(job, ACTIVE_STATUSES, self.max_queued):
+            raise JobQueueFull(f"{self.max_queued} jobs déjà en attente ou en cours")
+        (self.spool_dir / job["job_id"]).mkdir()
+        return job["job_id"]
+
+    def input_path(self, job_id: str, input_format: str) -> Path:
+        return self.spool_dir / job_id / f"input.{input_format}"
+
+    def result_path(self, job_id: str) -> Path:
+        return self.spool_dir / job_id / RESULT_FILE
+
+    def submit(self, job_id: str, input_path: Path) -> dict:
+        """Met en file un job réservé par new_job_id, une fois son entrée sur disque."""
+        job = self.store.get(job_id)
+        if job["status"] != "uploading":
+            return job  # annulé pendant l'envoi
+        total_rows = count_rows(input_path, job["input_format"])
+        self.store.update(job_id, status="queued", input_path=str(input_path), total_rows=total_rows)
+        self._runner.submit(self.run, job_id)
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        """Demande l'annulation d'un job (effective au prochain bloc s'il est en cours)."""
+        job = self.store.get(job_id)
+        if job is None or job["status"] in FINAL_STATUSES:
+            return job
+        if job["status"] in ("uploading", "queued"):
+            self.store.update(job_id, status="cancelled", cancel_requested=True,
+                              finished_at=datetime.utcnow().isoformat())
+        else:
+            self.store.update(job_id, cancel_requested=True)
+        return self.store.get(job_id)
+
+    def _cancelled(self, job_id: str) -> bool:
+        return self.store.get(job_id)["cancel_requested"]
+
+    def run(self, job_id: str) -> None:
+        """Exécute un job : lecture par blocs, scoring dans le pool, écriture ordonnée des résultats."""
+        job = self.store.get(job_id)
+        if job is None or job["status"] != "queued":
+            return
+        self.store.update(job_id, status="running", started_at=datetime.utcnow().isoformat())
+
+        result_path = self.result_path(job_id)
+        partial_path = result_path.with_suffix(".part")
+        pool = self._get_pool()
+        # Blocs soumis au pool en avance (les résultats sont écrits dans l'ordre)
+        in_flight = deque()
+        window = max(1, self.workers) * 2
+        processed = failed = 0
+        try:
+            with open(partial_path, "w", newline="") as out:
+                writer = csv.writer(out)
+                writer.writerow(RESULT_COLUMNS)
+
+                def write_next():
+                    nonlocal processed, failed
+                    start, n_rows, pending = in_flight.popleft()
+                    predictions, probabilities, row_errors = pending.result() if pool else pending
+                    scored = iter(zip(predictions.tolist(), probabilities.tolist()))
+                    for i in range(n_rows):
+                        if i in row_errors:
+                            writer.writerow([start + i, "", "", "", row_errors[i]])
+                        else:
+                            prediction, probability = next(scored)
+                            writer.writerow([start + i, prediction, probability, LABELS[prediction], ""])
+                    processed += n_rows
+                    failed += len(row_errors)
+                    self.store.update(job_id, processed_rows=processed, failed_rows=failed)
+
+                start = 0
+                for rows in iter_row_chunks(Path(job["input_path"]), job["input_format"], self.chunk_size):
+                    if self._cancelled(job_id):
+                        break
+                    if pool:
+                        pending = pool.submit(score_chunk, rows, job["model_version"])
+                    else:
+                        pending = score_chunk(rows, job["model_version"])
+                    in_flight.append((start, len(rows), pending))
+                    start += len(rows)
+                    if len(in_flight) >= window:
+                        write_next()
+                while in_flight and not self._cancelled(job_id):
+                    write_next()
+
+            if self._cancelled(job_id):
+                for _, _, pending in in_flight:
+                    if pool:
+                        pending.cancel()
+                partial_path.unlink(missing_ok=True)
+                self.store.update(job_id, status="cancelled", finished_at=datetime.utcnow().isoformat())
+                return
+            partial_path.replace(result_path)
+            self.store.update(job_id, status="succeeded", total_rows=processed,
+                              finished_at=datetime.utcnow().isoformat())
+        except Exception as e:
+            self.store.update(job_id, status="failed", error=str(e), finished_at=datetime.utcnow().isoformat())
+
+    def shutdown(self) -> None:
+        """Arrête le pool (les jobs en cours sont interrompus)."""
+        self._runner.shutdown(wait=False, cancel_futures=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache(maxsize=1)
+def get_job_manager() -> JobManager:
+    """Gestionnaire de jobs du worker (créé au premier appel)."""
+    JOB_SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    store = SQLiteJobStore(JOB_SPOOL_DIR / "jobs.db") if JOB_BACKEND == "sqlite" else MemoryJobStore()
+    return JobManager(store, JOB_SPOOL_DIR)
+
+
+def resolve_input_path(path: str) -> Path:
+    """
+    Vérifie qu'un chemin serveur désigne un fichier de JOB_INPUT_DIR.
+
+    Raises:
+        PermissionError: chemins serveur désactivés, ou chemin hors de JOB_INPUT_DIR
+        FileNotFoundError: fichier absent
+    """
+    if not JOB_INPUT_DIR:
+        raise PermissionError("Soumission par chemin serveur désactivée (JOB_INPUT_DIR non défini)")
+    root = Path(JOB_INPUT_DIR).resolve()
+    resolved = (root / path).resolve()
+    if not resolved.is_relative_to(root):
+        raise PermissionError(f"Chemin hors de {root}")
+    if not resolved.is_file():
+        raise FileNotFoundError(f"Fichier introuvable: {path}")
+    return resolved
@@ -3,16 +3,39 @@ Point d'entrée principal de l'API FastAPI.
 Déploie le modèle de prédiction du turnover employé.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .schemas import HealthResponse
 from .router import router as prediction_router
-from .model_loader import is_model_loaded
+from .model_router import router as model_router
+from .simulation_router import router as simulation_router
+from .drift_router import router as drift_router
+from .employee_router import router as employee_router
+from .job_router import router as job_router
+from .jobs import get_job_manager
+from .model_loader import is_model_loaded, warmup
+from .profiling import router as admin_router, ProfilingMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Charge le modèle au démarrage du worker plutôt qu'à la première requête."""
+    try:
+        warmup()
+    except Exception as e:
+        # L'API démarre quand même ; /health signale model_loaded=false
+        print(f"Préchargement du modèle impossible: {e}")
+    yield
+    if get_job_manager.cache_info().currsize:
+        get_job_manager().shutdown()
 
 
 # Métadonnées de l'API pour Swagger
 app = FastAPI(
+    lifespan=lifespan,
     title="HR Turnover Prediction API",
     description="""
 API de prédiction du turnover des employés.
@@ -47,8 +70,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Montage du router de prédictions
+# Profilage à la demande (inactif tant que PROFILING_ENABLED n'est pas défini)
+app.add_middleware(ProfilingMiddleware)
+
+# Montage des routers
 app.include_router(prediction_router)
+app.include_router(model_router)
+app.include_router(simulation_router)
+app.include_router(drift_router)
+app.include_router(employee_router)
+app.include_router(job_router)
+app.include_router(admin_router)
 
 
 @app.get(
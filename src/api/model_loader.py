@@ -1,24 +1,58 @@
 """
 Module de chargement du modèle ML.
 Gère le chargement, le cache et la prédiction avec prétraitement.
+
+Le chemin de service n'importe ni pandas ni scikit-learn lorsque l'artefact
+compilé (model_hr.npz, produit par train.py) est présent : l'encodage et le
+scoring sont faits en numpy par src.scoring.
+
+Les modèles sont servis depuis le registre versionné (src.registry) ; en
+l'absence de registre, model_hr.npz / model_hr.pkl sont servis sous la
+version MODEL_VERSION.
 """
 
+import logging
 import os
-import joblib
+import threading
 from pathlib import Path
 from functools import lru_cache
-import pandas as pd
+from typing import TYPE_CHECKING, Optional
+
 import numpy as np
 
-# Import des fonctions de prétraitement
 try:
-    from src.data_processing import prepare_features
+    from src.scoring import CompiledModel, FeatureEncoder, top_k_indices
+    from src.registry import ModelRegistry, DEFAULT_CACHE_BYTES
+    from src.drift import DriftMonitor, load_monitor
 except ImportError:
-    from ..data_processing import prepare_features
+    from ..scoring import CompiledModel, FeatureEncoder, top_k_indices
+    from ..registry import ModelRegistry, DEFAULT_CACHE_BYTES
+    from ..drift import DriftMonitor, load_monitor
+
+from .schemas import EmployeeInput
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-# Chemin du modèle (relatif à la racine du projet)
+logger = logging.getLogger(__name__)
+
+# Chemins des artefacts (relatifs à la racine du projet)
 MODEL_PATH = Path(__file__).parent.parent.parent / "model_hr.pkl"
+COMPILED_MODEL_PATH = MODEL_PATH.with_suffix(".npz")
+
+# Registre de modèles versionnés
+REGISTRY_DIR = Path(os.getenv("MODEL_REGISTRY_DIR", str(MODEL_PATH.parent / "models")))
+MODEL_CACHE_MAX_BYTES = int(os.getenv("MODEL_CACHE_MAX_BYTES", str(DEFAULT_CACHE_BYTES)))
+# Version attribuée à model_hr.pkl/npz quand le registre est vide
+DEFAULT_MODEL_VERSION = os.getenv("MODEL_VERSION", "1.0.0")
+
+# Référence de dérive produite par train.py (dans chaque version du registre)
+DRIFT_BASELINE_FILE = "drift_baseline.json"
+DRIFT_ENABLED = os.getenv("DRIFT_MONITORING", "1").lower() in ("1", "true", "yes")
+
+# Moniteurs de dérive du worker, par version de modèle
+_drift_monitors: dict = {}
+_drift_monitors_lock = threading.Lock()
 
 
 @lru_cache(maxsize=1)
@@ -29,15 +63,159 @@ def load_model():
     """
     if not MODEL_PATH.exists():
         raise FileNotFoundError(f"Modèle introuvable: {MODEL_PATH}")
-    
+
+    import joblib  # Import différé : dépickler charge scikit-learn/imblearn
     return joblib.load(MODEL_PATH)
 
 
-def preprocess_input(input_data: dict) -> pd.DataFrame:
+class PipelineScorer:
+    """
+    Adaptateur pour un pipeline non compilable : même interface que
+    CompiledModel, mais la prédiction passe par le pipeline scikit-learn.
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.encoder = FeatureEncoder.from_feature_names(
+            pipeline.feature_names_in_, EmployeeInput.model_fields
+        )
+
+    @property
+    def feature_names(self) -> list:
+        return self.encoder.feature_names
+
+    def encode(self, records):
+        return self.encoder.encode(records)
+
+    def encode_columns(self, columns, n_rows=None):
+        return self.encoder.encode_columns(columns, n_rows)
+
+    def _frame(self, X):
+        import pandas as pd
+        return pd.DataFrame(X, columns=self.feature_names)
+
+    def predict_proba(self, X):
+        return self.pipeline.predict_proba(self._frame(X))[:, 1]
+
+    def predict(self, X):
+        return self.pipeline.predict(self._frame(X))
+
+
+def scorer_from_pipeline(pipeline):
+    """Compile un pipeline si sa structure le permet, sinon l'encapsule."""
+    try:
+        return CompiledModel.from_pipeline(pipeline, EmployeeInput.model_fields)
+    except ValueError:
+        return PipelineScorer(pipeline)
+
+
+def _scorer_from_pickle(path: Path):
+    import joblib
+    return scorer_from_pipeline(joblib.load(path))
+
+
+def _load_legacy_scorer():
+    """Charge model_hr.npz, ou à défaut model_hr.pkl."""
+    if COMPILED_MODEL_PATH.exists():
+        return CompiledModel.load(COMPILED_MODEL_PATH)
+    return scorer_from_pipeline(load_model())
+
+
+@lru_cache(maxsize=1)
+def get_registry() -> ModelRegistry:
+    """Registre de modèles partagé par le worker."""
+    return ModelRegistry(
+        REGISTRY_DIR,
+        max_bytes=MODEL_CACHE_MAX_BYTES,
+        pickle_loader=_scorer_from_pickle,
+        fallback=(DEFAULT_MODEL_VERSION, _load_legacy_scorer),
+    )
+
+
+def load_scorer(version: Optional[str] = None):
+    """
+    Retourne le scorer d'une version (la version active par défaut).
+
+    Priorité à l'artefact compilé (.npz, numpy uniquement). À défaut, le
+    pickle est chargé puis compilé en mémoire si sa structure le permet.
+    """
+    return get_registry().get(version)
+
+
+def resolve_model_version(requested: Optional[str] = None) -> str:
+    """
+    Choisit la version qui sert une requête (version épinglée ou routage canary).
+
+    Raises:
+        KeyError: si la version demandée n'existe pas
+    """
+    return get_registry().resolve(requested)
+
+
+def shadow_version(served_version: str) -> Optional[str]:
+    """Version candidate à scorer en shadow pour cette requête, s'il y en a une."""
+    return get_registry().shadow_version(served_version)
+
+
+def run_shadow(version: str, served_probabilities, inputs: list = None, columns: dict = None, n_rows: int = 0):
+    """Score les mêmes entrées avec le candidat et enregistre l'écart (tâche de fond)."""
+    scorer = load_scorer(version)
+    X = scorer.encode(inputs) if inputs is not None else scorer.encode_columns(columns, n_rows)
+    get_registry().record_shadow(served_probabilities, scorer.predict_proba(X))
+
+
+def get_drift_monitor(version: Optional[str] = None) -> Optional[DriftMonitor]:
+    """Moniteur de dérive d'une version (None si aucune référence n'a été produite)."""
+    registry = get_registry()
+    version = version or registry.config()["active"]
+    with _drift_monitors_lock:
+        # Un seul moniteur par version, même si plusieurs threads le créent en même temps
+        if version not in _drift_monitors:
+            path = registry.root / version / DRIFT_BASELINE_FILE
+            if not path.exists() and registry.fallback and version == registry.fallback[0]:
+                path = MODEL_PATH.parent / DRIFT_BASELINE_FILE
+            _drift_monitors[version] = load_monitor(path)
+        return _drift_monitors[version]
+
+
+def _observe(model_version: Optional[str], X) -> None:
+    """
+    Alimente le moniteur de dérive avec les lignes encodées d'une requête.
+    Une erreur de la surveillance est journalisée sans faire échouer la prédiction.
+    """
+    if not DRIFT_ENABLED:
+        return
+    try:
+        monitor = get_drift_monitor(model_version)
+        if monitor is not None:
+            monitor.observe(X)
+    except Exception:
+        logger.exception("Surveillance de dérive en échec (version %s)", model_version)
+
+
+def warmup() -> None:
+    """
+    Charge le modèle et exécute une prédiction factice.
+    Appelé au démarrage (lifespan) pour que la première requête ne paie pas le chargement.
+    La ligne factice n'alimente pas le moniteur de dérive (ce n'est pas du trafic réel).
+    """
+    example = EmployeeInput.model_config["json_schema_extra"]["examples"][0]
+    scorer = load_scorer()
+    X = scorer.encode([example])
+    scorer.predict_proba(X)
+    scorer.predict(X)
+
+
+def preprocess_input(input_data: dict) -> "pd.DataFrame":
     """
     Prétraite les données d'entrée pour correspondre au format attendu par le modèle.
     Applique les mêmes transformations que lors de l'entraînement.
+
+    Version pandas conservée pour le diagnostic ; l'API utilise l'encodeur
+    vectorisé de src.scoring.
     """
+    import pandas as pd
+
     # Créer un DataFrame avec les données brutes
     df = pd.DataFrame([input_data])
     
@@ -68,66 +246,159 @@ def preprocess_input(input_data: dict) -> pd.DataFrame:
     return df_proc
 
 
-def predict_single(input_data: dict) -> tuple[int, float]:
+def predict_single(input_data: dict, model_version: Optional[str] = None) -> tuple[int, float]:
     """
     Effectue une prédiction pour un seul employé.
     
     Args:
         input_data: Dictionnaire des features de l'employé
+        model_version: Version du modèle (version active par défaut)
         
     Returns:
         Tuple (prediction, probability)
     """
-    model = load_model()
-    
-    # Prétraitement des données
-    df = preprocess_input(input_data)
-    
-    # Aligner les colonnes avec celles du modèle
-    if hasattr(model, 'feature_names_in_'):
-        model_features = model.feature_names_in_
-        # Ajouter les colonnes manquantes avec des 0
-        for col in model_features:
-            if col not in df.columns:
-                df[col] = 0
-        # Réordonner les colonnes
-        df = df[model_features]
-    
-    # Prédiction
-    prediction = model.predict(df)[0]
-    
-    # Probabilité (si le modèle le supporte)
-    try:
-        probabilities = model.predict_proba(df)[0]
-        probability = probabilities[1]  # Probabilité de la classe 1 (départ)
-    except AttributeError:
-        probability = float(prediction)
-    
-    return int(prediction), float(probability)
+    return predict_batch([input_data], model_version)[0]
 
 
-def predict_batch(inputs: list[dict]) -> list[tuple[int, float]]:
+def predict_batch(inputs: list[dict], model_version: Optional[str] = None) -> list[tuple[int, float]]:
     """
     Effectue des prédictions pour plusieurs employés.
     
+    Les entrées sont encodées en une seule matrice puis scorées en un appel vectorisé.
+    
     Args:
         inputs: Liste de dictionnaires des features
+        model_version: Version du modèle (version active par défaut)
         
     Returns:
         Liste de tuples (prediction, probability)
     """
-    results = []
-    for input_data in inputs:
-        pred, prob = predict_single(input_data)
-        results.append((pred, prob))
-    
-    return results
+    if not inputs:
+        return []
+
+    scorer = load_scorer(model_version)
+    X = scorer.encode(inputs)
+    probabilities = scorer.predict_proba(X)
+    predictions = scorer.predict(X)
+    _observe(model_version, X)
+
+    return [(int(pred), float(prob)) for pred, prob in zip(predictions, probabilities)]
+
+
+def rank_batch(inputs: list[dict], k: int, model_version: Optional[str] = None) -> list[tuple[int, int, float]]:
+    """
+    Score un lot et ne garde que les k employés les plus à risque.
+
+    Args:
+        inputs: Liste de dictionnaires des features
+        k: Nombre d'employés retenus
+        model_version: Version du modèle (version active par défaut)
+
+    Returns:
+        Liste de tuples (index dans le lot, prediction, probability), par probabilité décroissante
+    """
+    if not inputs:
+        return []
+
+    scorer = load_scorer(model_version)
+    X = scorer.encode(inputs)
+    probabilities = scorer.predict_proba(X)
+    predictions = scorer.predict(X)
+    _observe(model_version, X)
+
+    return [(int(i), int(predictions[i]), float(probabilities[i])) for i in top_k_indices(probabilities, k)]
+
+
+def predict_columns(columns: dict, n_rows: int, model_version: Optional[str] = None) -> tuple:
+    """
+    Effectue des prédictions à partir de colonnes déjà validées.
+
+    Args:
+        columns: Dictionnaire champ -> tableau de valeurs
+        n_rows: Nombre d'employés
+        model_version: Version du modèle (version active par défaut)
+
+    Returns:
+        Tuple (predictions, probabilities) de tableaux numpy
+    """
+    scorer = load_scorer(model_version)
+    X = scorer.encode_columns(columns, n_rows)
+    _observe(model_version, X)
+    return scorer.predict(X), scorer.predict_proba(X)
+
+
+def explain_batch(inputs: list[dict], top_k: int = 5, model_version: Optional[str] = None) -> list[tuple]:
+    """
+    Prédictions et principales contributions par employé.
+
+    Args:
+        inputs: Liste de dictionnaires des features
+        top_k: Nombre de features retournées par employé
+        model_version: Version du modèle (version active par défaut)
+
+    Returns:
+        Liste de tuples (prediction, probability, [(feature, valeur, contribution), ...])
+
+    Raises:
+        NotImplementedError: si le modèle n'est pas linéaire compilé
+    """
+    scorer = load_scorer(model_version)
+    if not isinstance(scorer, CompiledModel):
+        raise NotImplementedError("Explications disponibles uniquement pour un modèle compilé")
+    if not inputs:
+        return []
+
+    X = scorer.encode(inputs)
+    _observe(model_version, X)
+    probabilities, top, contributions = scorer.explain(X, top_k)
+    values = np.take_along_axis(X, top, axis=1)
+    names = scorer.feature_names
+
+    return [
+        (
+            int(prob > 0.5),
+            float(prob),
+            [(names[j], float(v), float(c)) for j, v, c in zip(row_top, row_values, row_contrib)]
+        )
+        for prob, row_top, row_values, row_contrib in zip(probabilities, top, values, contributions)
+    ]
+
+
+def simulate(inputs: list[dict], perturbations: list[tuple], model_version: Optional[str] = None) -> tuple:
+    """
+    Score toutes les variantes d'une grille de perturbations.
+
+    Les variantes sont construites directement dans l'espace encodé ; pour un
+    modèle compilé (linéaire), leur matrice n'est même pas matérialisée.
+
+    Args:
+        inputs: Liste de dictionnaires des features
+        perturbations: Liste de tuples (champ, opération, valeurs)
+        model_version: Version du modèle (version active par défaut)
+
+    Returns:
+        Tuple (probabilités de base (n,), probabilités des variantes (n, L1, ..., Lm))
+    """
+    scorer = load_scorer(model_version)
+    X = scorer.encode(inputs)
+    blocks = [
+        scorer.encoder.perturbation_block(X, field, operation, values)
+        for field, operation, values in perturbations
+    ]
+
+    if isinstance(scorer, CompiledModel):
+        grid = scorer.simulate(X, blocks)
+    else:
+        shape = (X.shape[0],) + tuple(block.shape[1] for _, block in blocks)
+        grid = scorer.predict_proba(scorer.encoder.expand_variants(X, blocks)).reshape(shape)
+
+    return scorer.predict_proba(X), grid
 
 
 def is_model_loaded() -> bool:
     """Vérifie si le modèle est chargé et accessible."""
     try:
-        load_model()
+        load_scorer()
         return True
     except Exception:
         return False
@@ -0,0 +1,57 @@
+"""
+Router FastAPI pour l'état du registre de modèles.
+"""
+
+from fastapi import APIRouter, HTTPException
+
+from .model_loader import get_registry
+
+try:
+    from src.importance import load_importance
+except ImportError:
+    from ..importance import load_importance
+
+
+router = APIRouter(prefix="/models", tags=["Models"])
+
+
+@router.get(
+    "",
+    summary="Versions de modèles disponibles",
+    description="Liste les versions du registre, la version active, le candidat et les modèles en mémoire"
+)
+async def list_models() -> dict:
+    """
+    Retourne l'état du registre de modèles.
+
+    - **active** / **candidate**: versions servies par défaut et en canary/shadow
+    - **versions**: métadonnées de chaque version (features, métriques, hash des données)
+    - **resident**: versions chargées en mémoire (ordre LRU)
+    - **shadow**: écart cumulé entre le modèle servi et le candidat
+    """
+    return get_registry().status()
+
+
+@router.get(
+    "/{version}/importance",
+    summary="Importance globale des facteurs",
+    description="Importance par permutation calculée à l'entraînement et mise en cache avec la version"
+)
+async def get_importance(version: str) -> dict:
+    """
+    Retourne l'importance par permutation d'une version du registre.
+
+    - **fields**: baisse de ROC AUC par champ (familles one-hot permutées ensemble)
+    - **features**: baisse de ROC AUC par feature encodée
+    - **data_hash**: hash des données sur lesquelles l'importance a été calculée
+    """
+    registry = get_registry()
+    if version not in registry.versions():
+        raise HTTPException(status_code=404, detail=f"Version de modèle inconnue: {version}")
+    importance = load_importance(registry.root / version)
+    if importance is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Importance non calculée pour la version {version} (python src/train.py --importance-only)"
+        )
+    return importance
@@ -0,0 +1,267 @@
+"""
+Outils de profilage à la demande pour diagnostiquer l'API en production.
+
+Deux modes sont disponibles lorsque PROFILING_ENABLED=1 :
+- un profileur par échantillonnage (POST /admin/profile) qui capture les piles
+  de tous les threads pendant N secondes ou N requêtes, au format "collapsed
+  stacks" directement utilisable par flamegraph.pl / speedscope ;
+- un mode par requête : l'en-tête X-Profile renvoie les statistiques cProfile
+  de l'appel à la place de la réponse normale, restreintes au code du projet
+  (src/) pour ne pas être noyées sous les frames asyncio/Starlette.
+
+Le middleware est un middleware ASGI pur : tant que le profilage est
+désactivé, il se contente de transmettre la requête à l'application.
+
+Ces deux modes sont réservés aux administrateurs (en-tête X-Admin-Token).
+"""
+
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from starlette.datastructures import Headers
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Configuration (désactivé par défaut)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0").lower() in ("1", "true", "yes")
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+SAMPLING_INTERVAL = float(os.getenv("PROFILING_INTERVAL", "0.005"))
+
+# Limites d'une session de profilage
+MAX_PROFILE_SECONDS = 300.0
+MAX_PROFILE_REQUESTS = 10_000
+PROFILE_SORT_KEYS = ("cumulative", "tottime", "calls", "ncalls")
+PROFILE_MAX_ROWS = 50
+
+# Seules les fonctions définies sous src/ figurent dans les statistiques cProfile
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SRC_PATTERN = re.escape(SRC_DIR + os.sep)
+
+
+class SamplingProfiler:
+    """
+    Profileur statistique : échantillonne périodiquement les piles d'appel
+    de tous les threads via sys._current_frames() et les agrège au format
+    "collapsed stacks" (frame1;frame2;frame3 count).
+    """
+
+    def __init__(self, interval: float = SAMPLING_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.n_samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _format_frame(frame) -> str:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+        return f"{module}:{code.co_name}"
+
+    def _collapse(self, frame) -> str:
+        stack = []
+        while frame is not None:
+            stack.append(self._format_frame(frame))
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.is_set():
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self.samples[self._collapse(frame)] += 1
+            self.n_samples += 1
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Démarre l'échantillonnage dans un thread démon."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête l'échantillonnage et attend la fin du thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def collapsed(self) -> str:
+        """Retourne les piles agrégées, une par ligne, triées par fréquence."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+
+class _ProfileSession:
+    """Session de profilage en cours (une seule à la fois par worker)."""
+
+    def __init__(self, profiler: SamplingProfiler, max_requests: Optional[int]):
+        self.profiler = profiler
+        self.max_requests = max_requests
+        self.requests_seen = 0
+        self.done = asyncio.Event()
+
+    def record_request(self):
+        self.requests_seen += 1
+        if self.max_requests is not None and self.requests_seen >= self.max_requests:
+            self.done.set()
+
+
+_active_session: Optional[_ProfileSession] = None
+_cprofile_lock = threading.Lock()
+
+
+def _check_admin(token: Optional[str]):
+    """Lève une HTTPException si le profilage est désactivé ou le jeton invalide."""
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not ADMIN_TOKEN or not token or not secrets.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs")
+
+
+def _is_admin(token: Optional[str]) -> bool:
+    try:
+        _check_admin(token)
+        return True
+    except HTTPException:
+        return False
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.post(
+    "/profile",
+    response_class=PlainTextResponse,
+    summary="Profilage par échantillonnage",
+    description="Échantillonne les piles d'appel pendant N secondes ou N requêtes (format collapsed stacks)"
+)
+async def profile(
+    seconds: Optional[float] = Query(None, gt=0, le=MAX_PROFILE_SECONDS),
+    requests: Optional[int] = Query(None, gt=0, le=MAX_PROFILE_REQUESTS),
+    timeout: float = Query(60.0, gt=0, le=MAX_PROFILE_SECONDS),
+    x_admin_token: Optional[str] = Header(None),
+) -> PlainTextResponse:
+    """
+    Lance une session de profilage et renvoie les piles agrégées.
+
+    - **seconds**: durée d'échantillonnage
+    - **requests**: nombre de requêtes à observer (borné par **timeout**)
+
+    La sortie peut être passée telle quelle à `flamegraph.pl` ou importée dans speedscope.
+    """
+    global _active_session
+    _check_admin(x_admin_token)
+
+    if (seconds is None) == (requests is None):
+        raise HTTPException(status_code=422, detail="Préciser exactement un paramètre: 'seconds' ou 'requests'")
+    if _active_session is not None:
+        raise HTTPException(status_code=409, detail="Une session de profilage est déjà en cours")
+
+    profiler = SamplingProfiler()
+    session = _ProfileSession(profiler, requests)
+    _active_session = session
+    started = time.perf_counter()
+    profiler.start()
+    try:
+        if seconds is not None:
+            await asyncio.sleep(seconds)
+        else:
+            try:
+                await asyncio.wait_for(session.done.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        profiler.stop()
+        _active_session = None
+
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={
+            "X-Profile-Samples": str(profiler.n_samples),
+            "X-Profile-Requests": str(session.requests_seen),
+            "X-Profile-Duration": f"{time.perf_counter() - started:.3f}",
+        }
+    )
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI : compte les requêtes pour la session d'échantillonnage
+    en cours et gère le mode cProfile par requête (en-tête X-Profile).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        session = _active_session
+        headers = Headers(scope=scope)
+        sort_key = headers.get("x-profile")
+
+        if (
+            sort_key is not None
+            and _is_admin(headers.get("x-admin-token"))
+            and _cprofile_lock.acquire(blocking=False)
+        ):
+            if sort_key not in PROFILE_SORT_KEYS:
+                sort_key = "cumulative"
+            try:
+                await self._profile_single_call(scope, receive, send, sort_key)
+            finally:
+                _cprofile_lock.release()
+        else:
+            await self.app(scope, receive, send)
+
+        if session is not None and not scope["path"].startswith(router.prefix):
+            session.record_request()
+
+    async def _profile_single_call(self, scope, receive, send, sort_key: str):
+        """Exécute la requête sous cProfile et renvoie les statistiques du code de src/ en texte."""
+        status_code = 500
+        body_length = 0
+
+        async def capture(message):
+            # La réponse normale (sérialisation comprise) est produite mais pas envoyée
+            nonlocal status_code, body_length
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body_length += len(message.get("body", b""))
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            profiler.disable()
+
+        output = io.StringIO()
+        stats = pstats.Stats(profiler, stream=output)
+        stats.sort_stats(sort_key).print_stats(_SRC_PATTERN, PROFILE_MAX_ROWS)
+        response = PlainTextResponse(
+            output.getvalue(),
+            headers={
+                "X-Profile-Original-Status": str(status_code),
+                "X-Profile-Original-Length": str(body_length),
+            }
+        )
+        await response(scope, receive, send)
@@ -2,23 +2,72 @@
 Router FastAPI pour les endpoints de prédiction.
 """
 
-from fastapi import APIRouter, HTTPException
+import json
+from typing import Optional
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+
+try:
+    from src.scoring import LABELS
+except ImportError:
+    from ..scoring import LABELS
 
 from .schemas import (
     EmployeeInput,
     PredictionResponse,
     BatchPredictionRequest,
-    BatchPredictionResponse
+    BatchPredictionResponse,
+    BatchRankingResponse,
+    RankedPredictionResponse,
+    ColumnarBatchRequest,
+    ColumnarPredictionResponse,
+    FeatureContribution,
+    ExplanationResponse,
+    BatchExplanationResponse
+)
+from .model_loader import (
+    explain_batch,
+    predict_single,
+    predict_batch,
+    predict_columns,
+    rank_batch,
+    resolve_model_version,
+    run_shadow,
+    shadow_version
 )
-from .model_loader import predict_single, predict_batch
+from .columnar import EMPLOYEE_SPECS, rows_to_columns, validate_columns
+from . import arrow_io
 
 
 router = APIRouter(prefix="/predict", tags=["Predictions"])
 
+ModelVersionQuery = Query(None, description="Version du modèle à utiliser (version active par défaut)")
+TopKQuery = Query(5, ge=1, le=100, description="Nombre de features retournées par employé")
+
 
 def get_label(prediction: int) -> str:
     """Retourne l'interprétation textuelle de la prédiction."""
-    return "Risque de départ" if prediction == 1 else "Stable"
+    return LABELS[int(prediction)]
+
+
+def select_model_version(requested: Optional[str]) -> str:
+    """Résout la version servie (épinglée ou canary) ; 404 si elle est inconnue."""
+    try:
+        return resolve_model_version(requested)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Version de modèle inconnue: {requested}")
+
+
+def schedule_shadow(background_tasks: BackgroundTasks, served_version: str, requested: Optional[str],
+                    probabilities, **inputs) -> None:
+    """Programme le scoring shadow du candidat après l'envoi de la réponse."""
+    if requested is not None:
+        return  # Version épinglée par le client : pas de shadow
+    candidate = shadow_version(served_version)
+    if candidate is not None:
+        background_tasks.add_task(run_shadow, candidate, probabilities, **inputs)
 
 
 @router.post(
@@ -27,21 +76,30 @@ def get_label(prediction: int) -> str:
     summary="Prédiction pour un employé",
     description="Prédit si un employé risque de quitter l'entreprise"
 )
-async def predict_employee(employee: EmployeeInput) -> PredictionResponse:
+async def predict_employee(
+    employee: EmployeeInput,
+    background_tasks: BackgroundTasks,
+    model_version: Optional[str] = ModelVersionQuery
+) -> PredictionResponse:
     """
     Effectue une prédiction de turnover pour un employé.
     
     - **prediction**: 0 = l'employé reste, 1 = l'employé risque de partir
     - **probability**: Probabilité de départ (0.0 à 1.0)
     - **label**: Interprétation textuelle du résultat
+    - **model_version**: Version du modèle ayant produit la prédiction
     """
+    version = select_model_version(model_version)
     try:
-        prediction, probability = predict_single(employee.model_dump())
+        input_data = employee.model_dump()
+        prediction, probability = predict_single(input_data, version)
+        schedule_shadow(background_tasks, version, model_version, [probability], inputs=[input_data])
         
         return PredictionResponse(
             prediction=prediction,
             probability=probability,
-            label=get_label(prediction)
+            label=get_label(prediction),
+            model_version=version
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur de prédiction: {str(e)}")
@@ -53,21 +111,29 @@ async def predict_employee(employee: EmployeeInput) -> PredictionResponse:
     summary="Prédictions multiples",
     description="Prédit le turnover pour plusieurs employés en une seule requête"
 )
-async def predict_batch_employees(request: BatchPredictionRequest) -> BatchPredictionResponse:
+async def predict_batch_employees(
+    request: BatchPredictionRequest,
+    background_tasks: BackgroundTasks,
+    model_version: Optional[str] = ModelVersionQuery
+) -> BatchPredictionResponse:
     """
     Effectue des prédictions pour plusieurs employés.
     
     Utile pour analyser un département ou une équipe entière.
     """
+    version = select_model_version(model_version)
     try:
         inputs = [emp.model_dump() for emp in request.employees]
-        results = predict_batch(inputs)
+        results = predict_batch(inputs, version)
+        if results:
+            schedule_shadow(background_tasks, version, model_version, [prob for _, prob in results], inputs=inputs)
         
         predictions = [
             PredictionResponse(
                 prediction=pred,
                 probability=prob,
-                label=get_label(pred)
+                label=get_label(pred),
+                model_version=version
             )
             for pred, prob in results
         ]
@@ -78,3 +144,260 @@ async def predict_batch_employees(request: BatchPredictionRequest) -> BatchPredi
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur de prédiction batch: {str(e)}")
+
+
+@router.post(
+    "/batch/top",
+    response_model=BatchRankingResponse,
+    summary="Employés les plus à risque d'un lot",
+    description="Score un lot et renvoie les k employés les plus à risque"
+)
+async def rank_batch_employees(
+    request: BatchPredictionRequest,
+    k: int = Query(10, ge=1, le=10_000, description="Nombre d'employés retournés"),
+    model_version: Optional[str] = ModelVersionQuery
+) -> BatchRankingResponse:
+    """
+    Classe les employés d'un lot par probabilité de départ décroissante.
+
+    Seuls les **k** premiers sont sélectionnés (sélection partielle) puis
+    triés : le lot complet n'est jamais trié.
+    """
+    version = select_model_version(model_version)
+    try:
+        results = rank_batch([emp.model_dump() for emp in request.employees], k, version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur de prédiction batch: {str(e)}")
+
+    predictions = [
+        RankedPredictionResponse(
+            rank=rank,
+            index=index,
+            prediction=pred,
+            probability=prob,
+            label=get_label(pred),
+            model_version=version
+        )
+        for rank, (index, pred, prob) in enumerate(results, start=1)
+    ]
+    return BatchRankingResponse(predictions=predictions, total=len(request.employees))
+
+
+BINARY_MEDIA_TYPE = "application/octet-stream"
+
+
+async def _parse_columnar_body(request: Request) -> tuple[dict, int, list]:
+    """Lit le corps JSON brut et le valide colonne par colonne (sans Pydantic par ligne)."""
+    try:
+        payload = json.loads(await request.body())
+    except ValueError as e:
+        raise RequestValidationError([{"type": "json_invalid", "loc": ["body"], "msg": f"JSON invalide: {e}"}])
+
+    if not isinstance(payload, dict) or ("employees" in payload) == ("columns" in payload):
+        raise RequestValidationError([{
+            "type": "value_error", "loc": ["body"],
+            "msg": "Le corps doit contenir exactement une clé: 'employees' ou 'columns'"
+        }])
+
+    if "employees" in payload:
+        rows = payload["employees"]
+        if not isinstance(rows, list):
+            raise RequestValidationError([{"type": "list_type", "loc": ["body", "employees"],
+                                           "msg": "Input should be a valid list"}])
+        columns, errors = rows_to_columns(rows)
+        if errors:
+            raise RequestValidationError(errors)
+        return columns, len(rows), ["body", "employees"]
+
+    columns = payload["columns"]
+    if not isinstance(columns, dict) or not all(isinstance(v, list) for v in columns.values()):
+        raise RequestValidationError([{"type": "dict_type", "loc": ["body", "columns"],
+                                       "msg": "Input should be an object of lists"}])
+    n_rows = max((len(v) for v in columns.values()), default=0)
+    return columns, n_rows, ["body", "columns"]
+
+
+@router.post(
+    "/batch/columnar",
+    response_model=ColumnarPredictionResponse,
+    summary="Prédictions multiples (chemin rapide)",
+    description="Validation vectorisée et réponse columnaire pour les gros lots",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": ColumnarBatchRequest.model_json_schema()}}
+        }
+    }
+)
+async def predict_batch_columnar(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    model_version: Optional[str] = ModelVersionQuery
+) -> Response:
+    """
+    Effectue des prédictions pour un gros lot d'employés.
+
+    Le corps contient soit `employees` (même format que /predict/batch), soit
+    `columns` (champ -> liste de valeurs). Les contraintes d'EmployeeInput sont
+    vérifiées colonne par colonne ; les erreurs sont renvoyées par ligne (422).
+
+    La réponse est columnaire : `predictions` et `probabilities` dans l'ordre
+    des employés. Avec `Accept: application/octet-stream`, le corps est binaire :
+    n octets de prédictions (uint8) suivis de n probabilités float64 little-endian.
+    """
+    columns, n_rows, loc_prefix = await _parse_columnar_body(request)
+    validated, errors = validate_columns(
+        columns, n_rows, tuple(loc_prefix), row_major=loc_prefix[-1] == "employees"
+    )
+    if errors:
+        raise RequestValidationError(errors)
+
+    version = select_model_version(model_version)
+    try:
+        predictions, probabilities = predict_columns(validated, n_rows, version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur de prédiction batch: {str(e)}")
+    if n_rows:
+        schedule_shadow(background_tasks, version, model_version, probabilities, columns=validated, n_rows=n_rows)
+
+    headers = {"X-Model-Version": version}
+    if BINARY_MEDIA_TYPE in request.headers.get("accept", ""):
+        body = predictions.astype("u1").tobytes() + probabilities.astype("<f8").tobytes()
+        return Response(body, media_type=BINARY_MEDIA_TYPE, headers={**headers, "X-Total": str(n_rows)})
+
+    return JSONResponse({
+        "predictions": predictions.tolist(),
+        "probabilities": probabilities.tolist(),
+        "total": n_rows,
+        "model_version": version
+    }, headers=headers)
+
+
+@router.post(
+    "/batch/arrow",
+    summary="Prédictions multiples (Arrow IPC / Parquet)",
+    description="Lot d'employés au format Apache Arrow IPC stream ou Parquet, résultats ajoutés en colonnes",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                media_type: {"schema": {"type": "string", "format": "binary"}}
+                for media_type in arrow_io.SUPPORTED_MEDIA_TYPES
+            }
+        }
+    }
+)
+async def predict_batch_arrow(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    model_version: Optional[str] = ModelVersionQuery
+) -> Response:
+    """
+    Effectue des prédictions pour un lot transmis en binaire columnaire.
+
+    - Content-Type `application/vnd.apache.arrow.stream` ou `application/vnd.apache.parquet`
+    - Une colonne par champ d'EmployeeInput
+    - La réponse reprend la table avec les colonnes `prediction` et `probability`,
+      dans le format de la requête (ou celui demandé par l'en-tête Accept)
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if media_type not in arrow_io.SUPPORTED_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Content-Type attendu: {' ou '.join(arrow_io.SUPPORTED_MEDIA_TYPES)}"
+        )
+    if not arrow_io.is_available():
+        raise HTTPException(status_code=501, detail="pyarrow n'est pas installé (pip install -e .[arrow])")
+
+    try:
+        table = arrow_io.read_table(await request.body(), media_type)
+    except ValueError as e:
+        raise RequestValidationError([{"type": "value_error", "loc": ["body"], "msg": f"Table illisible: {e}"}])
+
+    columns = arrow_io.table_to_columns(table, [spec.name for spec in EMPLOYEE_SPECS])
+    validated, errors = validate_columns(columns, table.num_rows, ("body",))
+    if errors:
+        raise RequestValidationError(errors)
+
+    version = select_model_version(model_version)
+    try:
+        predictions, probabilities = predict_columns(validated, table.num_rows, version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur de prédiction batch: {str(e)}")
+    if table.num_rows:
+        schedule_shadow(background_tasks, version, model_version, probabilities,
+                        columns=validated, n_rows=table.num_rows)
+
+    accept = request.headers.get("accept", "")
+    output_type = next((t for t in arrow_io.SUPPORTED_MEDIA_TYPES if t in accept), media_type)
+    result = arrow_io.append_predictions(table, predictions, probabilities)
+    return Response(arrow_io.write_table(result, output_type), media_type=output_type,
+                    headers={"X-Model-Version": version})
+
+
+def _explain(inputs: list[dict], top_k: int, version: str) -> list[ExplanationResponse]:
+    try:
+        results = explain_batch(inputs, top_k, version)
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur d'explication: {str(e)}")
+
+    return [
+        ExplanationResponse(
+            prediction=pred,
+            probability=prob,
+            label=get_label(pred),
+            model_version=version,
+            contributions=[
+                FeatureContribution(feature=name, value=value, contribution=contribution)
+                for name, value, contribution in contributions
+            ]
+        )
+        for pred, prob, contributions in results
+    ]
+
+
+@router.post(
+    "/explain",
+    response_model=ExplanationResponse,
+    summary="Prédiction expliquée pour un employé",
+    description="Prédit le risque de départ et renvoie les features qui y contribuent le plus"
+)
+async def explain_employee(
+    employee: EmployeeInput,
+    top_k: int = TopKQuery,
+    model_version: Optional[str] = ModelVersionQuery
+) -> ExplanationResponse:
+    """
+    Explique la prédiction d'un employé.
+
+    Le modèle étant une régression logistique sur features standardisées, la
+    contribution de chaque feature au logit est exactement
+    `coefficient x valeur standardisée`. Les **top_k** contributions les plus
+    fortes (en valeur absolue) sont renvoyées ; une contribution positive
+    augmente le risque de départ.
+    """
+    version = select_model_version(model_version)
+    return _explain([employee.model_dump()], top_k, version)[0]
+
+
+@router.post(
+    "/explain/batch",
+    response_model=BatchExplanationResponse,
+    summary="Prédictions expliquées multiples",
+    description="Explications pour plusieurs employés, calculées en une multiplication matricielle"
+)
+async def explain_batch_employees(
+    request: BatchPredictionRequest,
+    top_k: int = TopKQuery,
+    model_version: Optional[str] = ModelVersionQuery
+) -> BatchExplanationResponse:
+    """
+    Explique les prédictions de plusieurs employés.
+
+    Probabilités et contributions sont calculées dans la même passe vectorisée.
+    """
+    version = select_model_version(model_version)
+    explanations = _explain([emp.model_dump() for emp in request.employees], top_k, version)
+    return BatchExplanationResponse(explanations=explanations, total=len(explanations))
@@ -3,8 +3,10 @@ Schémas Pydantic pour la validation des données de l'API.
 Basés sur les colonnes réelles des datasets SIRH, EVAL et SONDAGE.
 """
 
+from datetime import datetime
+
 from pydantic import BaseModel, Field
-from typing import Optional, List, Literal
+from typing import Any, Dict, Optional, List, Literal, Union
 
 
 class EmployeeInput(BaseModel):
@@ -100,7 +102,8 @@ class PredictionResponse(BaseModel):
     prediction: int = Field(..., description="0=Reste, 1=Quitte")
     probability: float = Field(..., ge=0, le=1, description="Probabilité de départ")
     label: str = Field(..., description="Interprétation textuelle")
-    
+    model_version: Optional[str] = Field(None, description="Version du modèle ayant produit la prédiction")
+
 
 class BatchPredictionRequest(BaseModel):
     """Requête pour prédictions multiples."""
@@ -113,6 +116,174 @@ class BatchPredictionResponse(BaseModel):
     total: int
 
 
+class RankedPredictionResponse(PredictionResponse):
+    """Prédiction d'un employé classé parmi les plus à risque d'un lot."""
+    rank: int = Field(..., ge=1, description="Rang (1 = plus à risque)")
+    index: int = Field(..., ge=0, description="Position de l'employé dans la requête")
+
+
+class BatchRankingResponse(BaseModel):
+    """Les employés les plus à risque d'un lot, par probabilité décroissante."""
+    predictions: List[RankedPredictionResponse]
+    total: int = Field(..., description="Nombre d'employés scorés")
+
+
+class ColumnarBatchRequest(BaseModel):
+    """
+    Requête pour le endpoint batch rapide.
+    Fournir soit `employees` (liste d'objets), soit `columns` (champ -> liste de valeurs).
+    """
+    employees: Optional[List[Dict[str, Any]]] = None
+    columns: Optional[Dict[str, List[Any]]] = None
+
+
+class ColumnarPredictionResponse(BaseModel):
+    """Réponse columnaire : un tableau par attribut, dans l'ordre des employés."""
+    predictions: List[int]
+    probabilities: List[float]
+    total: int
+    model_version: str
+
+
+class FeatureContribution(BaseModel):
+    """Contribution d'une feature au score de risque (échelle logit)."""
+    feature: str = Field(..., description="Nom de la feature encodée")
+    value: float = Field(..., description="Valeur encodée de la feature")
+    contribution: float = Field(..., description="Coefficient x valeur standardisée (>0 : augmente le risque)")
+
+
+class ExplanationResponse(PredictionResponse):
+    """Prédiction accompagnée des principales contributions."""
+    contributions: List[FeatureContribution]
+
+
+class BatchExplanationResponse(BaseModel):
+    """Réponse pour explications multiples."""
+    explanations: List[ExplanationResponse]
+    total: int
+
+
+class Perturbation(BaseModel):
+    """Un axe de la grille de simulation : un champ et les valeurs à tester."""
+    feature: str = Field(..., description="Champ d'EmployeeInput à modifier")
+    operation: Literal["set", "add", "multiply"] = Field(
+        "set", description="'set' remplace la valeur, 'add'/'multiply' la modifient (champs numériques)"
+    )
+    values: List[Union[float, str]] = Field(..., min_length=1, description="Valeurs de l'axe")
+
+
+class SimulationRequest(BaseModel):
+    """Requête de simulation what-if : employés x produit cartésien des perturbations."""
+    employees: List[EmployeeInput] = Field(..., min_length=1)
+    perturbations: List[Perturbation] = Field(..., min_length=1)
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "employees": EmployeeInput.model_config["json_schema_extra"]["examples"],
+                    "perturbations": [
+                        {"feature": "revenu_mensuel", "operation": "multiply", "values": [1.0, 1.1, 1.2]},
+                        {"feature": "heure_supplementaires", "operation": "set", "values": ["Oui", "Non"]}
+                    ]
+                }
+            ]
+        }
+    }
+
+
+class SimulationResponse(BaseModel):
+    """
+    Résultats de simulation.
+    `probabilities[e][i1]...[im]` est la probabilité de l'employé e pour la
+    i1-ème valeur du premier axe, ..., la im-ème valeur du dernier axe.
+    """
+    perturbations: List[Perturbation]
+    shape: List[int]
+    base_probabilities: List[float]
+    probabilities: List[Any]
+    total_variants: int
+    model_version: str
+
+
+class EmployeeScoringResponse(BaseModel):
+    """Bilan d'un scoring des employés stockés en base."""
+    scored: int = Field(..., description="Nombre d'employés scorés")
+    skipped: int = Field(..., description="Employés inchangés depuis leur dernière prédiction (mode incrémental)")
+    at_risk: int = Field(..., description="Nombre d'employés à risque de départ")
+    encoded: int = Field(..., description="Employés ré-encodés (vecteur absent ou d'un autre encodeur)")
+    chunks: int = Field(..., description="Nombre de blocs lus en base")
+    seconds: float
+    rows_per_sec: float
+    model_version: str
+    imputed_fields: List[str] = Field(..., description="Champs absents de la table, remplacés par la moyenne d'entraînement")
+
+
+class PredictionStatisticsResponse(BaseModel):
+    """Statistiques des prédictions enregistrées."""
+    total_predictions: int
+    at_risk: int
+    stable: int
+    risk_ratio: float
+
+
+class AtRiskEmployee(BaseModel):
+    """Employé stocké et sa dernière probabilité de départ."""
+    rank: int = Field(..., ge=1, description="Rang (1 = plus à risque)")
+    employee_id: int
+    id_employee: Optional[int] = Field(None, description="Identifiant SIRH")
+    departement: str
+    poste: str
+    probability: float = Field(..., ge=0, le=1, description="Dernière probabilité de départ")
+    model_version: Optional[str] = None
+    predicted_at: Optional[datetime] = None
+
+
+class AtRiskRankingResponse(BaseModel):
+    """Classement des employés stockés par risque de départ."""
+    employees: List[AtRiskEmployee]
+    total: int
+
+
+class TrajectoryPoint(BaseModel):
+    """Probabilités d'un employé agrégées sur un intervalle de temps."""
+    bucket_start: datetime = Field(..., description="Début de l'intervalle (UTC)")
+    count: int = Field(..., description="Nombre de prédictions dans l'intervalle")
+    mean_probability: float
+    min_probability: float
+    max_probability: float
+
+
+class RiskTrajectoryResponse(BaseModel):
+    """Évolution du risque de départ d'un employé."""
+    employee_id: int
+    bucket_seconds: int = Field(..., description="Largeur des intervalles (secondes)")
+    total_predictions: int = Field(..., description="Prédictions sur la période")
+    points: List[TrajectoryPoint]
+
+
+class JobStatusResponse(BaseModel):
+    """Statut d'un job de scoring asynchrone."""
+    job_id: str
+    status: Literal["uploading", "queued", "running", "succeeded", "failed", "cancelled"]
+    input_format: str
+    model_version: str
+    total_rows: Optional[int] = Field(None, description="Employés du lot (estimé avant la fin, inconnu pour un JSON)")
+    processed_rows: int = Field(..., description="Employés traités")
+    failed_rows: int = Field(..., description="Employés invalides (non scorés)")
+    progress: Optional[float] = Field(None, ge=0, le=1, description="Fraction des employés traités")
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class JobListResponse(BaseModel):
+    """Liste de jobs."""
+    jobs: List[JobStatusResponse]
+    total: int
+
+
 class HealthResponse(BaseModel):
     """Réponse du endpoint santé."""
     status: str
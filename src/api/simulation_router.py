@@ -0,0 +1,111 @@
+"""
+Router FastAPI pour les simulations what-if.
+"""
+
+import os
+from typing import Optional
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from fastapi.exceptions import RequestValidationError
+
+from .schemas import SimulationRequest, SimulationResponse
+from .model_loader import load_scorer, simulate
+from .columnar import SPECS_BY_NAME, validate_column
+from .router import ModelVersionQuery, select_model_version
+
+
+router = APIRouter(prefix="/simulate", tags=["Simulation"])
+
+# Nombre maximal de variantes (employés x taille de la grille) par requête
+MAX_SIMULATION_VARIANTS = int(os.getenv("MAX_SIMULATION_VARIANTS", "2000000"))
+
+
+def _validate_perturbations(request: SimulationRequest, categorical_fields=frozenset()) -> list:
+    """
+    Vérifie champs, opérations et valeurs de chaque axe ; 422 avec chemins d'erreur sinon.
+
+    Args:
+        request: Requête de simulation
+        categorical_fields: Champs encodés en one-hot par le modèle, y compris des champs
+            entiers côté API (`augementation_salaire_precedente`) : 'set' uniquement
+    """
+    errors, axes, seen = [], [], set()
+    for i, perturbation in enumerate(request.perturbations):
+        loc = ("body", "perturbations", i)
+        spec = SPECS_BY_NAME.get(perturbation.feature)
+        if spec is None:
+            errors.append({"type": "value_error", "loc": list(loc + ("feature",)),
+                           "msg": f"Champ inconnu: {perturbation.feature}"})
+            continue
+        if spec.name in seen:
+            errors.append({"type": "value_error", "loc": list(loc + ("feature",)),
+                           "msg": f"Le champ {spec.name} apparaît dans plusieurs perturbations"})
+            continue
+        seen.add(spec.name)
+
+        if perturbation.operation != "set":
+            if spec.kind == "literal" or spec.name in categorical_fields:
+                errors.append({"type": "value_error", "loc": list(loc + ("operation",)),
+                               "msg": f"Seule l'opération 'set' s'applique au champ catégoriel {spec.name}"})
+                continue
+            values = perturbation.values
+            if not all(isinstance(v, (int, float)) for v in values):
+                errors.append({"type": "float_type", "loc": list(loc + ("values",)),
+                               "msg": "Input should be a list of numbers"})
+                continue
+            axes.append((spec.name, perturbation.operation, np.asarray(values, dtype=np.float64)))
+            continue
+
+        # 'set' : les valeurs doivent respecter les contraintes d'EmployeeInput
+        values, value_errors = validate_column(
+            spec, perturbation.values, lambda j, loc=loc: loc + ("values", int(j))
+        )
+        errors.extend(value_errors)
+        axes.append((spec.name, "set", values.tolist()))
+
+    if errors:
+        raise RequestValidationError(errors)
+    return axes
+
+
+@router.post(
+    "",
+    response_model=SimulationResponse,
+    summary="Simulation what-if",
+    description="Score chaque employé sur une grille de modifications de ses caractéristiques"
+)
+async def simulate_employees(
+    request: SimulationRequest,
+    model_version: Optional[str] = ModelVersionQuery
+) -> SimulationResponse:
+    """
+    Simule l'effet de modifications sur le risque de départ.
+
+    Chaque perturbation définit un axe (ex. `revenu_mensuel` x [1.0, 1.1, 1.2]) ;
+    toutes les combinaisons des axes sont évaluées pour chaque employé, en un
+    seul appel vectorisé. Un champ ne peut apparaître que dans un seul axe.
+    """
+    version = select_model_version(model_version)
+    axes = _validate_perturbations(request, load_scorer(version).encoder.categorical.keys())
+    shape = [len(request.employees)] + [len(values) for _, _, values in axes]
+    total_variants = int(np.prod(shape))
+    if total_variants > MAX_SIMULATION_VARIANTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Trop de variantes: {total_variants} > {MAX_SIMULATION_VARIANTS}"
+        )
+
+    try:
+        base, grid = simulate([emp.model_dump() for emp in request.employees], axes, version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur de simulation: {str(e)}")
+
+    return SimulationResponse(
+        perturbations=request.perturbations,
+        shape=shape,
+        base_probabilities=base.tolist(),
+        probabilities=grid.tolist(),
+        total_variants=total_variants,
+        model_version=version
+    )
@@ -0,0 +1,182 @@
+"""
+Opérations CRUD asynchrones pour la base de données HR Analytics.
+
+Mêmes opérations que crud.py, sur une AsyncSession (SQLAlchemy asyncio) :
+à utiliser dans les endpoints async de l'API.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .crud import (
+    latest_risk_values,
+    prepare_employee_data,
+    top_at_risk_query,
+    trajectory_bounds_query,
+    trajectory_buckets,
+    trajectory_query,
+    trajectory_result,
+)
+from .models import Employee, Prediction
+
+
+# ==================== EMPLOYEES ====================
+
+async def create_employee(db: AsyncSession, employee_data: dict, encoder=None) -> Employee:
+    """Crée un nouvel employé dans la base de données."""
+    db_employee = Employee(**prepare_employee_data(employee_data, encoder))
+    db.add(db_employee)
+    await db.commit()
+    await db.refresh(db_employee)
+    return db_employee
+
+
+async def get_employee(db: AsyncSession, employee_id: int) -> Optional[Employee]:
+    """Récupère un employé par son ID."""
+    return await db.get(Employee, employee_id)
+
+
+async def get_employees(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Employee]:
+    """Récupère une liste d'employés avec pagination."""
+    result = await db.scalars(select(Employee).order_by(Employee.id).offset(skip).limit(limit))
+    return list(result)
+
+
+async def get_employees_by_department(db: AsyncSession, departement: str) -> List[Employee]:
+    """Récupère les employés par département."""
+    result = await db.scalars(select(Employee).where(Employee.departement == departement))
+    return list(result)
+
+
+# ==================== PREDICTIONS ====================
+
+async def create_prediction(
+    db: AsyncSession,
+    employee_id: int,
+    prediction: int,
+    probability: float,
+    label: str,
+    model_version: str = "1.0.0"
+) -> Prediction:
+    """Crée une nouvelle prédiction liée à un employé (et la reporte sur l'employé)."""
+    db_prediction = Prediction(
+        employee_id=employee_id,
+        prediction=prediction,
+        probability=probability,
+        label=label,
+        model_version=model_version,
+        predicted_at=datetime.utcnow()
+    )
+    db.add(db_prediction)
+    await db.execute(
+        update(Employee).where(Employee.id == employee_id).values(**latest_risk_values(db_prediction))
+    )
+    await db.commit()
+    await db.refresh(db_prediction)
+    return db_prediction
+
+
+async def get_prediction(db: AsyncSession, prediction_id: int) -> Optional[Prediction]:
+    """Récupère une prédiction par son ID."""
+    return await db.get(Prediction, prediction_id)
+
+
+async def get_predictions(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Prediction]:
+    """Récupère une liste de prédictions avec pagination."""
+    result = await db.scalars(
+        select(Prediction).order_by(Prediction.predicted_at.desc()).offset(skip).limit(limit)
+    )
+    return list(result)
+
+
+async def get_predictions_by_employee(db: AsyncSession, employee_id: int) -> List[Prediction]:
+    """Récupère toutes les prédictions d'un employé, de la plus ancienne à la plus récente."""
+    result = await db.scalars(
+        select(Prediction).where(Prediction.employee_id == employee_id).order_by(Prediction.predicted_at)
+    )
+    return list(result)
+
+
+async def get_risk_trajectory(
+    db: AsyncSession,
+    employee_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    interval: Optional[str] = None,
+    max_points: int = 200
+) -> dict:
+    """Trajectoire de risque d'un employé, sous-échantillonnée par la base (voir crud.get_risk_trajectory)."""
+    first, last, total = (await db.execute(trajectory_bounds_query(employee_id, start, end))).one()
+    if not total:
+        return trajectory_result(employee_id, 0, 0, 0, [])
+    origin, width = trajectory_buckets(start or first, end or last, interval, max_points)
+    rows = (await db.execute(trajectory_query(employee_id, start, end, origin, width))).all()
+    return trajectory_result(employee_id, origin, width, total, rows)
+
+
+async def get_top_at_risk(
+    db: AsyncSession,
+    k: int = 50,
+    departement: Optional[str] = None,
+    poste: Optional[str] = None
+) -> List[Employee]:
+    """Récupère les k employés les plus à risque (dernière prédiction), filtrés par département/poste."""
+    return list(await db.scalars(top_at_risk_query(k, departement, poste)))
+
+
+async def get_high_risk_predictions(db: AsyncSession, threshold: float = 0.5) -> List[Prediction]:
+    """Récupère les prédictions à haut risque (probabilité > seuil)."""
+    result = await db.scalars(select(Prediction).where(Prediction.probability >= threshold))
+    return list(result)
+
+
+# ==================== COMBINED OPERATIONS ====================
+
+async def create_employee_with_prediction(
+    db: AsyncSession,
+    employee_data: dict,
+    prediction: int,
+    probability: float,
+    label: str,
+    model_version: str = "1.0.0",
+    encoder=None
+) -> tuple:
+    """Crée un employé et sa prédiction en une seule transaction."""
+    db_employee = Employee(**prepare_employee_data(employee_data, encoder))
+    db.add(db_employee)
+    await db.flush()  # Pour obtenir l'ID sans commit
+
+    db_prediction = Prediction(
+        employee_id=db_employee.id,
+        prediction=prediction,
+        probability=probability,
+        label=label,
+        model_version=model_version,
+        content_hash=db_employee.content_hash,
+        predicted_at=datetime.utcnow()
+    )
+    db.add(db_prediction)
+    for column, value in latest_risk_values(db_prediction).items():
+        setattr(db_employee, column, value)
+    await db.commit()
+    await db.refresh(db_employee)
+    await db.refresh(db_prediction)
+
+    return db_employee, db_prediction
+
+
+async def get_statistics(db: AsyncSession) -> dict:
+    """Retourne des statistiques sur les prédictions (une seule requête)."""
+    total, at_risk = (await db.execute(
+        select(func.count(), func.coalesce(func.sum(case((Prediction.prediction == 1, 1), else_=0)), 0))
+    )).one()
+
+    return {
+        "total_predictions": total,
+        "at_risk": at_risk,
+        "stable": total - at_risk,
+        "risk_ratio": at_risk / total if total > 0 else 0
+    }
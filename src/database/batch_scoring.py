@@ -0,0 +1,347 @@
+"""
+Scoring des employés stockés, directement depuis la base de données.
+Usage: python -m src.database.batch_scoring --departement Consulting
+
+Les employés sont lus par un curseur côté serveur (yield_per) en blocs de
+taille fixe ; chaque bloc est scoré en un appel vectorisé et ses
+prédictions sont insérées en une seule requête (executemany). La mémoire
+reste constante quel que soit le nombre d'employés. La dernière probabilité
+est aussi reportée sur chaque employé (classement par risque indexé).
+
+Chaque employé stocke son vecteur de features encodé (float32) et la
+version de l'encodeur : la matrice d'un bloc est relue directement, et
+seuls les employés nouveaux ou encodés par un autre encodeur sont
+ré-encodés depuis leurs champs bruts.
+
+En mode incrémental (--incremental), seuls les employés nouveaux, modifiés
+(empreinte de leurs champs bruts différente de celle de leur dernière
+prédiction) ou scorés par une autre version du modèle sont rescorés.
+"""
+
+import argparse
+import time
+from datetime import datetime
+from typing import Iterator, Optional
+
+import numpy as np
+from sqlalchemy import bindparam, func, insert, or_, select, update
+from sqlalchemy.engine import Engine
+
+from .models import Employee, Prediction, INPUT_COLUMNS
+from ..scoring import FEATURE_DTYPE, LABELS, content_hash, pack_features, unpack_features
+
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def _field_columns(encoder, field: str) -> list:
+    """Indices des features encodées d'un champ brut."""
+    if field in encoder.numeric:
+        return [encoder.numeric[field]]
+    return list(encoder.categorical.get(field, {}).values())
+
+
+def _employee_filters(departement: Optional[str], id_min: Optional[int], id_max: Optional[int]) -> list:
+    table = Employee.__table__
+    filters = []
+    if departement is not None:
+        filters.append(table.c.departement == departement)
+    if id_min is not None:
+        filters.append(table.c.id >= id_min)
+    if id_max is not None:
+        filters.append(table.c.id <= id_max)
+    return filters
+
+
+def _changed_since_last_prediction(stmt, model_version: str):
+    """
+    Restreint une requête sur employees aux employés à rescorer : sans
+    prédiction, modifiés depuis leur dernière prédiction, ou dont la dernière
+    prédiction vient d'une autre version du modèle.
+    """
+    table, predictions = Employee.__table__, Prediction.__table__
+    latest = (
+        select(predictions.c.employee_id, func.max(predictions.c.id).label("prediction_id"))
+        .group_by(predictions.c.employee_id)
+        .subquery()
+    )
+    return (
+        stmt.outerjoin(latest, latest.c.employee_id == table.c.id)
+        .outerjoin(predictions, predictions.c.id == latest.c.prediction_id)
+        .where(or_(
+            predictions.c.id.is_(None),
+            table.c.content_hash.is_(None),
+            predictions.c.content_hash.is_(None),
+            predictions.c.content_hash != table.c.content_hash,
+            predictions.c.model_version != model_version,
+        ))
+    )
+
+
+def iter_employee_chunks(
+    conn,
+    departement: Optional[str] = None,
+    id_min: Optional[int] = None,
+    id_max: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    changed_for_version: Optional[str] = None
+) -> Iterator[tuple]:
+    """
+    Parcourt les vecteurs de features des employés par blocs (curseur côté serveur).
+
+    Args:
+        conn: Connexion SQLAlchemy
+        departement: Filtre optionnel sur le département
+        id_min, id_max: Bornes optionnelles (incluses) sur l'identifiant
+        changed_for_version: Si fourni, seuls les employés à rescorer pour cette
+            version du modèle sont parcourus
+
+    Yields:
+        Tuple (identifiants, vecteurs compactés, versions d'encodeur, empreintes)
+    """
+    table = Employee.__table__
+    stmt = select(table.c.id, table.c.features, table.c.encoder_version, table.c.content_hash)
+    stmt = stmt.where(*_employee_filters(departement, id_min, id_max)).order_by(table.c.id)
+    if changed_for_version is not None:
+        stmt = _changed_since_last_prediction(stmt, changed_for_version)
+
+    result = conn.execution_options(yield_per=chunk_size).execute(stmt)
+    for rows in result.partitions():
+        ids, blobs, versions, hashes = zip(*rows)
+        yield list(ids), list(blobs), list(versions), list(hashes)
+
+
+def count_employees(conn, departement: Optional[str] = None, id_min: Optional[int] = None,
+                    id_max: Optional[int] = None) -> int:
+    """Nombre d'employés correspondant aux filtres."""
+    stmt = select(func.count()).select_from(Employee.__table__)
+    return conn.execute(stmt.where(*_employee_filters(departement, id_min, id_max))).scalar()
+
+
+def read_raw_columns(conn, ids: list, fields: list) -> dict:
+    """Lit les champs bruts d'un ensemble d'employés, dans l'ordre de `ids`."""
+    table = Employee.__table__
+    stmt = select(table.c.id, *[table.c[field] for field in fields]).where(table.c.id.in_(ids))
+    rows = {row[0]: row[1:] for row in conn.execute(stmt)}
+    ordered = [rows[i] for i in ids]
+    return {field: [row[k] for row in ordered] for k, field in enumerate(fields)}
+
+
+def row_hashes(columns: dict, n_rows: int) -> list:
+    """Empreinte des champs bruts de chaque ligne (src.scoring.content_hash)."""
+    fields = list(columns)
+    return [
+        content_hash(dict(zip(fields, values)), INPUT_COLUMNS)
+        for values in zip(*(columns[field] for field in fields))
+    ] if fields else [content_hash({}, INPUT_COLUMNS)] * n_rows
+
+
+def encode_raw(encoder, columns: dict, n_rows: int, missing_fields: list) -> np.ndarray:
+    """
+    Encode des champs bruts lus en base.
+
+    Les champs absents de la table et les valeurs NULL sont marqués NaN dans
+    toutes leurs features ; ils sont remplacés au moment du scoring.
+    """
+    X = encoder.encode_columns(columns, n_rows)
+    for field in missing_fields:
+        X[:, _field_columns(encoder, field)] = np.nan
+    for field, values in columns.items():
+        null = np.fromiter((v is None for v in values), dtype=bool, count=n_rows)
+        if null.any():
+            X[np.ix_(null, _field_columns(encoder, field))] = np.nan
+    return X
+
+
+def impute_missing(X: np.ndarray, scorer) -> np.ndarray:
+    """
+    Remplace les features inconnues (NaN) par la moyenne d'entraînement du
+    modèle (contribution nulle au score), ou par 0 à défaut.
+    """
+    missing = np.isnan(X)
+    if missing.any():
+        fill = getattr(scorer, "mean", None)
+        X[missing] = np.broadcast_to(fill if fill is not None else 0.0, X.shape)[missing]
+    return X
+
+
+def store_encoded_rows(conn, ids: list, X: np.ndarray, encoder_version: str, hashes: list) -> None:
+    """Enregistre vecteurs compactés et empreintes d'un ensemble d'employés (une requête executemany)."""
+    table = Employee.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("employee_id"))
+        .values(features=bindparam("packed"), encoder_version=encoder_version, content_hash=bindparam("hash"))
+    )
+    conn.execute(stmt, [
+        {"employee_id": employee_id, "packed": packed, "hash": row_hash}
+        for employee_id, packed, row_hash in zip(ids, pack_features(X), hashes)
+    ])
+
+
+def store_latest_risk(conn, ids: list, probabilities: list, model_version: str, predicted_at: datetime) -> None:
+    """Reporte la dernière probabilité sur les employés (index de classement par risque)."""
+    table = Employee.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("employee_id"))
+        .values(
+            risk_probability=bindparam("probability"),
+            risk_model_version=model_version,
+            risk_predicted_at=predicted_at
+        )
+    )
+    conn.execute(stmt, [
+        {"employee_id": employee_id, "probability": probability}
+        for employee_id, probability in zip(ids, probabilities)
+    ])
+
+
+def load_feature_matrix(conn, encoder, ids: list, blobs: list, versions: list, hashes: list,
+                        missing_fields: list) -> tuple:
+    """
+    Matrice de features d'un bloc d'employés.
+
+    Les vecteurs stockés avec la version courante de l'encodeur sont lus
+    tels quels ; les autres (nouveaux employés, encodeur modifié, empreinte
+    manquante) sont ré-encodés depuis les champs bruts puis enregistrés avec
+    leur empreinte.
+
+    Returns:
+        Tuple (matrice (n, n_features), empreintes, nombre de lignes ré-encodées)
+    """
+    n = len(ids)
+    fresh = np.fromiter(
+        (
+            blob is not None and version == encoder.version and row_hash is not None
+            for blob, version, row_hash in zip(blobs, versions, hashes)
+        ),
+        dtype=bool, count=n
+    )
+    X = np.empty((n, encoder.n_features))
+    if fresh.any():
+        X[fresh] = unpack_features([blob for blob, ok in zip(blobs, fresh) if ok], encoder.n_features)
+
+    hashes = list(hashes)
+    stale = np.flatnonzero(~fresh)
+    if stale.size:
+        stale_ids = [ids[i] for i in stale]
+        columns = read_raw_columns(conn, stale_ids, INPUT_COLUMNS)
+        X_stale = encode_raw(encoder, columns, stale.size, missing_fields)
+        stale_hashes = row_hashes(columns, stale.size)
+        store_encoded_rows(conn, stale_ids, X_stale, encoder.version, stale_hashes)
+        # Même précision que les vecteurs relus : le score ne dépend pas du chemin
+        X[stale] = X_stale.astype(FEATURE_DTYPE)
+        for i, row_hash in zip(stale, stale_hashes):
+            hashes[i] = row_hash
+    return X, hashes, int(stale.size)
+
+
+def score_employees(
+    bind: Engine,
+    scorer,
+    model_version: str,
+    departement: Optional[str] = None,
+    id_min: Optional[int] = None,
+    id_max: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    incremental: bool = False
+) -> dict:
+    """
+    Score les employés stockés et enregistre leurs prédictions.
+
+    Toutes les prédictions du job sont écrites dans une seule transaction.
+
+    Args:
+        bind: Moteur SQLAlchemy
+        scorer: Modèle chargé (src.scoring.CompiledModel ou équivalent)
+        model_version: Version enregistrée avec chaque prédiction
+        incremental: Ne scorer que les employés nouveaux, modifiés depuis leur
+            dernière prédiction ou scorés par une autre version du modèle
+
+    Returns:
+        Statistiques du job (employés scorés, ignorés, à risque, ré-encodés, débit...)
+    """
+    encoder = scorer.encoder
+    table_columns = set(Employee.__table__.columns.keys())
+    missing = [f for f in encoder.input_fields if f not in table_columns]
+
+    scored = at_risk = encoded = chunks = 0
+    predicted_at = datetime.utcnow()
+    started = time.perf_counter()
+
+    with bind.begin() as conn:
+        selected = count_employees(conn, departement, id_min, id_max) if incremental else None
+        chunk_iter = iter_employee_chunks(
+            conn, departement, id_min, id_max, chunk_size,
+            changed_for_version=model_version if incremental else None
+        )
+        for ids, blobs, versions, hashes in chunk_iter:
+            X, hashes, n_encoded = load_feature_matrix(conn, encoder, ids, blobs, versions, hashes, missing)
+            X = impute_missing(X, scorer)
+            probabilities = scorer.predict_proba(X).tolist()
+            predictions = scorer.predict(X)
+
+            conn.execute(insert(Prediction), [
+                {
+                    "employee_id": employee_id,
+                    "prediction": prediction,
+                    "probability": probability,
+                    "label": LABELS[prediction],
+                    "model_version": model_version,
+                    "content_hash": row_hash,
+                    "predicted_at": predicted_at,
+                }
+                for employee_id, prediction, probability, row_hash
+                in zip(ids, predictions.tolist(), probabilities, hashes)
+            ])
+            store_latest_risk(conn, ids, probabilities, model_version, predicted_at)
+            scored += len(ids)
+            at_risk += int(predictions.sum())
+            encoded += n_encoded
+            chunks += 1
+
+    seconds = time.perf_counter() - started
+    return {
+        "scored": scored,
+        "skipped": selected - scored if incremental else 0,
+        "at_risk": at_risk,
+        "encoded": encoded,
+        "chunks": chunks,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(scored / seconds, 1) if seconds > 0 else 0.0,
+        "model_version": model_version,
+        "imputed_fields": missing,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score les employés stockés en base")
+    parser.add_argument("--departement", help="Département à scorer (tous par défaut)")
+    parser.add_argument("--id-min", type=int, help="Identifiant minimal (inclus)")
+    parser.add_argument("--id-max", type=int, help="Identifiant maximal (inclus)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Employés par bloc")
+    parser.add_argument("--model-version", help="Version du modèle (version active par défaut)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Ne scorer que les employés nouveaux ou modifiés (ou tous si le modèle a changé)")
+    args = parser.parse_args(argv)
+
+    from .connection import engine
+    from ..api.model_loader import get_registry, load_scorer, resolve_model_version
+
+    version = resolve_model_version(args.model_version) if args.model_version else get_registry().config()["active"]
+    stats = score_employees(
+        engine, load_scorer(version), version,
+        departement=args.departement, id_min=args.id_min, id_max=args.id_max,
+        chunk_size=args.chunk_size, incremental=args.incremental
+    )
+
+    print(f"{stats['scored']} employés scorés, {stats['skipped']} inchangés "
+          f"({stats['at_risk']} à risque, {stats['encoded']} ré-encodés) "
+          f"en {stats['seconds']}s - {stats['rows_per_sec']} lignes/s, modèle {version}")
+    if stats["imputed_fields"]:
+        print(f"Champs absents de la table (moyenne d'entraînement): {', '.join(stats['imputed_fields'])}")
+
+
+if __name__ == "__main__":
+    main()
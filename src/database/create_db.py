@@ -12,6 +12,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from src.database.connection import engine, Base, test_connection
 from src.database.models import Employee, Prediction
 
+# Colonnes et index ajoutés depuis la création initiale du schéma
+MIGRATION_FILE = Path(__file__).parent.parent.parent / "scripts" / "migrate.sql"
+
 
 def create_tables():
     """Crée toutes les tables définies dans les modèles."""
@@ -20,6 +23,17 @@ def create_tables():
     print("Tables créées avec succès!")
 
 
+def migrate_tables():
+    """Ajoute aux tables existantes les colonnes et index manquants (PostgreSQL, idempotent)."""
+    if engine.dialect.name != "postgresql":
+        print("Migration ignorée (PostgreSQL uniquement)")
+        return
+    print("Migration du schéma...")
+    with engine.begin() as connection:
+        connection.exec_driver_sql(MIGRATION_FILE.read_text(encoding="utf-8"))
+    print("Schéma à jour!")
+
+
 def drop_tables():
     """Supprime toutes les tables (ATTENTION: perte de données)."""
     print("Suppression des tables...")
@@ -44,6 +58,10 @@ def init_database():
     # Création des tables
     print("\n2. Création des tables...")
     create_tables()
+
+    # Tables créées par une version antérieure
+    print("\n3. Migration des tables existantes...")
+    migrate_tables()
     
     print("\n" + "=" * 50)
     print("Base de données initialisée avec succès!")
@@ -2,17 +2,40 @@
 Opérations CRUD pour la base de données HR Analytics.
 """
 
+import math
+from datetime import datetime, timezone
 from typing import List, Optional
+from sqlalchemy import BigInteger, cast, extract, func, literal, select
 from sqlalchemy.orm import Session
 
-from .models import Employee, Prediction
+from .models import Employee, Prediction, INPUT_COLUMNS, INPUT_DEFAULTS
+from ..scoring import content_hash, pack_features
+
+
+# Largeur des intervalles de trajectoire (secondes)
+TRAJECTORY_INTERVALS = {"hour": 3600, "day": 86400, "week": 7 * 86400}
 
 
 # ==================== EMPLOYEES ====================
 
-def create_employee(db: Session, employee_data: dict) -> Employee:
-    """Crée un nouvel employé dans la base de données."""
-    db_employee = Employee(**employee_data)
+def prepare_employee_data(employee_data: dict, encoder=None) -> dict:
+    """
+    Complète les données d'un employé avec l'empreinte de ses champs bruts et,
+    si un encodeur est fourni, son vecteur de features (et la version de l'encodeur).
+    """
+    data = {**employee_data, "content_hash": content_hash({**INPUT_DEFAULTS, **employee_data}, INPUT_COLUMNS)}
+    if encoder is not None:
+        data["features"] = pack_features(encoder.encode([employee_data]))[0]
+        data["encoder_version"] = encoder.version
+    return data
+
+
+def create_employee(db: Session, employee_data: dict, encoder=None) -> Employee:
+    """
+    Crée un nouvel employé dans la base de données.
+    Si `encoder` (src.scoring.FeatureEncoder) est fourni, le vecteur de features est stocké.
+    """
+    db_employee = Employee(**prepare_employee_data(employee_data, encoder))
     db.add(db_employee)
     db.commit()
     db.refresh(db_employee)
@@ -44,15 +67,19 @@ def create_prediction(
     label: str,
     model_version: str = "1.0.0"
 ) -> Prediction:
-    """Crée une nouvelle prédiction liée à un employé."""
+    """Crée une nouvelle prédiction liée à un employé (et la reporte sur l'employé)."""
     db_prediction = Prediction(
         employee_id=employee_id,
         prediction=prediction,
         probability=probability,
         label=label,
-        model_version=model_version
+        model_version=model_version,
+        predicted_at=datetime.utcnow()
     )
     db.add(db_prediction)
+    db.query(Employee).filter(Employee.id == employee_id).update(
+        latest_risk_values(db_prediction), synchronize_session=False
+    )
     db.commit()
     db.refresh(db_prediction)
     return db_prediction
@@ -69,8 +96,166 @@ def get_predictions(db: Session, skip: int = 0, limit: int = 100) -> List[Predic
 
 
 def get_predictions_by_employee(db: Session, employee_id: int) -> List[Prediction]:
-    """Récupère toutes les prédictions d'un employé."""
-    return db.query(Prediction).filter(Prediction.employee_id == employee_id).all()
+    """Récupère toutes les prédictions d'un employé, de la plus ancienne à la plus récente."""
+    return (
+        db.query(Prediction)
+        .filter(Prediction.employee_id == employee_id)
+        .order_by(Prediction.predicted_at)
+        .all()
+    )
+
+
+def _trajectory_filters(employee_id: int, start: Optional[datetime], end: Optional[datetime]) -> list:
+    """Plage (employee_id, predicted_at) de l'index idx_predictions_employee_predicted_at."""
+    filters = [Prediction.employee_id == employee_id]
+    if start is not None:
+        filters.append(Prediction.predicted_at >= start)
+    if end is not None:
+        filters.append(Prediction.predicted_at <= end)
+    return filters
+
+
+def trajectory_bounds_query(employee_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Première et dernière date, et nombre de prédictions d'un employé sur la période."""
+    return select(
+        func.min(Prediction.predicted_at), func.max(Prediction.predicted_at), func.count()
+    ).where(*_trajectory_filters(employee_id, start, end))
+
+
+def epoch_seconds(value: datetime) -> int:
+    """Secondes depuis l'epoch, arrondies à l'inférieur comme floor() dans trajectory_query (naïf = UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return math.floor(value.timestamp())
+
+
+def trajectory_buckets(first: datetime, last: datetime, interval: Optional[str] = None,
+                       max_points: int = 200) -> tuple:
+    """
+    Origine (epoch, secondes) et largeur des intervalles d'une trajectoire.
+
+    Sans `interval`, la largeur est choisie pour obtenir au plus `max_points`
+    intervalles ; avec, elle est un multiple de l'intervalle demandé, élargi
+    si besoin pour respecter `max_points`.
+
+    Returns:
+        (origine, largeur) en secondes
+    """
+    origin = epoch_seconds(first)
+    span = epoch_seconds(last) - origin + 1
+    unit = TRAJECTORY_INTERVALS[interval] if interval else 1
+    return origin, unit * max(1, math.ceil(span / (unit * max_points)))
+
+
+def trajectory_query(employee_id: int, start: Optional[datetime], end: Optional[datetime],
+                     origin: int, width: int):
+    """
+    Probabilités d'un employé agrégées par intervalle de `width` secondes, calculées par la base.
+
+    Seules predicted_at et probability sont lues : la requête est un parcours
+    de plage de l'index couvrant (employee_id, predicted_at) INCLUDE (probability).
+    """
+    # floor() explicite : un cast seul arrondit sous PostgreSQL (23:59:59.6 passerait au jour suivant)
+    epoch = cast(func.floor(extract("epoch", Prediction.predicted_at)), BigInteger)
+    # Constantes rendues dans le SQL : expression identique dans SELECT et GROUP BY
+    origin = literal(origin, BigInteger, literal_execute=True)
+    width = literal(width, BigInteger, literal_execute=True)
+    bucket = ((epoch - origin) // width).label("bucket")
+    return (
+        select(
+            bucket,
+            func.count(),
+            func.avg(Prediction.probability),
+            func.min(Prediction.probability),
+            func.max(Prediction.probability),
+        )
+        .where(*_trajectory_filters(employee_id, start, end))
+        .group_by(bucket)
+        .order_by(bucket)
+    )
+
+
+def trajectory_result(employee_id: int, origin: int, width: int, total: int, rows) -> dict:
+    """Met en forme les intervalles agrégés par trajectory_query."""
+    return {
+        "employee_id": employee_id,
+        "bucket_seconds": width,
+        "total_predictions": total,
+        "points": [
+            {
+                "bucket_start": datetime.fromtimestamp(origin + bucket * width, timezone.utc),
+                "count": count,
+                "mean_probability": mean,
+                "min_probability": low,
+                "max_probability": high,
+            }
+            for bucket, count, mean, low, high in rows
+        ],
+    }
+
+
+def get_risk_trajectory(
+    db: Session,
+    employee_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    interval: Optional[str] = None,
+    max_points: int = 200
+) -> dict:
+    """
+    Trajectoire de risque d'un employé, sous-échantillonnée par la base.
+
+    Args:
+        db: Session
+        employee_id: Identifiant de l'employé
+        start: Début de la période (première prédiction par défaut)
+        end: Fin de la période (dernière prédiction par défaut)
+        interval: "hour", "day" ou "week" (largeur automatique par défaut)
+        max_points: Nombre maximal d'intervalles renvoyés
+
+    Returns:
+        Dictionnaire (employee_id, bucket_seconds, total_predictions, points)
+    """
+    first, last, total = db.execute(trajectory_bounds_query(employee_id, start, end)).one()
+    if not total:
+        return trajectory_result(employee_id, 0, 0, 0, [])
+    origin, width = trajectory_buckets(start or first, end or last, interval, max_points)
+    rows = db.execute(trajectory_query(employee_id, start, end, origin, width)).all()
+    return trajectory_result(employee_id, origin, width, total, rows)
+
+
+def latest_risk_values(db_prediction: Prediction) -> dict:
+    """Colonnes de l'employé décrivant sa dernière prédiction (classement par risque)."""
+    return {
+        "risk_probability": db_prediction.probability,
+        "risk_model_version": db_prediction.model_version,
+        "risk_predicted_at": db_prediction.predicted_at,
+    }
+
+
+def top_at_risk_query(k: int, departement: Optional[str] = None, poste: Optional[str] = None):
+    """
+    Requête des k employés de plus forte dernière probabilité.
+
+    Servie par l'index (departement, risk_probability DESC) : parcours des
+    k premières entrées, sans tri.
+    """
+    stmt = select(Employee).where(Employee.risk_probability.isnot(None))
+    if departement is not None:
+        stmt = stmt.where(Employee.departement == departement)
+    if poste is not None:
+        stmt = stmt.where(Employee.poste == poste)
+    return stmt.order_by(Employee.risk_probability.desc()).limit(k)
+
+
+def get_top_at_risk(
+    db: Session,
+    k: int = 50,
+    departement: Optional[str] = None,
+    poste: Optional[str] = None
+) -> List[Employee]:
+    """Récupère les k employés les plus à risque (dernière prédiction), filtrés par département/poste."""
+    return list(db.scalars(top_at_risk_query(k, departement, poste)))
 
 
 def get_high_risk_predictions(db: Session, threshold: float = 0.5) -> List[Prediction]:
@@ -85,11 +270,13 @@ def create_employee_with_prediction(
     employee_data: dict,
     prediction: int,
     probability: float,
-    label: str
+    label: str,
+    model_version: str = "1.0.0",
+    encoder=None
 ) -> tuple:
     """Crée un employé et sa prédiction en une seule transaction."""
     # Créer l'employé
-    db_employee = Employee(**employee_data)
+    db_employee = Employee(**prepare_employee_data(employee_data, encoder))
     db.add(db_employee)
     db.flush()  # Pour obtenir l'ID sans commit
     
@@ -98,9 +285,14 @@ def create_employee_with_prediction(
         employee_id=db_employee.id,
         prediction=prediction,
         probability=probability,
-        label=label
+        label=label,
+        model_version=model_version,
+        content_hash=db_employee.content_hash,
+        predicted_at=datetime.utcnow()
     )
     db.add(db_prediction)
+    for column, value in latest_risk_values(db_prediction).items():
+        setattr(db_employee, column, value)
     db.commit()
     db.refresh(db_employee)
     db.refresh(db_prediction)
@@ -0,0 +1,265 @@
+"""
+Import des extraits RH mensuels (SIRH, EVAL, SONDAGE) dans la table employees.
+Usage: python -m src.database.ingest [--batch-size 10000] [--restart]
+
+Les trois fichiers sont fusionnés (load_data + process_and_merge), puis les
+lignes sont chargées par lots dans une table de staging temporaire (propre
+à la connexion de l'import : deux imports simultanés ne se mélangent pas ;
+COPY sous PostgreSQL) et fusionnées dans employees par une seule requête
+INSERT ... ON CONFLICT DO UPDATE par lot. Chaque lot est une transaction
+qui enregistre aussi la progression : un import interrompu reprend à la
+première ligne non validée.
+
+Un employé dont les champs n'ont pas changé (même content_hash) n'est pas
+réécrit ; pour les autres, le vecteur de features est invalidé et sera
+ré-encodé au prochain scoring.
+"""
+
+import argparse
+import io
+import time
+from datetime import datetime
+from typing import Sequence
+
+import pandas as pd
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table, delete, insert, select, true, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+
+from .models import Employee, INPUT_COLUMNS
+from ..data_processing import load_data, process_and_merge
+from ..registry import hash_files
+from ..scoring import content_hash
+
+
+DATA_FILES = (
+    'data/extrait_sirh.csv',
+    'data/extrait_eval.csv',
+    'data/extrait_sondage.csv'
+)
+DEFAULT_BATCH_SIZE = 10_000
+
+# Colonnes chargées depuis les extraits
+STAGED_COLUMNS = ["id_employee"] + INPUT_COLUMNS + ["content_hash"]
+
+# Tables techniques de l'import (hors Base : non créées par create_db)
+ingestion_metadata = MetaData()
+
+# Table temporaire (TEMP) : visible de la seule connexion qui l'a créée
+employees_staging = Table(
+    "employees_staging",
+    ingestion_metadata,
+    *[Column(name, Employee.__table__.c[name].type) for name in STAGED_COLUMNS],
+    prefixes=["TEMPORARY"]
+)
+
+ingestion_progress = Table(
+    "ingestion_progress",
+    ingestion_metadata,
+    Column("source_hash", String(64), primary_key=True),
+    Column("batches_done", Integer, nullable=False),
+    Column("rows_done", Integer, nullable=False),
+    Column("total_rows", Integer, nullable=False),
+    Column("updated_at", DateTime, default=datetime.utcnow),
+)
+
+
+def prepare_frame(df_merged: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aligne les données fusionnées sur les colonnes de la table employees.
+
+    Les pourcentages textuels ("11 %") sont convertis en nombres, les colonnes
+    absentes valent NULL et l'empreinte de chaque ligne est calculée.
+
+    Returns:
+        DataFrame trié par id_employee, colonnes STAGED_COLUMNS
+    """
+    df = df_merged.rename(columns={"id": "id_employee"})
+    frame = pd.DataFrame(index=df.index)
+    for name in STAGED_COLUMNS[:-1]:
+        if name not in df.columns:
+            frame[name] = None
+            continue
+        values = df[name]
+        column_type = Employee.__table__.c[name].type
+        if isinstance(column_type, (Integer, Float)):
+            if values.dtype == object:
+                values = values.astype(str).str.rstrip(" %")
+            values = pd.to_numeric(values, errors="coerce")
+            frame[name] = values.astype("Int64") if isinstance(column_type, Integer) else values
+        else:
+            frame[name] = values.astype(object).where(values.notna(), None)
+
+    frame = frame.dropna(subset=["id_employee"])
+    frame = frame.drop_duplicates(subset="id_employee", keep="last").sort_values("id_employee")
+
+    raw = frame[INPUT_COLUMNS].astype(object).where(frame[INPUT_COLUMNS].notna(), None)
+    frame["content_hash"] = [
+        content_hash(dict(zip(INPUT_COLUMNS, row)), INPUT_COLUMNS)
+        for row in raw.itertuples(index=False, name=None)
+    ]
+    return frame.reset_index(drop=True)
+
+
+def _stage_rows(conn, batch: pd.DataFrame) -> None:
+    """Charge un lot dans la table de staging (COPY avec psycopg2, executemany sinon)."""
+    if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2":
+        buffer = io.StringIO()
+        batch.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {employees_staging.name} ({', '.join(STAGED_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+        return
+
+    rows = batch.astype(object).where(batch.notna(), None).to_dict("records")
+    conn.execute(insert(employees_staging), rows)
+
+
+def _upsert_staged(conn) -> int:
+    """
+    Fusionne la table de staging dans employees en une requête.
+
+    Returns:
+        Nombre d'employés insérés ou modifiés
+    """
+    if conn.dialect.name == "postgresql":
+        dialect_insert = postgresql.insert
+    elif conn.dialect.name == "sqlite":
+        dialect_insert = sqlite.insert
+    else:
+        raise ValueError(f"Upsert non supporté pour la base {conn.dialect.name}")
+
+    table = Employee.__table__
+    # WHERE true : lève l'ambiguïté INSERT ... SELECT ... ON CONFLICT du parseur SQLite
+    staged = select(*[employees_staging.c[name] for name in STAGED_COLUMNS]).where(true())
+    stmt = dialect_insert(table).from_select(STAGED_COLUMNS, staged)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.id_employee],
+        set_={
+            **{name: stmt.excluded[name] for name in STAGED_COLUMNS[1:]},
+            "features": None,
+            "encoder_version": None,
+        },
+        where=table.c.content_hash.is_distinct_from(stmt.excluded.content_hash),
+    )
+    return conn.execute(stmt).rowcount
+
+
+def ingest_frame(
+    bind: Engine,
+    frame: pd.DataFrame,
+    source_hash: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    restart: bool = False
+) -> dict:
+    """
+    Importe des lignes préparées (prepare_frame) dans employees, par lots.
+
+    Args:
+        bind: Moteur SQLAlchemy
+        frame: Lignes à importer
+        source_hash: Identifiant de la source (reprise d'un import interrompu)
+        batch_size: Lignes par lot (une transaction par lot)
+        restart: Ignorer la progression enregistrée et tout réimporter
+
+    Returns:
+        Statistiques de l'import (lignes, lots, insertions/modifications, débit)
+    """
+    ingestion_progress.create(bind, checkfirst=True)
+    progress = ingestion_progress
+    n_rows = len(frame)
+
+    with bind.begin() as conn:
+        if restart:
+            conn.execute(delete(progress).where(progress.c.source_hash == source_hash))
+        done = conn.execute(
+            select(progress.c.rows_done).where(progress.c.source_hash == source_hash)
+        ).scalar()
+        if done is None:
+            done = 0
+            conn.execute(insert(progress).values(
+                source_hash=source_hash, batches_done=0, rows_done=0, total_rows=n_rows
+            ))
+
+    loaded = upserted = batches = 0
+    started = time.perf_counter()
+    # Une connexion pour tout l'import : la table de staging temporaire lui appartient
+    with bind.connect() as conn:
+        employees_staging.create(conn, checkfirst=True)
+        conn.commit()
+        try:
+            # Reprise à la première ligne non validée (indépendant de la taille des lots)
+            for start in range(done, n_rows, batch_size):
+                batch = frame.iloc[start:start + batch_size]
+                with conn.begin():
+                    _stage_rows(conn, batch)
+                    upserted += _upsert_staged(conn)
+                    conn.execute(delete(employees_staging))
+                    conn.execute(
+                        update(progress)
+                        .where(progress.c.source_hash == source_hash)
+                        .values(
+                            batches_done=progress.c.batches_done + 1,
+                            rows_done=start + len(batch),
+                            updated_at=datetime.utcnow()
+                        )
+                    )
+                loaded += len(batch)
+                batches += 1
+        finally:
+            # La connexion retourne au pool : la table temporaire ne doit pas lui survivre
+            conn.rollback()
+            employees_staging.drop(conn, checkfirst=True)
+            conn.commit()
+
+    seconds = time.perf_counter() - started
+    return {
+        "rows": n_rows,
+        "loaded": loaded,
+        "resumed_from_row": done,
+        "batches": batches,
+        "upserted": upserted,
+        "unchanged": loaded - upserted,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(loaded / seconds, 1) if seconds > 0 else 0.0,
+    }
+
+
+def ingest_files(
+    bind: Engine,
+    paths: Sequence[str] = DATA_FILES,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    restart: bool = False
+) -> dict:
+    """Fusionne les extraits SIRH/EVAL/SONDAGE et les importe dans employees."""
+    df_merged = process_and_merge(*load_data(*paths))
+    return ingest_frame(bind, prepare_frame(df_merged), hash_files(paths), batch_size, restart)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importe les extraits RH dans la table employees")
+    parser.add_argument("--sirh", default=DATA_FILES[0], help="Extrait SIRH (CSV)")
+    parser.add_argument("--eval", default=DATA_FILES[1], help="Extrait des évaluations (CSV)")
+    parser.add_argument("--sondage", default=DATA_FILES[2], help="Extrait du sondage (CSV)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Lignes par lot")
+    parser.add_argument("--restart", action="store_true", help="Ignorer la progression d'un import précédent")
+    args = parser.parse_args(argv)
+
+    from .connection import engine
+
+    stats = ingest_files(engine, (args.sirh, args.eval, args.sondage), args.batch_size, args.restart)
+    if stats["resumed_from_row"]:
+        print(f"Reprise à la ligne {stats['resumed_from_row'] + 1}")
+    print(f"{stats['loaded']}/{stats['rows']} lignes importées en {stats['batches']} lots "
+          f"({stats['upserted']} insérées ou modifiées, {stats['unchanged']} inchangées) "
+          f"en {stats['seconds']}s - {stats['rows_per_sec']} lignes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ Modèles SQLAlchemy pour la base de données HR Analytics.
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, CheckConstraint, Index, LargeBinary
 from sqlalchemy.orm import relationship
 
 from .connection import Base
@@ -15,6 +15,8 @@ class Employee(Base):
     __tablename__ = "employees"
     
     id = Column(Integer, primary_key=True, index=True)
+    # Identifiant SIRH (clé des imports mensuels)
+    id_employee = Column(Integer, unique=True)
     age = Column(Integer, nullable=False)
     genre = Column(String(1), nullable=False)
     revenu_mensuel = Column(Float, nullable=False)
@@ -31,6 +33,30 @@ class Employee(Base):
     satisfaction_employee_equilibre_pro_perso = Column(Integer)
     heure_supplementaires = Column(String(3))
     distance_domicile_travail = Column(Integer, default=0)
+    # Champs complémentaires d'EmployeeInput (NULL pour les lignes antérieures)
+    nombre_heures_travailless = Column(Float)
+    note_evaluation_precedente = Column(Integer)
+    niveau_hierarchique_poste = Column(Integer)
+    note_evaluation_actuelle = Column(Integer)
+    augementation_salaire_precedente = Column(Integer)
+    nombre_participation_pee = Column(Integer)
+    nb_formations_suivies = Column(Integer)
+    nombre_employee_sous_responsabilite = Column(Integer)
+    niveau_education = Column(Integer)
+    domaine_etude = Column(String(100))
+    ayant_enfants = Column(String(1))
+    frequence_deplacement = Column(String(50))
+    annees_depuis_la_derniere_promotion = Column(Integer)
+    annes_sous_responsable_actuel = Column(Integer)
+    # Vecteur de features encodé (float32 compacté) et version de l'encodeur qui l'a produit
+    features = Column(LargeBinary)
+    encoder_version = Column(String(16))
+    # Empreinte des champs bruts (src.scoring.content_hash sur INPUT_COLUMNS)
+    content_hash = Column(String(32))
+    # Dernière prédiction (dénormalisée pour le classement par risque)
+    risk_probability = Column(Float)
+    risk_model_version = Column(String(20))
+    risk_predicted_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relation avec les prédictions
@@ -39,6 +65,9 @@ class Employee(Base):
     __table_args__ = (
         CheckConstraint('age >= 18 AND age <= 100', name='check_age'),
         CheckConstraint("genre IN ('M', 'F')", name='check_genre'),
+        # Top-K par département (parcours d'index, sans tri) et sur toute l'entreprise
+        Index('idx_employees_departement_risk', 'departement', risk_probability.desc()),
+        Index('idx_employees_risk', risk_probability.desc()),
     )
 
 
@@ -53,6 +82,8 @@ class Prediction(Base):
     probability = Column(Float, nullable=False)
     label = Column(String(50), nullable=False)
     model_version = Column(String(20), default="1.0.0")
+    # Empreinte des données de l'employé au moment de la prédiction
+    content_hash = Column(String(32))
     predicted_at = Column(DateTime, default=datetime.utcnow)
     
     # Relation inverse
@@ -61,4 +92,24 @@ class Prediction(Base):
     __table_args__ = (
         CheckConstraint('prediction IN (0, 1)', name='check_prediction'),
         CheckConstraint('probability >= 0 AND probability <= 1', name='check_probability'),
+        # Historique d'un employé : parcours d'une plage d'index, probabilité incluse (PostgreSQL)
+        Index(
+            'idx_predictions_employee_predicted_at', 'employee_id', 'predicted_at',
+            postgresql_include=['probability']
+        ),
     )
+
+
+# Colonnes de données brutes d'un employé (hors identifiant, métadonnées et colonnes dérivées)
+INPUT_COLUMNS = [
+    column.name for column in Employee.__table__.columns
+    if column.name not in (
+        "id", "id_employee", "features", "encoder_version", "content_hash",
+        "risk_probability", "risk_model_version", "risk_predicted_at", "created_at"
+    )
+]
+# Valeurs par défaut appliquées à l'insertion (à prendre en compte dans l'empreinte)
+INPUT_DEFAULTS = {
+    column.name: column.default.arg for column in Employee.__table__.columns
+    if column.name in INPUT_COLUMNS and column.default is not None and column.default.is_scalar
+}
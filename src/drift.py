@@ -0,0 +1,250 @@
+"""
+Surveillance de la dérive des données en production.
+
+Une référence (baseline) est calculée à l'entraînement sur la matrice de
+features encodée : moyenne/variance et histogramme à bornes fixes pour les
+features numériques, fréquences des modalités pour les familles one-hot.
+
+En production, DriftMonitor met à jour les mêmes statistiques en mémoire
+constante (Welford/Chan par lot, histogrammes à bornes fixes, sommes des
+indicatrices) et les compare à la référence : PSI et distance KS (sur les
+histogrammes).
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+N_BINS = 10
+PSI_WARNING = 0.1
+PSI_DRIFT = 0.25
+# Lissage des proportions nulles dans le calcul du PSI
+_EPS = 1e-4
+
+REFERENCE_LEVEL = "(référence)"
+
+
+def _bin_edges(column: np.ndarray, n_bins: int = N_BINS) -> np.ndarray:
+    """
+    Bornes intérieures des classes : une classe par valeur pour les features
+    discrètes (<= n_bins valeurs distinctes), sinon les quantiles.
+    """
+    unique = np.unique(column)
+    if unique.size <= n_bins:
+        return (unique[:-1] + unique[1:]) / 2
+    return np.unique(np.quantile(column, np.linspace(0, 1, n_bins + 1)[1:-1]))
+
+
+def _histogram(column: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    return np.bincount(np.searchsorted(edges, column, side="right"), minlength=edges.size + 1)
+
+
+def psi(expected: np.ndarray, observed: np.ndarray) -> float:
+    """Population Stability Index entre deux distributions d'effectifs."""
+    p = np.maximum(np.asarray(expected, dtype=np.float64) / max(np.sum(expected), 1), _EPS)
+    q = np.maximum(np.asarray(observed, dtype=np.float64) / max(np.sum(observed), 1), _EPS)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def ks_distance(expected: np.ndarray, observed: np.ndarray) -> float:
+    """Statistique KS approchée à partir d'histogrammes de mêmes bornes."""
+    p = np.cumsum(expected) / max(np.sum(expected), 1)
+    q = np.cumsum(observed) / max(np.sum(observed), 1)
+    return float(np.max(np.abs(p - q)))
+
+
+def _status(value: Optional[float]) -> str:
+    if value is None:
+        return "no_data"
+    if value >= PSI_DRIFT:
+        return "drift"
+    if value >= PSI_WARNING:
+        return "warning"
+    return "ok"
+
+
+class DriftBaseline:
+    """Statistiques de référence calculées sur les données d'entraînement."""
+
+    def __init__(self, feature_names, fields, levels, count, mean, var, edges, histograms):
+        self.feature_names = list(feature_names)
+        self.fields = list(fields)
+        self.levels = list(levels)
+        self.count = int(count)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.var = np.asarray(var, dtype=np.float64)
+        # Features numériques uniquement : indice de colonne -> bornes / effectifs
+        self.edges = {int(j): np.asarray(e, dtype=np.float64) for j, e in edges.items()}
+        self.histograms = {int(j): np.asarray(h, dtype=np.int64) for j, h in histograms.items()}
+
+    @classmethod
+    def from_matrix(cls, X: np.ndarray, encoder) -> "DriftBaseline":
+        """
+        Calcule la référence sur une matrice encodée.
+
+        Args:
+            X: Matrice (n, n_features) alignée sur encoder.feature_names
+            encoder: src.scoring.FeatureEncoder du modèle
+        """
+        X = np.asarray(X, dtype=np.float64)
+        edges, histograms = {}, {}
+        for j in encoder.numeric.values():
+            edges[j] = _bin_edges(X[:, j])
+            histograms[j] = _histogram(X[:, j], edges[j])
+        return cls(
+            encoder.feature_names, encoder.fields, encoder.levels,
+            X.shape[0], X.mean(axis=0), X.var(axis=0), edges, histograms
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "feature_names": self.feature_names,
+            "fields": self.fields,
+            "levels": self.levels,
+            "count": self.count,
+            "mean": self.mean.tolist(),
+            "var": self.var.tolist(),
+            "edges": {str(j): e.tolist() for j, e in self.edges.items()},
+            "histograms": {str(j): h.tolist() for j, h in self.histograms.items()},
+        }
+
+    def save(self, path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path) -> "DriftBaseline":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(
+            data["feature_names"], data["fields"], data["levels"], data["count"],
+            data["mean"], data["var"], data["edges"], data["histograms"]
+        )
+
+
+class DriftMonitor:
+    """
+    Statistiques glissantes du trafic, en mémoire constante.
+
+    Les lignes encodées sont copiées dans un tampon de taille fixe ; les
+    statistiques sont mises à jour par lot lorsqu'il est plein (ou à la
+    lecture). observe() ne bloque jamais : si un autre thread met à jour le
+    moniteur, l'échantillon est ignoré.
+    """
+
+    def __init__(self, baseline: DriftBaseline, buffer_size: int = 256):
+        self.baseline = baseline
+        n_features = len(baseline.feature_names)
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.histograms = {j: np.zeros_like(h) for j, h in baseline.histograms.items()}
+        self.skipped = 0
+        self._buffer = np.empty((buffer_size, n_features))
+        self._buffered = 0
+        self._lock = threading.Lock()
+
+    def observe(self, X: np.ndarray) -> None:
+        """Enregistre un lot de lignes encodées (appelé sur le chemin de prédiction)."""
+        if X.shape[1] != self._buffer.shape[1]:
+            return
+        if not self._lock.acquire(blocking=False):
+            self.skipped += X.shape[0]
+            return
+        try:
+            n, size = X.shape[0], self._buffer.shape[0]
+            if n >= size:
+                self._flush()
+                self._update(X)
+                return
+            if self._buffered + n > size:
+                self._flush()
+            self._buffer[self._buffered:self._buffered + n] = X
+            self._buffered += n
+        finally:
+            self._lock.release()
+
+    def _flush(self) -> None:
+        if self._buffered:
+            self._update(self._buffer[:self._buffered])
+            self._buffered = 0
+
+    def _update(self, X: np.ndarray) -> None:
+        """Fusion d'un lot dans les moments courants (algorithme parallèle de Chan)."""
+        n = X.shape[0]
+        batch_mean = X.mean(axis=0)
+        batch_m2 = ((X - batch_mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * (n / total)
+        self.m2 += batch_m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+        for j, edges in self.baseline.edges.items():
+            self.histograms[j] += _histogram(X[:, j], edges)
+
+    def report(self) -> dict:
+        """Compare le trafic observé à la référence, champ par champ."""
+        with self._lock:
+            self._flush()
+            count, mean, m2 = self.count, self.mean.copy(), self.m2.copy()
+            histograms = {j: h.copy() for j, h in self.histograms.items()}
+
+        baseline = self.baseline
+        var = m2 / count if count else np.zeros_like(m2)
+        features = {}
+        families = {}
+        for j, (name, field, level) in enumerate(zip(baseline.feature_names, baseline.fields, baseline.levels)):
+            if j in baseline.histograms:
+                value = psi(baseline.histograms[j], histograms[j]) if count else None
+                features[name] = {
+                    "type": "numeric",
+                    "psi": value,
+                    "ks": ks_distance(baseline.histograms[j], histograms[j]) if count else None,
+                    "mean": float(mean[j]),
+                    "std": float(np.sqrt(var[j])),
+                    "baseline_mean": float(baseline.mean[j]),
+                    "baseline_std": float(np.sqrt(baseline.var[j])),
+                    "status": _status(value),
+                }
+            elif field and level:
+                families.setdefault(field, []).append((level, j))
+
+        for field, members in families.items():
+            columns = [j for _, j in members]
+            # Modalité de référence (supprimée par drop_first) = aucune indicatrice à 1
+            expected = baseline.mean[columns] * baseline.count
+            observed = mean[columns] * count
+            expected = np.append(expected, baseline.count - expected.sum())
+            observed = np.append(observed, count - observed.sum())
+            value = psi(expected, observed) if count else None
+            labels = [level for level, _ in members] + [REFERENCE_LEVEL]
+            features[field] = {
+                "type": "categorical",
+                "psi": value,
+                "frequencies": {
+                    label: {
+                        "observed": float(o / count) if count else None,
+                        "baseline": float(e / baseline.count),
+                    }
+                    for label, o, e in zip(labels, observed, expected)
+                },
+                "status": _status(value),
+            }
+
+        return {
+            "observed": count,
+            "skipped": self.skipped,
+            "baseline_count": baseline.count,
+            "drifted": sorted(name for name, f in features.items() if f["status"] == "drift"),
+            "features": features,
+        }
+
+
+def load_monitor(path, buffer_size: int = 256) -> Optional[DriftMonitor]:
+    """Crée un moniteur à partir d'un fichier de référence, s'il existe."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return DriftMonitor(DriftBaseline.load(path), buffer_size=buffer_size)
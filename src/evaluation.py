@@ -0,0 +1,277 @@
+"""
+Évaluation du modèle sur le jeu de test (classes déséquilibrées).
+
+Toutes les métriques sont calculées en numpy, sans appel supplémentaire au
+modèle : les probabilités de test sont triées une seule fois, et les
+comptes cumulés (vrais / faux positifs) donnent précision, rappel, F1 et
+coût pour chaque seuil distinct. Choisir un seuil de fonctionnement revient
+alors à un argmax sur ces tableaux.
+
+Le rapport (courbe sous-échantillonnée, calibration, métriques par
+département) est un JSON compact enregistré à côté du modèle.
+"""
+
+import json
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+# Coûts relatifs par défaut : un départ non anticipé (faux négatif) coûte
+# plus qu'une action de rétention inutile (faux positif)
+COST_FALSE_POSITIVE = 1.0
+COST_FALSE_NEGATIVE = 5.0
+
+N_CALIBRATION_BINS = 10
+MAX_CURVE_POINTS = 101
+CURVE_METRICS = ("precision", "recall", "f1", "accuracy", "cost")
+_DECIMALS = 4
+
+
+def threshold_curve(y_true, probabilities, cost_fp: float = COST_FALSE_POSITIVE,
+                    cost_fn: float = COST_FALSE_NEGATIVE) -> dict:
+    """
+    Métriques pour chaque seuil distinct, à partir d'un seul tri.
+
+    Un employé est prédit « à risque » si sa probabilité est > au seuil, comme
+    à la prédiction (probabilité > 0.5). Le premier point (seuil = probabilité
+    maximale) ne signale personne ; le dernier signale tout le monde.
+
+    Returns:
+        Dictionnaire de tableaux alignés, par seuil décroissant (thresholds,
+        tp, fp, precision, recall, f1, accuracy, cost), et les effectifs
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    order = np.argsort(-probabilities, kind="mergesort")
+    scores, labels = probabilities[order], y_true[order]
+
+    # Dernière position de chaque score distinct : les ex aequo passent le seuil ensemble
+    last = np.r_[np.flatnonzero(np.diff(scores)), scores.size - 1].astype(int) if scores.size else np.empty(0, int)
+    tp = np.r_[0.0, np.cumsum(labels)[last]]
+    fp = np.r_[0, last + 1] - tp
+    n, positives = scores.size, float(labels.sum())
+
+    # Signaler les k premiers scores distincts revient à un seuil strict égal au suivant ;
+    # tout signaler demande un seuil juste sous le minimum
+    distinct = scores[last]
+    thresholds = np.r_[distinct, np.nextafter(distinct[-1:], -np.inf)] if scores.size else np.empty(0)
+
+    predicted = tp + fp
+    denominator = predicted + positives
+    return {
+        "thresholds": thresholds,
+        "tp": tp,
+        "fp": fp,
+        "precision": np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0),
+        "recall": tp / positives if positives else np.zeros_like(tp),
+        "f1": np.divide(2 * tp, denominator, out=np.zeros_like(tp), where=denominator > 0),
+        "accuracy": (n - positives - fp + tp) / n if n else np.zeros_like(tp),
+        "cost": cost_fp * fp + cost_fn * (positives - tp),
+        "n": n,
+        "positives": positives,
+        "cost_fp": cost_fp,
+        "cost_fn": cost_fn,
+    }
+
+
+def roc_auc(curve: dict) -> Optional[float]:
+    """Aire sous la courbe ROC (trapèzes sur les comptes cumulés), None si une classe manque."""
+    positives, negatives = curve["positives"], curve["n"] - curve["positives"]
+    if not positives or not negatives:
+        return None
+    tpr = curve["tp"] / positives
+    fpr = curve["fp"] / negatives
+    return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+
+def average_precision(curve: dict) -> float:
+    """Précision moyenne (aire sous la courbe précision-rappel, en paliers)."""
+    return float(np.sum(np.diff(curve["recall"]) * curve["precision"][1:]))
+
+
+def curve_point(curve: dict, index: int) -> dict:
+    """Métriques du index-ième seuil de la courbe."""
+    return {"threshold": float(curve["thresholds"][index]),
+            **{name: float(curve[name][index]) for name in CURVE_METRICS}}
+
+
+def metrics_at(curve: dict, threshold: float) -> dict:
+    """Métriques pour un seuil quelconque (recherche dichotomique dans la courbe)."""
+    # Premier point dont le seuil est <= threshold : mêmes employés signalés (probabilité > seuil)
+    index = int(np.searchsorted(-curve["thresholds"], -threshold, side="left"))
+    return {**curve_point(curve, min(index, curve["thresholds"].size - 1)), "threshold": float(threshold)}
+
+
+def pick_threshold(curve: dict, objective: str = "f1", min_recall: Optional[float] = None,
+                   min_precision: Optional[float] = None) -> Optional[dict]:
+    """
+    Choisit le seuil de fonctionnement sur la courbe (aucun appel au modèle).
+
+    Args:
+        curve: Résultat de threshold_curve
+        objective: "f1" (maximisé) ou "cost" (minimisé)
+        min_recall: Rappel minimal exigé
+        min_precision: Précision minimale exigée
+
+    Returns:
+        Métriques du seuil retenu, None si aucun seuil ne respecte les contraintes
+    """
+    if objective not in ("f1", "cost"):
+        raise ValueError(f"Objectif inconnu: {objective}")
+    allowed = np.ones(curve["thresholds"].size, dtype=bool)
+    if min_recall is not None:
+        allowed &= curve["recall"] >= min_recall
+    if min_precision is not None:
+        allowed &= curve["precision"] >= min_precision
+    if not allowed.any():
+        return None
+
+    values = curve["f1"] if objective == "f1" else -curve["cost"]
+    return curve_point(curve, int(np.argmax(np.where(allowed, values, -np.inf))))
+
+
+def calibration_bins(y_true, probabilities, n_bins: int = N_CALIBRATION_BINS) -> dict:
+    """
+    Calibration : probabilité moyenne prédite et taux observé par classe de probabilité.
+
+    Returns:
+        bins (classes non vides), brier (score de Brier) et ece (erreur de calibration attendue)
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    index = np.minimum((probabilities * n_bins).astype(int), n_bins - 1)
+    count = np.bincount(index, minlength=n_bins)
+    sum_probability = np.bincount(index, weights=probabilities, minlength=n_bins)
+    sum_observed = np.bincount(index, weights=y_true, minlength=n_bins)
+
+    filled = count > 0
+    mean_probability = np.divide(sum_probability, count, out=np.zeros(n_bins), where=filled)
+    observed_rate = np.divide(sum_observed, count, out=np.zeros(n_bins), where=filled)
+    n = max(int(count.sum()), 1)
+    return {
+        "bins": [
+            {
+                "lower": i / n_bins,
+                "upper": (i + 1) / n_bins,
+                "count": int(count[i]),
+                "mean_probability": float(mean_probability[i]),
+                "observed_rate": float(observed_rate[i]),
+            }
+            for i in np.flatnonzero(filled)
+        ],
+        "brier": float(np.mean((probabilities - y_true) ** 2)) if probabilities.size else 0.0,
+        "ece": float(np.sum(count / n * np.abs(mean_probability - observed_rate))),
+    }
+
+
+def group_metrics(y_true, probabilities, groups, threshold: float = 0.5) -> dict:
+    """
+    Métriques par groupe (ex. département) en une passe de bincount.
+
+    Returns:
+        groupe -> {count, positives, mean_probability, predicted_positive, precision, recall, f1}
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    names, index = np.unique(np.asarray(groups).astype(str), return_inverse=True)
+    predicted = (probabilities > threshold).astype(np.float64)
+
+    count = np.bincount(index, minlength=names.size)
+    positives = np.bincount(index, weights=y_true, minlength=names.size)
+    predicted_positive = np.bincount(index, weights=predicted, minlength=names.size)
+    tp = np.bincount(index, weights=y_true * predicted, minlength=names.size)
+    mean_probability = np.bincount(index, weights=probabilities, minlength=names.size) / count
+
+    precision = np.divide(tp, predicted_positive, out=np.zeros(names.size), where=predicted_positive > 0)
+    recall = np.divide(tp, positives, out=np.zeros(names.size), where=positives > 0)
+    denominator = predicted_positive + positives
+    f1 = np.divide(2 * tp, denominator, out=np.zeros(names.size), where=denominator > 0)
+    return {
+        str(name): {
+            "count": int(count[i]),
+            "positives": int(positives[i]),
+            "mean_probability": float(mean_probability[i]),
+            "predicted_positive": int(predicted_positive[i]),
+            "precision": float(precision[i]),
+            "recall": float(recall[i]),
+            "f1": float(f1[i]),
+        }
+        for i, name in enumerate(names)
+    }
+
+
+def _downsample(curve: dict, max_points: int, keep: tuple) -> dict:
+    """Points de la courbe régulièrement espacés (plus les seuils retenus), pour le rapport."""
+    size = curve["thresholds"].size
+    index = np.unique(np.r_[np.linspace(0, size - 1, min(size, max_points)).round().astype(int), keep])
+    return {
+        "threshold": curve["thresholds"][index].round(_DECIMALS).tolist(),
+        **{name: np.round(curve[name][index], _DECIMALS).tolist() for name in CURVE_METRICS},
+    }
+
+
+def _rounded(value):
+    if isinstance(value, float):
+        return round(value, _DECIMALS)
+    if isinstance(value, dict):
+        return {k: _rounded(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_rounded(v) for v in value]
+    return value
+
+
+def evaluation_report(
+    y_true,
+    probabilities,
+    groups=None,
+    threshold: float = 0.5,
+    cost_fp: float = COST_FALSE_POSITIVE,
+    cost_fn: float = COST_FALSE_NEGATIVE,
+    n_bins: int = N_CALIBRATION_BINS,
+    max_curve_points: int = MAX_CURVE_POINTS
+) -> dict:
+    """
+    Rapport d'évaluation complet sur les probabilités de test.
+
+    Args:
+        y_true: Cibles (0/1)
+        probabilities: Probabilités de départ prédites
+        groups: Groupe de chaque employé (ex. département), optionnel
+        threshold: Seuil de référence (celui du modèle)
+        cost_fp: Coût d'un faux positif
+        cost_fn: Coût d'un faux négatif
+        n_bins: Classes de calibration
+        max_curve_points: Points de la courbe conservés dans le rapport
+
+    Returns:
+        Dictionnaire sérialisable en JSON
+    """
+    curve = threshold_curve(y_true, probabilities, cost_fp, cost_fn)
+    if not curve["n"]:
+        raise ValueError("Aucune probabilité à évaluer")
+    best_f1 = pick_threshold(curve, "f1")
+    min_cost = pick_threshold(curve, "cost")
+    keep = (int(np.argmax(curve["f1"])), int(np.argmin(curve["cost"])))
+
+    report = {
+        "n": curve["n"],
+        "positives": int(curve["positives"]),
+        "roc_auc": roc_auc(curve),
+        "average_precision": average_precision(curve),
+        "costs": {"false_positive": cost_fp, "false_negative": cost_fn},
+        "at_threshold": metrics_at(curve, threshold),
+        "best_f1": best_f1,
+        "min_cost": min_cost,
+        "calibration": calibration_bins(y_true, probabilities, n_bins),
+        "curve": _downsample(curve, max_curve_points, keep),
+    }
+    if groups is not None:
+        report["by_group"] = group_metrics(y_true, probabilities, groups, threshold)
+    return _rounded(report)
+
+
+def save_report(report: dict, path) -> None:
+    """Enregistre le rapport en JSON compact."""
+    Path(path).write_text(json.dumps(report, ensure_ascii=False, separators=(",", ":")))
@@ -0,0 +1,178 @@
+"""
+Importance globale des facteurs RH par permutation.
+
+Pour chaque feature (et chaque famille one-hot : toutes les colonnes
+`poste_*` d'un même champ permutées ensemble), les lignes de test sont
+mélangées et la baisse de ROC AUC est mesurée. Les groupes sont répartis
+sur tous les cœurs (joblib).
+
+Pour le modèle linéaire compilé, permuter des colonnes ne change que leur
+part du logit : le score permuté vaut `logit - part + part[permutation]`,
+sans nouvelle multiplication matricielle.
+
+Le résultat est enregistré dans le répertoire de la version du registre
+(importance.json) avec le hash des données : un nouveau calcul n'a lieu
+que si le modèle, les données ou les paramètres changent.
+"""
+
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+try:
+    from src.evaluation import roc_auc, threshold_curve
+except ImportError:
+    from evaluation import roc_auc, threshold_curve
+
+
+IMPORTANCE_FILE = "importance.json"
+DEFAULT_REPEATS = 10
+DEFAULT_SEED = 42
+_DECIMALS = 5
+
+
+def feature_families(encoder) -> dict:
+    """Colonnes de chaque champ brut (une famille par champ one-hot), dans l'ordre des features."""
+    families = {}
+    for j, (name, field) in enumerate(zip(encoder.feature_names, encoder.fields)):
+        families.setdefault(field or name, []).append(j)
+    return families
+
+
+def _auc(y: np.ndarray, scores: np.ndarray) -> float:
+    return roc_auc(threshold_curve(y, scores))
+
+
+def _permuted_scores(model, X: np.ndarray, y: np.ndarray, groups: list, n_repeats: int, seed: int) -> np.ndarray:
+    """
+    ROC AUC après permutation de chaque groupe de colonnes (tâche d'un worker).
+
+    Args:
+        groups: liste de (indice du groupe, colonnes)
+
+    Returns:
+        Tableau (len(groups), n_repeats)
+    """
+    linear = hasattr(model, "weights")
+    base = model.decision_function(X) if linear else None
+    scores = np.empty((len(groups), n_repeats))
+    for g, (group_index, columns) in enumerate(groups):
+        # Permutations reproductibles quel que soit le découpage entre workers
+        rng = np.random.default_rng([seed, group_index])
+        if linear:
+            part = X[:, columns] @ model.weights[columns]
+            for r in range(n_repeats):
+                scores[g, r] = _auc(y, base - part + part[rng.permutation(len(y))])
+        else:
+            X_permuted = X.copy()
+            for r in range(n_repeats):
+                X_permuted[:, columns] = X[rng.permutation(len(y))][:, columns]
+                scores[g, r] = _auc(y, model.predict_proba(X_permuted))
+    return scores
+
+
+def permutation_importance(model, X, y, groups: dict, n_repeats: int = DEFAULT_REPEATS,
+                           n_jobs: int = -1, seed: int = DEFAULT_SEED) -> tuple:
+    """
+    Importance par permutation (baisse de ROC AUC) de groupes de colonnes.
+
+    Args:
+        model: Modèle exposant predict_proba (ou decision_function et weights s'il est linéaire)
+        X: Matrice de features encodée
+        y: Cibles (0/1)
+        groups: nom -> indices des colonnes permutées ensemble
+        n_repeats: Permutations par groupe
+        n_jobs: Processus joblib (-1 : tous les cœurs)
+        seed: Graine des permutations
+
+    Returns:
+        (score de référence, {nom: (baisse moyenne, écart-type)})
+    """
+    # Import différé : l'API n'utilise que load_importance
+    from joblib import Parallel, delayed, effective_n_jobs
+
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    baseline = _auc(y, model.predict_proba(X))
+
+    tasks = list(enumerate(groups.values()))
+    n_workers = max(1, min(len(tasks), effective_n_jobs(n_jobs)))
+    chunks = [tasks[i::n_workers] for i in range(n_workers)]
+    results = Parallel(n_jobs=n_workers)(
+        delayed(_permuted_scores)(model, X, y, chunk, n_repeats, seed) for chunk in chunks
+    )
+
+    drops = np.empty((len(tasks), n_repeats))
+    for chunk, scores in zip(chunks, results):
+        drops[[group_index for group_index, _ in chunk]] = baseline - scores
+    return baseline, {
+        name: (float(drops[i].mean()), float(drops[i].std()))
+        for i, name in enumerate(groups)
+    }
+
+
+def importance_report(model, X, y, model_version: str, data_hash: str, n_repeats: int = DEFAULT_REPEATS,
+                      n_jobs: int = -1, seed: int = DEFAULT_SEED) -> dict:
+    """Importance de chaque feature encodée et de chaque champ brut (famille one-hot groupée)."""
+    started = time.perf_counter()
+    names = model.encoder.feature_names
+    families = feature_families(model.encoder)
+    # Un champ d'une seule colonne a l'importance de sa feature : seules les familles
+    # one-hot de plusieurs colonnes sont permutées comme un groupe supplémentaire
+    groups = {**{("feature", name): [j] for j, name in enumerate(names)},
+              **{("field", field): columns for field, columns in families.items() if len(columns) > 1}}
+    baseline, importance = permutation_importance(model, X, y, groups, n_repeats, n_jobs, seed)
+
+    def row(name: str, result: tuple) -> dict:
+        mean, std = result
+        return {"name": name, "importance": round(mean, _DECIMALS), "std": round(std, _DECIMALS)}
+
+    def ranked(rows: list) -> list:
+        return sorted(rows, key=lambda item: item["importance"], reverse=True)
+
+    fields = ranked([
+        {**row(field, importance[("field", field)] if len(columns) > 1 else importance[("feature", names[columns[0]])]),
+         "features": [names[j] for j in columns]}
+        for field, columns in families.items()
+    ])
+    return {
+        "model_version": model_version,
+        "data_hash": data_hash,
+        "metric": "roc_auc",
+        "baseline": round(baseline, _DECIMALS),
+        "n_samples": int(len(y)),
+        "n_repeats": n_repeats,
+        "seed": seed,
+        "computed_at": datetime.now(timezone.utc).isoformat(),
+        "seconds": round(time.perf_counter() - started, 3),
+        "fields": fields,
+        "features": ranked([row(name, importance[("feature", name)]) for name in names]),
+    }
+
+
+def load_importance(directory) -> Optional[dict]:
+    """Importance enregistrée dans le répertoire d'une version, None si absente."""
+    path = Path(directory) / IMPORTANCE_FILE
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+
+def cached_importance(directory, model, X, y, model_version: str, data_hash: str,
+                      n_repeats: int = DEFAULT_REPEATS, n_jobs: int = -1, seed: int = DEFAULT_SEED) -> tuple:
+    """
+    Importance d'une version, recalculée seulement si les données ou les paramètres ont changé.
+
+    Returns:
+        (rapport, True si lu depuis le cache)
+    """
+    cached = load_importance(directory)
+    key = {"model_version": model_version, "data_hash": data_hash, "n_repeats": n_repeats, "seed": seed}
+    if cached is not None and all(cached.get(name) == value for name, value in key.items()):
+        return cached, True
+
+    report = importance_report(model, X, y, model_version, data_hash, n_repeats, n_jobs, seed)
+    Path(directory, IMPORTANCE_FILE).write_text(json.dumps(report, ensure_ascii=False), encoding="utf-8")
+    return report, False
@@ -0,0 +1,335 @@
+"""
+Registre de modèles versionnés.
+
+Organisation du répertoire (MODEL_REGISTRY_DIR, par défaut ./models) :
+
+    models/
+    ├── registry.json        # {"active": "...", "candidate": "...", "canary_fraction": 0.1, ...}
+    └── <version>/
+        ├── model.npz        # artefact compilé (src.scoring.CompiledModel)
+        ├── model.pkl        # pipeline scikit-learn (optionnel)
+        └── metadata.json    # features, métriques, hash des données, date
+
+Plusieurs modèles restent chargés en mémoire dans un cache LRU borné par un
+budget en octets (empreinte réelle des objets retenus, pipeline compris). Les requêtes peuvent épingler une version ; sinon une
+fraction "canary" est servie par le modèle candidat et une fraction "shadow"
+est scorée en parallèle par le candidat pour comparaison.
+"""
+
+import hashlib
+import json
+import random
+import shutil
+import sys
+import threading
+import types
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+try:
+    from src.scoring import CompiledModel
+except ImportError:
+    from scoring import CompiledModel
+
+
+REGISTRY_FILE = "registry.json"
+METADATA_FILE = "metadata.json"
+COMPILED_FILE = "model.npz"
+PICKLE_FILE = "model.pkl"
+
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def hash_files(paths: Iterable) -> str:
+    """Empreinte SHA-256 du contenu d'un ensemble de fichiers (données d'entraînement)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Objets partagés par tous les modèles, exclus de l'empreinte
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def model_nbytes(model) -> int:
+    """
+    Empreinte mémoire d'un modèle chargé : parcours de tous les objets qu'il retient
+    (vecteurs numpy, encodeur et ses index, pipeline scikit-learn éventuel).
+    """
+    seen = set()
+    stack = [model]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        # Un tableau numpy propriétaire de ses données les inclut dans getsizeof
+        total += sys.getsizeof(obj, 0)
+        if isinstance(obj, np.ndarray):
+            if obj.base is not None:
+                stack.append(obj.base)
+            elif obj.dtype == object:
+                stack.extend(obj.ravel())
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        if hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+        for slot in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, slot):
+                stack.append(getattr(obj, slot))
+    return total
+
+
+class ModelRegistry:
+    """
+    Accès aux versions du registre avec cache LRU sous budget mémoire.
+
+    Args:
+        root: répertoire du registre
+        max_bytes: budget mémoire des modèles résidents
+        pickle_loader: fonction chargeant un model.pkl (utilisée si model.npz absent)
+        fallback: (version, loader) servi quand le registre est vide
+    """
+
+    def __init__(
+        self,
+        root,
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+        pickle_loader: Optional[Callable] = None,
+        fallback: Optional[tuple] = None,
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.pickle_loader = pickle_loader
+        self.fallback = fallback
+        self._cache: OrderedDict = OrderedDict()  # version -> (model, nbytes)
+        self._lock = threading.Lock()
+        self._load_locks: dict = {}  # version -> verrou de chargement
+        self._rng = random.Random()
+        self._state = None  # (clé de modification, versions, configuration)
+        self.shadow_stats = {"requests": 0, "rows": 0, "disagreements": 0, "abs_diff_sum": 0.0}
+
+    # ---------- Configuration ----------
+
+    def _state_key(self) -> tuple:
+        """Dates de modification du répertoire et de registry.json (invalident le cache de configuration)."""
+        try:
+            root_mtime = self.root.stat().st_mtime_ns
+        except FileNotFoundError:
+            return (None, None)
+        path = self.root / REGISTRY_FILE
+        return (root_mtime, path.stat().st_mtime_ns if path.exists() else None)
+
+    def _refresh(self) -> tuple:
+        """Relit le registre sur disque seulement s'il a changé (appelé à chaque requête)."""
+        key = self._state_key()
+        state = self._state
+        if state is not None and state[0] == key:
+            return state[1], state[2]
+
+        versions = []
+        if self.root.is_dir():
+            found = [
+                d for d in self.root.iterdir()
+                if d.is_dir() and ((d / COMPILED_FILE).exists() or (d / PICKLE_FILE).exists())
+            ]
+            versions = [d.name for d in sorted(found, key=lambda d: self.metadata(d.name).get("created_at", ""))]
+
+        path = self.root / REGISTRY_FILE
+        config = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        if not config.get("active"):
+            config["active"] = versions[-1] if versions else (self.fallback[0] if self.fallback else None)
+        config.setdefault("candidate", None)
+        config.setdefault("canary_fraction", 0.0)
+        config.setdefault("shadow_fraction", 0.0)
+
+        self._state = (key, versions, config)
+        return versions, config
+
+    def versions(self) -> list:
+        """Versions présentes dans le registre (ordre de publication)."""
+        return list(self._refresh()[0])
+
+    def config(self) -> dict:
+        """Contenu de registry.json complété par les valeurs par défaut."""
+        return dict(self._refresh()[1])
+
+    def save_config(self, config: dict) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / REGISTRY_FILE).write_text(json.dumps(config, indent=2), encoding="utf-8")
+        self._state = None
+
+    def metadata(self, version: str) -> dict:
+        path = self.root / version / METADATA_FILE
+        return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+    def publish(
+        self,
+        version: str,
+        model: CompiledModel,
+        metadata: dict,
+        pickle_path=None,
+        activate: bool = True,
+        extra_files: Optional[dict] = None,
+    ) -> Path:
+        """
+        Enregistre une nouvelle version dans le registre.
+
+        Args:
+            activate: True pour la servir par défaut, False pour la publier comme candidate
+            extra_files: fichiers annexes à copier (nom dans la version -> chemin source)
+        """
+        directory = self.root / version
+        if directory.exists():
+            raise ValueError(f"La version {version} existe déjà dans le registre")
+        directory.mkdir(parents=True)
+
+        self._state = None
+        model.save(directory / COMPILED_FILE)
+        if pickle_path is not None:
+            shutil.copyfile(pickle_path, directory / PICKLE_FILE)
+        for name, source in (extra_files or {}).items():
+            shutil.copyfile(source, directory / name)
+        metadata = {
+            "version": version,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "features": model.feature_names,
+            **metadata,
+        }
+        (directory / METADATA_FILE).write_text(json.dumps(metadata, indent=2, ensure_ascii=False), encoding="utf-8")
+
+        config = self.config()
+        config["active" if activate else "candidate"] = version
+        self.save_config(config)
+        return directory
+
+    # ---------- Chargement ----------
+
+    def _load(self, version: str):
+        directory = self.root / version
+        if (directory / COMPILED_FILE).exists():
+            return CompiledModel.load(directory / COMPILED_FILE)
+        if (directory / PICKLE_FILE).exists() and self.pickle_loader is not None:
+            return self.pickle_loader(directory / PICKLE_FILE)
+        if self.fallback is not None and version == self.fallback[0]:
+            return self.fallback[1]()
+        raise KeyError(version)
+
+    def get(self, version: Optional[str] = None):
+        """
+        Retourne le modèle d'une version (la version active par défaut).
+
+        Raises:
+            KeyError: si la version est inconnue
+        """
+        version = version or self.config()["active"]
+        if version is None:
+            raise FileNotFoundError(f"Aucun modèle dans le registre {self.root}")
+
+        with self._lock:
+            if version in self._cache:
+                self._cache.move_to_end(version)
+                return self._cache[version][0]
+            load_lock = self._load_locks.setdefault(version, threading.Lock())
+
+        # Un seul chargement par version : les requêtes concurrentes attendent le premier
+        with load_lock:
+            with self._lock:
+                if version in self._cache:
+                    self._cache.move_to_end(version)
+                    return self._cache[version][0]
+            model = self._load(version)
+            size = model_nbytes(model)
+            with self._lock:
+                self._cache[version] = (model, size)
+                self._cache.move_to_end(version)
+                self._evict()
+        return model
+
+    def _evict(self) -> None:
+        """Évince les modèles les moins récemment utilisés au-delà du budget (garde le plus récent)."""
+        total = sum(size for _, size in self._cache.values())
+        while total > self.max_bytes and len(self._cache) > 1:
+            _, (_, size) = self._cache.popitem(last=False)
+            total -= size
+
+    def resident(self) -> list:
+        """Versions actuellement en mémoire, de la moins à la plus récemment utilisée."""
+        with self._lock:
+            return list(self._cache)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    # ---------- Routage ----------
+
+    def resolve(self, requested: Optional[str] = None) -> str:
+        """
+        Choisit la version qui sert une requête.
+
+        Une version explicite est prioritaire ; sinon une fraction canary_fraction
+        des requêtes est routée vers le candidat.
+
+        Raises:
+            KeyError: si la version demandée n'existe pas
+        """
+        config = self.config()
+        if requested:
+            fallback_version = self.fallback[0] if self.fallback else None
+            if requested not in self.versions() and requested != fallback_version:
+                raise KeyError(requested)
+            return requested
+        candidate = config["candidate"]
+        if candidate and self._rng.random() < config["canary_fraction"]:
+            return candidate
+        return config["active"]
+
+    def shadow_version(self, served: str) -> Optional[str]:
+        """Version candidate à scorer en shadow pour cette requête (ou None)."""
+        config = self.config()
+        candidate = config["candidate"]
+        if not candidate or candidate == served:
+            return None
+        return candidate if self._rng.random() < config["shadow_fraction"] else None
+
+    def record_shadow(self, served_probabilities, shadow_probabilities, threshold: float = 0.5) -> None:
+        """Accumule l'écart entre le modèle servi et le candidat shadow."""
+        served = np.asarray(served_probabilities, dtype=np.float64)
+        shadow = np.asarray(shadow_probabilities, dtype=np.float64)
+        with self._lock:
+            self.shadow_stats["requests"] += 1
+            self.shadow_stats["rows"] += served.size
+            self.shadow_stats["disagreements"] += int(np.sum((served > threshold) != (shadow > threshold)))
+            self.shadow_stats["abs_diff_sum"] += float(np.abs(served - shadow).sum())
+
+    def status(self) -> dict:
+        """Résumé du registre pour le endpoint /models."""
+        config = self.config()
+        rows = self.shadow_stats["rows"]
+        versions = self.versions()
+        if not versions and self.fallback is not None:
+            versions = [self.fallback[0]]
+        return {
+            **config,
+            "versions": [{"version": v, **self.metadata(v)} for v in versions],
+            "resident": self.resident(),
+            "shadow": {
+                "requests": self.shadow_stats["requests"],
+                "rows": rows,
+                "disagreements": self.shadow_stats["disagreements"],
+                "mean_abs_diff": self.shadow_stats["abs_diff_sum"] / rows if rows else None,
+            },
+        }
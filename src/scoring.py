@@ -0,0 +1,415 @@
+"""
+Scoring vectorisé du modèle de turnover, sans pandas ni scikit-learn.
+
+Le pipeline entraîné (StandardScaler -> SMOTE -> LogisticRegression) est
+"compilé" en quelques tableaux numpy : moyenne/écart-type du scaler,
+coefficients et intercept de la régression. L'encodage des entrées
+(binaire + one-hot) est fait directement dans l'espace des features du
+modèle, colonne par colonne, pour un lot entier d'employés.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+
+
+# Encodages binaires identiques à prepare_features (cat.codes, ordre alphabétique)
+BINARY_ENCODINGS = {
+    "genre": {"F": 0, "M": 1},
+    "heure_supplementaires": {"Non": 0, "Oui": 1},
+}
+
+# Libellé de chaque classe prédite
+LABELS = {0: "Stable", 1: "Risque de départ"}
+
+# Révision de l'encodage : entre dans FeatureEncoder.version, pour que les
+# vecteurs stockés avec un encodage antérieur soient recalculés
+ENCODING_REVISION = 2
+
+# Stockage compact des vecteurs de features (float32 little-endian)
+FEATURE_DTYPE = np.dtype("<f4")
+
+
+def level_key(value) -> str:
+    """
+    Clé de modalité normalisée.
+
+    Les CSV d'entraînement stockent certains champs numériques en texte
+    (`augementation_salaire_precedente` = "15 %") : l'API et la base
+    transmettent l'entier 15. « 15 % », "15", 15 et 15.0 ont la même clé ;
+    les modalités textuelles sont inchangées.
+    """
+    text = str(value).strip()
+    number = text[:-1].rstrip() if text.endswith("%") else text
+    try:
+        parsed = float(number)
+    except ValueError:
+        return text
+    return str(int(parsed)) if parsed.is_integer() else str(parsed)
+
+
+def _level_columns(level_index: Mapping[str, int], values: Iterable):
+    """Indice de colonne de chaque valeur (-1 si modalité inconnue), normalisée une fois par valeur distincte."""
+    memo = {}
+    for value in values:
+        j = memo.get(value)
+        if j is None:
+            j = memo[value] = level_index.get(level_key(value), -1)
+        yield j
+
+
+class FeatureEncoder:
+    """
+    Encode des données brutes (champs d'EmployeeInput) en matrice de features
+    alignée sur les colonnes du modèle.
+
+    Chaque feature du modèle est soit un champ numérique brut (`age`), soit
+    une indicatrice one-hot `<champ>_<modalité>` (`poste_Consultant`).
+    """
+
+    def __init__(self, feature_names: Sequence[str], fields: Sequence[str], levels: Sequence[str]):
+        self.feature_names = [str(f) for f in feature_names]
+        self.fields = [str(f) for f in fields]
+        self.levels = [str(lv) for lv in levels]
+        self.n_features = len(self.feature_names)
+        # Empreinte de l'espace de features : change si une colonne est ajoutée ou renommée
+        # (ou si la façon d'encoder change, cf. ENCODING_REVISION)
+        self.version = hashlib.sha256(
+            json.dumps([ENCODING_REVISION, self.feature_names, self.fields, self.levels]).encode("utf-8")
+        ).hexdigest()[:16]
+
+        # Champs numériques : champ -> indice de colonne
+        self.numeric = {}
+        # Champs catégoriels : champ -> {clé de modalité (level_key): indice de colonne}
+        self.categorical = {}
+        for j, (field, level) in enumerate(zip(self.fields, self.levels)):
+            if not field:
+                continue  # feature inconnue, reste à 0
+            if level:
+                self.categorical.setdefault(field, {})[level_key(level)] = j
+            else:
+                self.numeric[field] = j
+
+    @classmethod
+    def from_feature_names(cls, feature_names: Sequence[str], raw_fields: Iterable[str]) -> "FeatureEncoder":
+        """
+        Retrouve la structure (champ, modalité) de chaque feature à partir
+        des noms produits par pd.get_dummies et de la liste des champs bruts.
+        """
+        raw_fields = sorted(set(raw_fields), key=len, reverse=True)
+        fields, levels = [], []
+        for name in feature_names:
+            field, level = "", ""
+            for candidate in raw_fields:
+                if name == candidate:
+                    field = candidate
+                    break
+                if name.startswith(candidate + "_"):
+                    field, level = candidate, name[len(candidate) + 1:]
+                    break
+            fields.append(field)
+            levels.append(level)
+        return cls(feature_names, fields, levels)
+
+    @property
+    def input_fields(self) -> list:
+        """Champs bruts nécessaires à l'encodage."""
+        return list(self.numeric) + list(self.categorical)
+
+    def encode_columns(self, columns: Mapping[str, Sequence], n_rows: Optional[int] = None) -> np.ndarray:
+        """
+        Encode des données en colonnes (champ -> séquence de valeurs).
+
+        Returns:
+            Matrice float64 de forme (n_rows, n_features)
+        """
+        if n_rows is None:
+            n_rows = len(next(iter(columns.values()))) if columns else 0
+        X = np.zeros((n_rows, self.n_features), dtype=np.float64)
+        if n_rows == 0:
+            return X
+
+        for field, j in self.numeric.items():
+            if field not in columns:
+                continue
+            values = columns[field]
+            mapping = BINARY_ENCODINGS.get(field)
+            if mapping is not None:
+                values = [mapping.get(v, 0) for v in values]
+            X[:, j] = np.asarray(values, dtype=np.float64)
+
+        rows = np.arange(n_rows)
+        for field, level_index in self.categorical.items():
+            if field not in columns:
+                continue
+            cols = np.fromiter(_level_columns(level_index, columns[field]), dtype=np.intp, count=n_rows)
+            mask = cols >= 0
+            X[rows[mask], cols[mask]] = 1.0
+
+        return X
+
+    def perturbation_block(self, X: np.ndarray, field: str, operation: str, values: Sequence) -> tuple:
+        """
+        Colonnes encodées d'un champ pour chaque (employé, valeur) d'un axe de simulation.
+
+        Args:
+            X: Matrice encodée de base (n, n_features)
+            field: Champ brut perturbé
+            operation: "set" (remplace), "add" ou "multiply" (champs numériques)
+            values: Valeurs de l'axe (L valeurs)
+
+        Returns:
+            (indices de colonnes, bloc de forme (n, L, nb_colonnes))
+        """
+        n, n_values = X.shape[0], len(values)
+        if field in self.numeric:
+            j = self.numeric[field]
+            if operation == "set":
+                mapping = BINARY_ENCODINGS.get(field)
+                encoded = [mapping.get(v, 0) for v in values] if mapping else values
+                block = np.broadcast_to(np.asarray(encoded, dtype=np.float64), (n, n_values))
+            elif operation == "add":
+                block = X[:, j, None] + np.asarray(values, dtype=np.float64)
+            elif operation == "multiply":
+                block = X[:, j, None] * np.asarray(values, dtype=np.float64)
+            else:
+                raise ValueError(f"Opération inconnue: {operation}")
+            return np.array([j]), block[:, :, None]
+
+        if field in self.categorical:
+            if operation != "set":
+                raise ValueError(f"Seule l'opération 'set' s'applique au champ catégoriel {field}")
+            level_index = self.categorical[field]
+            cols = np.fromiter(level_index.values(), dtype=np.intp)
+            one_hot = np.zeros((n_values, cols.size))
+            for i, value in enumerate(values):
+                j = level_index.get(level_key(value))
+                if j is not None:
+                    one_hot[i, np.flatnonzero(cols == j)] = 1.0
+            return cols, np.broadcast_to(one_hot, (n, n_values, cols.size))
+
+        # Champ absent du modèle : aucune colonne affectée
+        return np.array([], dtype=np.intp), np.zeros((n, n_values, 0))
+
+    def expand_variants(self, X: np.ndarray, blocks: Sequence[tuple]) -> np.ndarray:
+        """
+        Matrice de toutes les variantes (produit cartésien des axes), employé par employé.
+
+        Returns:
+            Matrice (n * L1 * ... * Lm, n_features)
+        """
+        n = X.shape[0]
+        sizes = [block.shape[1] for _, block in blocks]
+        grid = int(np.prod(sizes)) if sizes else 1
+        variants = np.repeat(X, grid, axis=0)
+        # Indice de valeur de chaque axe pour chaque point de la grille (ordre C)
+        grid_index = np.indices(sizes).reshape(len(sizes), -1) if sizes else np.zeros((0, 1), dtype=np.intp)
+        employee = np.repeat(np.arange(n), grid)
+        for (cols, block), axis_index in zip(blocks, grid_index):
+            if cols.size:
+                variants[:, cols] = block[employee, np.tile(axis_index, n)]
+        return variants
+
+    def encode(self, records: Sequence[Mapping]) -> np.ndarray:
+        """Encode une liste de dictionnaires (un par employé)."""
+        columns = {
+            field: [record[field] for record in records]
+            for field in self.input_fields
+            if records and field in records[0]
+        }
+        return self.encode_columns(columns, n_rows=len(records))
+
+
+def content_hash(record: Mapping, fields: Iterable[str]) -> str:
+    """
+    Empreinte stable des données brutes d'un employé (détection des changements).
+
+    Les nombres sont normalisés en float (3 et 3.0 ont la même empreinte) ;
+    un champ absent équivaut à une valeur nulle.
+    """
+    values = {}
+    for field in fields:
+        value = record.get(field)
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = float(value)
+        values[field] = value
+    payload = json.dumps(values, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def pack_features(X: np.ndarray) -> list:
+    """Sérialise chaque ligne d'une matrice encodée en float32 (un bytes par ligne)."""
+    packed = np.ascontiguousarray(X, dtype=FEATURE_DTYPE)
+    return [row.tobytes() for row in packed]
+
+
+def unpack_features(blobs: Sequence[bytes], n_features: int) -> np.ndarray:
+    """Reconstruit la matrice (n, n_features) à partir des vecteurs produits par pack_features."""
+    if not blobs:
+        return np.empty((0, n_features))
+    packed = np.frombuffer(b"".join(blobs), dtype=FEATURE_DTYPE)
+    return packed.reshape(len(blobs), n_features).astype(np.float64)
+
+
+def top_k_indices(probabilities: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices des k probabilités les plus élevées, par probabilité décroissante.
+
+    Sélection partielle (argpartition, O(n)) puis tri des seuls k retenus,
+    au lieu d'un tri complet du lot.
+    """
+    probabilities = np.asarray(probabilities)
+    k = min(k, probabilities.size)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < probabilities.size:
+        top = np.argpartition(-probabilities, k - 1)[:k]
+    else:
+        top = np.arange(probabilities.size)
+    return top[np.argsort(-probabilities[top], kind="stable")]
+
+
+class CompiledModel:
+    """
+    Modèle StandardScaler + LogisticRegression réduit à des tableaux numpy.
+
+    La probabilité de départ vaut sigmoid(((X - mean) / scale) @ coef + intercept),
+    exactement comme pipeline.predict_proba(X)[:, 1].
+    """
+
+    def __init__(self, encoder: FeatureEncoder, mean, scale, coef, intercept: float):
+        self.encoder = encoder
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        # Scaler replié dans les poids : une seule multiplication matrice-vecteur
+        self.weights = self.coef / self.scale
+        self.bias = self.intercept - float(np.dot(self.weights, self.mean))
+
+    @property
+    def feature_names(self) -> list:
+        return self.encoder.feature_names
+
+    @classmethod
+    def from_pipeline(cls, pipeline, raw_fields: Iterable[str]) -> "CompiledModel":
+        """
+        Compile un pipeline entraîné (scaler -> [SMOTE] -> régression logistique).
+
+        Raises:
+            ValueError: si le pipeline n'a pas cette structure
+        """
+        steps = [step for _, step in getattr(pipeline, "steps", [])]
+        scaler = next((s for s in steps if hasattr(s, "mean_") and hasattr(s, "scale_")), None)
+        classifier = steps[-1] if steps else None
+        if scaler is None or not hasattr(classifier, "coef_") or classifier.coef_.shape[0] != 1:
+            raise ValueError("Pipeline non compilable: StandardScaler + LogisticRegression binaire attendu")
+        if list(classifier.classes_) != [0, 1]:
+            raise ValueError(f"Classes inattendues: {list(classifier.classes_)}")
+
+        feature_names = list(getattr(pipeline, "feature_names_in_", getattr(scaler, "feature_names_in_", [])))
+        if not feature_names:
+            raise ValueError("Le pipeline ne contient pas les noms de features")
+
+        mean = np.asarray(scaler.mean_, dtype=np.float64)
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones_like(mean)
+        return cls(
+            FeatureEncoder.from_feature_names(feature_names, raw_fields),
+            mean=mean if scaler.with_mean else np.zeros_like(mean),
+            scale=scale,
+            coef=classifier.coef_[0],
+            intercept=classifier.intercept_[0],
+        )
+
+    def save(self, path) -> None:
+        """Sauvegarde l'artefact compilé (.npz, sans pickle)."""
+        np.savez(
+            path,
+            feature_names=np.array(self.encoder.feature_names),
+            fields=np.array(self.encoder.fields),
+            levels=np.array(self.encoder.levels),
+            mean=self.mean,
+            scale=self.scale,
+            coef=self.coef,
+            intercept=np.array([self.intercept]),
+        )
+
+    @classmethod
+    def load(cls, path) -> "CompiledModel":
+        """Charge un artefact produit par save()."""
+        with np.load(Path(path), allow_pickle=False) as data:
+            encoder = FeatureEncoder(data["feature_names"], data["fields"], data["levels"])
+            return cls(encoder, data["mean"], data["scale"], data["coef"], data["intercept"][0])
+
+    def encode(self, records: Sequence[Mapping]) -> np.ndarray:
+        return self.encoder.encode(records)
+
+    def encode_columns(self, columns: Mapping[str, Sequence], n_rows: Optional[int] = None) -> np.ndarray:
+        return self.encoder.encode_columns(columns, n_rows)
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return X @ self.weights + self.bias
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Probabilité de départ (classe 1) pour chaque ligne de X."""
+        return 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return (self.decision_function(X) > 0).astype(np.int64)
+
+    def simulate(self, X: np.ndarray, blocks: Sequence[tuple]) -> np.ndarray:
+        """
+        Probabilités de toutes les variantes sans matérialiser leur matrice.
+
+        Le logit étant linéaire en X, chaque axe ajoute un écart (n, L_i)
+        indépendant des autres axes (un champ par axe) ; la grille complète
+        s'obtient par broadcasting.
+
+        Args:
+            X: Matrice encodée de base (n, n_features)
+            blocks: Sortie de FeatureEncoder.perturbation_block pour chaque axe
+
+        Returns:
+            Tableau de forme (n, L1, ..., Lm)
+        """
+        n, m = X.shape[0], len(blocks)
+        logits = self.decision_function(X).reshape((n,) + (1,) * m)
+        for i, (cols, block) in enumerate(blocks):
+            delta = (block - X[:, None, cols]) @ self.weights[cols]
+            shape = [n] + [1] * m
+            shape[i + 1] = block.shape[1]
+            logits = logits + delta.reshape(shape)
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def contributions(self, X: np.ndarray) -> np.ndarray:
+        """
+        Contribution exacte de chaque feature au logit : coef * valeur standardisée.
+        La somme d'une ligne plus l'intercept donne decision_function(X).
+        """
+        return ((X - self.mean) / self.scale) * self.coef
+
+    def explain(self, X: np.ndarray, top_k: int) -> tuple:
+        """
+        Probabilités et top-k des contributions (en valeur absolue) en une passe.
+
+        Returns:
+            (probabilities, indices, contributions) - indices et contributions
+            de forme (n, k), triés par |contribution| décroissante
+        """
+        contributions = self.contributions(X)
+        probabilities = 1.0 / (1.0 + np.exp(-(contributions.sum(axis=1) + self.intercept)))
+
+        k = min(top_k, contributions.shape[1])
+        magnitude = np.abs(contributions)
+        if k < contributions.shape[1]:
+            top = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(k), (X.shape[0], k))
+        order = np.argsort(-np.take_along_axis(magnitude, top, axis=1), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return probabilities, top, np.take_along_axis(contributions, top, axis=1)
@@ -1,3 +1,6 @@
+import argparse
+from datetime import datetime
+
 import pandas as pd
 import joblib
 from sklearn.model_selection import train_test_split
@@ -5,26 +8,46 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
 from imblearn.over_sampling import SMOTE
 from imblearn.pipeline import Pipeline as ImbPipeline
-from sklearn.metrics import classification_report
 
 # Import relatif ou absolu selon l'installation
 try:
     from src.data_processing import load_data, process_and_merge, prepare_features
+    from src.scoring import CompiledModel
+    from src.registry import ModelRegistry, hash_files
+    from src.drift import DriftBaseline
+    from src.evaluation import COST_FALSE_NEGATIVE, COST_FALSE_POSITIVE, evaluation_report, save_report
+    from src.importance import DEFAULT_REPEATS, cached_importance
 except ImportError:
     from data_processing import load_data, process_and_merge, prepare_features
+    from scoring import CompiledModel
+    from registry import ModelRegistry, hash_files
+    from drift import DriftBaseline
+    from evaluation import COST_FALSE_NEGATIVE, COST_FALSE_POSITIVE, evaluation_report, save_report
+    from importance import DEFAULT_REPEATS, cached_importance
+
+DATA_FILES = (
+    'data/extrait_sirh.csv',
+    'data/extrait_eval.csv',
+    'data/extrait_sondage.csv'
+)
+REGISTRY_DIR = 'models'
+EVALUATION_REPORT = 'evaluation_report.json'
+
+
+def load_split():
+    """
+    Charge, fusionne et découpe les données (split stratifié reproductible).
 
-def main():
+    Returns:
+        (df_merged, X_train, X_test, y_train, y_test), None si les CSV sont absents
+    """
     print("Chargement des données...")
     # Assurez-vous que vos fichiers CSV sont dans un dossier 'data' à la racine
     try:
-        df_sirh, df_eval, df_sondage = load_data(
-            'data/extrait_sirh.csv',
-            'data/extrait_eval.csv',
-            'data/extrait_sondage.csv'
-        )
+        df_sirh, df_eval, df_sondage = load_data(*DATA_FILES)
     except FileNotFoundError:
         print("Erreur : Fichiers CSV introuvables dans le dossier 'data/'.")
-        return
+        return None
 
     print("Nettoyage et Fusion...")
     df_merged = process_and_merge(df_sirh, df_eval, df_sondage)
@@ -38,24 +61,136 @@ def main():
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=42, stratify=y
     )
-    
-    # Pipeline : Scaling -> SMOTE -> LogReg (Meilleur modèle du notebook)
-    pipeline = ImbPipeline([
+    return df_merged, X_train, X_test, y_train, y_test
+
+
+def build_pipeline():
+    """Pipeline : Scaling -> SMOTE -> LogReg (Meilleur modèle du notebook)."""
+    return ImbPipeline([
         ('scaler', StandardScaler()),
         ('smote', SMOTE(random_state=42)),
         ('classifier', LogisticRegression(max_iter=1000, random_state=42))
     ])
+
+
+def compute_importance(directory, version, model, X_test, y_test, n_repeats=DEFAULT_REPEATS, n_jobs=-1):
+    """Importance par permutation sur le jeu de test, mise en cache dans le répertoire de la version."""
+    X = X_test.reindex(columns=model.feature_names, fill_value=0).to_numpy(dtype=float)
+    importance, cached = cached_importance(
+        directory, model, X, y_test.to_numpy(), version, hash_files(DATA_FILES), n_repeats=n_repeats, n_jobs=n_jobs
+    )
+    origin = "cache" if cached else f"calculée en {importance['seconds']:.2f} s"
+    print(f"Importance par permutation ({origin}, ROC AUC de référence {importance['baseline']:.4f}) :")
+    for row in importance["fields"][:5]:
+        print(f"  {row['name']}: {row['importance']:+.4f} (± {row['std']:.4f})")
+    return importance
+
+
+def importance_only(version=None, n_repeats=DEFAULT_REPEATS, n_jobs=-1):
+    """Calcule (ou relit) l'importance d'une version déjà publiée, sans réentraîner."""
+    registry = ModelRegistry(REGISTRY_DIR)
+    version = version or registry.config()["active"]
+    if version not in registry.versions():
+        print(f"Erreur : version '{version}' absente du registre '{REGISTRY_DIR}/'.")
+        return None
+    split = load_split()
+    if split is None:
+        return None
+    _, _, X_test, _, y_test = split
+    return compute_importance(registry.root / version, version, registry.get(version), X_test, y_test,
+                              n_repeats, n_jobs)
+
+
+def main(version=None, candidate=False, cost_fp=COST_FALSE_POSITIVE, cost_fn=COST_FALSE_NEGATIVE,
+         n_repeats=DEFAULT_REPEATS, n_jobs=-1):
+    split = load_split()
+    if split is None:
+        return
+    df_merged, X_train, X_test, y_train, y_test = split
+    
+    pipeline = build_pipeline()
     
     print("Entraînement du modèle...")
     pipeline.fit(X_train, y_train)
     
-    # Évaluation rapide
-    score = pipeline.score(X_test, y_test)
-    print(f"Accuracy sur Test: {score:.4f}")
+    # Évaluation : courbe de seuils, calibration et métriques par département
+    probabilities = pipeline.predict_proba(X_test)[:, 1]
+    report = evaluation_report(
+        y_test.to_numpy(), probabilities, groups=df_merged.loc[X_test.index, 'departement'].to_numpy(),
+        cost_fp=cost_fp, cost_fn=cost_fn
+    )
+    score = report["at_threshold"]["accuracy"]
+    print(f"Accuracy sur Test: {score:.4f} - ROC AUC: {report['roc_auc']:.4f} - "
+          f"Précision moyenne: {report['average_precision']:.4f}")
+    at_threshold, best_f1, min_cost = report["at_threshold"], report["best_f1"], report["min_cost"]
+    print(f"Seuil 0.5 : précision {at_threshold['precision']:.3f}, rappel {at_threshold['recall']:.3f}, "
+          f"F1 {at_threshold['f1']:.3f}")
+    print(f"Meilleur F1 : {best_f1['f1']:.3f} au seuil {best_f1['threshold']:.3f} ; "
+          f"coût minimal {min_cost['cost']:.0f} au seuil {min_cost['threshold']:.3f}")
     
     # Sauvegarde
     joblib.dump(pipeline, 'model_hr.pkl')
     print("Modèle sauvegardé sous 'model_hr.pkl'")
 
+    # Artefact compilé pour l'API (numpy uniquement, sans pandas/scikit-learn)
+    compiled = CompiledModel.from_pipeline(pipeline, df_merged.columns)
+    compiled.save('model_hr.npz')
+    print("Modèle compilé sauvegardé sous 'model_hr.npz'")
+
+    # Référence pour la surveillance de dérive (population d'entraînement)
+    DriftBaseline.from_matrix(X_train.to_numpy(dtype=float), compiled.encoder).save('drift_baseline.json')
+    print("Référence de dérive sauvegardée sous 'drift_baseline.json'")
+
+    save_report(report, EVALUATION_REPORT)
+    print(f"Rapport d'évaluation sauvegardé sous '{EVALUATION_REPORT}'")
+
+    # Publication dans le registre versionné
+    version = version or datetime.now().strftime("%Y.%m.%d-%H%M%S")
+    directory = ModelRegistry(REGISTRY_DIR).publish(
+        version,
+        compiled,
+        {
+            "metrics": {
+                "accuracy": score,
+                "roc_auc": report["roc_auc"],
+                "average_precision": report["average_precision"],
+                "f1": report["at_threshold"]["f1"],
+                "best_f1_threshold": report["best_f1"]["threshold"],
+                "min_cost_threshold": report["min_cost"]["threshold"],
+            },
+            "data_hash": hash_files(DATA_FILES),
+            "n_train": len(X_train),
+            "n_test": len(X_test),
+        },
+        pickle_path='model_hr.pkl',
+        activate=not candidate,
+        extra_files={'drift_baseline.json': 'drift_baseline.json', EVALUATION_REPORT: EVALUATION_REPORT}
+    )
+    role = "candidate" if candidate else "active"
+    print(f"Version {version} publiée dans '{REGISTRY_DIR}/' ({role})")
+
+    # Importance globale des facteurs (tous les cœurs, mise en cache avec la version)
+    compute_importance(directory, version, compiled, X_test, y_test, n_repeats, n_jobs)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Entraîne et publie le modèle de turnover")
+    parser.add_argument("--version", help="Version publiée dans le registre (défaut: horodatage)")
+    parser.add_argument("--candidate", action="store_true",
+                        help="Publier comme candidat (canary/shadow) au lieu de version active")
+    parser.add_argument("--cost-fp", type=float, default=COST_FALSE_POSITIVE,
+                        help="Coût d'un faux positif (action de rétention inutile)")
+    parser.add_argument("--cost-fn", type=float, default=COST_FALSE_NEGATIVE,
+                        help="Coût d'un faux négatif (départ non anticipé)")
+    parser.add_argument("--importance-only", action="store_true",
+                        help="Calculer (ou relire) l'importance de --version (défaut: active) sans réentraîner")
+    parser.add_argument("--n-repeats", type=int, default=DEFAULT_REPEATS,
+                        help="Permutations par feature pour l'importance")
+    parser.add_argument("--n-jobs", type=int, default=-1,
+                        help="Processus pour l'importance (-1 : tous les cœurs)")
+    args = parser.parse_args()
+    if args.importance_only:
+        importance_only(version=args.version, n_repeats=args.n_repeats, n_jobs=args.n_jobs)
+    else:
+        main(version=args.version, candidate=args.candidate, cost_fp=args.cost_fp, cost_fn=args.cost_fn,
+             n_repeats=args.n_repeats, n_jobs=args.n_jobs)
\ No newline at end of file
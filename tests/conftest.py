@@ -0,0 +1,57 @@
+"""
+Configuration commune des tests.
+
+Aucun artefact de modèle n'est versionné : un modèle est entraîné sur les
+extraits de data/ (même pipeline que train.py) et publié dans un registre
+temporaire, désigné par MODEL_REGISTRY_DIR avant l'import de l'API (la
+variable est aussi héritée par les processus du pool de jobs).
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+
+ROOT = Path(__file__).parent.parent
+TEST_MODEL_VERSION = "1.0.0"
+_model_root = None
+
+
+def build_test_registry(root: Path) -> None:
+    """Entraîne le modèle sur les extraits RH et le publie (avec sa référence de dérive)."""
+    from src.drift import DriftBaseline
+    from src.registry import ModelRegistry
+    from src.scoring import CompiledModel
+    from src import train
+
+    cwd = os.getcwd()
+    os.chdir(ROOT)  # DATA_FILES sont relatifs à la racine du dépôt
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            df_merged, X_train, _, y_train, _ = train.load_split()
+    finally:
+        os.chdir(cwd)
+    pipeline = train.build_pipeline().fit(X_train, y_train)
+    compiled = CompiledModel.from_pipeline(pipeline, df_merged.columns)
+
+    baseline_path = root / "drift_baseline.json"
+    DriftBaseline.from_matrix(X_train.to_numpy(dtype=float), compiled.encoder).save(baseline_path)
+    ModelRegistry(root / "models").publish(
+        TEST_MODEL_VERSION, compiled, {"n_train": len(X_train)},
+        extra_files={"drift_baseline.json": baseline_path}
+    )
+
+
+def pytest_configure(config):
+    global _model_root
+    _model_root = Path(tempfile.mkdtemp(prefix="hr-models-"))
+    build_test_registry(_model_root)
+    os.environ["MODEL_REGISTRY_DIR"] = str(_model_root / "models")
+
+
+def pytest_unconfigure(config):
+    if _model_root is not None:
+        shutil.rmtree(_model_root, ignore_errors=True)
@@ -208,3 +208,608 @@ class TestBatchPredictEndpoint:
         if response.status_code == 200:
             data = response.json()
             assert data["total"] == 0
+
+    def test_batch_top_k(self, valid_employee_stable, valid_employee_at_risk):
+        """Vérifie que seuls les k employés les plus à risque sont renvoyés, triés."""
+        employees = {"employees": [valid_employee_stable, valid_employee_at_risk, valid_employee_stable]}
+        full = client.post("/predict/batch", json=employees).json()["predictions"]
+        response = client.post("/predict/batch/top?k=2", json=employees)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 3
+        assert [p["rank"] for p in data["predictions"]] == [1, 2]
+        assert data["predictions"][0]["index"] == 1
+        probabilities = [p["probability"] for p in data["predictions"]]
+        assert probabilities == sorted((p["probability"] for p in full), reverse=True)[:2]
+
+
+class TestProfiling:
+    """Tests pour le profilage à la demande (/admin/profile et en-tête X-Profile)."""
+
+    @pytest.fixture
+    def profiling_enabled(self, monkeypatch):
+        from src.api import profiling
+        monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+        monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+        return {"X-Admin-Token": "secret"}
+
+    def test_profile_disabled_by_default(self):
+        """Vérifie que l'endpoint est invisible si le profilage est désactivé."""
+        response = client.post("/admin/profile?seconds=0.01")
+        assert response.status_code == 404
+
+    def test_profile_requires_admin_token(self, profiling_enabled):
+        """Vérifie qu'un jeton invalide est refusé."""
+        response = client.post("/admin/profile?seconds=0.01", headers={"X-Admin-Token": "wrong"})
+        assert response.status_code == 403
+
+    def test_profile_requires_single_mode(self, profiling_enabled):
+        """Vérifie qu'il faut choisir 'seconds' ou 'requests'."""
+        response = client.post("/admin/profile", headers=profiling_enabled)
+        assert response.status_code == 422
+
+    def test_profile_seconds_returns_collapsed_stacks(self, profiling_enabled):
+        """Vérifie que la sortie est au format collapsed stacks ('pile count')."""
+        response = client.post("/admin/profile?seconds=0.05", headers=profiling_enabled)
+        assert response.status_code == 200
+        assert int(response.headers["X-Profile-Samples"]) > 0
+        lines = response.text.splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert ";" in stack or ":" in stack
+        assert int(count) > 0
+
+    def test_x_profile_header_returns_cprofile_stats(self, profiling_enabled, valid_employee_stable):
+        """Vérifie que l'en-tête X-Profile renvoie les statistiques cProfile."""
+        headers = {**profiling_enabled, "X-Profile": "tottime"}
+        response = client.post("/predict", json=valid_employee_stable, headers=headers)
+        assert response.status_code == 200
+        assert response.headers["X-Profile-Original-Status"] == "200"
+        assert "function calls" in response.text
+        # Seules les frames du projet sont listées (pas asyncio/anyio/Starlette)
+        assert "src/scoring.py" in response.text.replace("\\", "/")
+        assert "asyncio" not in response.text
+        assert "starlette" not in response.text
+
+    def test_x_profile_header_ignored_without_token(self, valid_employee_stable):
+        """Vérifie que l'en-tête X-Profile est ignoré pour un non-administrateur."""
+        response = client.post("/predict", json=valid_employee_stable, headers={"X-Profile": "1"})
+        assert response.status_code == 200
+        assert "prediction" in response.json()
+
+
+class TestColumnarBatchEndpoint:
+    """Tests pour l'endpoint /predict/batch/columnar."""
+
+    def test_columnar_matches_batch(self, valid_employee_stable, valid_employee_at_risk):
+        """Vérifie que le chemin rapide donne les mêmes résultats que /predict/batch."""
+        employees = {"employees": [valid_employee_stable, valid_employee_at_risk]}
+        expected = client.post("/predict/batch", json=employees).json()["predictions"]
+
+        response = client.post("/predict/batch/columnar", json=employees)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        assert data["predictions"] == [p["prediction"] for p in expected]
+        assert data["probabilities"] == pytest.approx([p["probability"] for p in expected])
+
+    def test_columnar_accepts_columns_payload(self, valid_employee_stable, valid_employee_at_risk):
+        """Vérifie le format d'entrée en colonnes."""
+        rows = [valid_employee_stable, valid_employee_at_risk]
+        columns = {field: [row[field] for row in rows] for field in valid_employee_stable}
+        response = client.post("/predict/batch/columnar", json={"columns": columns})
+        assert response.status_code == 200
+        assert len(response.json()["probabilities"]) == 2
+
+    def test_columnar_reports_errors_per_row(self, valid_employee_stable):
+        """Vérifie que les erreurs sont rapportées par ligne, comme Pydantic."""
+        bad_age = {**valid_employee_stable, "age": 10}
+        bad_genre = {**valid_employee_stable, "genre": "Homme"}
+        missing = {k: v for k, v in valid_employee_stable.items() if k != "poste"}
+        payload = {"employees": [valid_employee_stable, bad_age, bad_genre, missing]}
+
+        response = client.post("/predict/batch/columnar", json=payload)
+        assert response.status_code == 422
+        errors = {(tuple(e["loc"]), e["type"]) for e in response.json()["detail"]}
+        assert errors == {
+            (("body", "employees", 1, "age"), "greater_than_equal"),
+            (("body", "employees", 2, "genre"), "literal_error"),
+            (("body", "employees", 3, "poste"), "missing"),
+        }
+
+    def test_columnar_rejects_fractional_int(self, valid_employee_stable):
+        """Vérifie qu'un entier à partie décimale est refusé."""
+        payload = {"employees": [{**valid_employee_stable, "annees_dans_l_entreprise": 2.5}]}
+        response = client.post("/predict/batch/columnar", json=payload)
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["type"] == "int_from_float"
+
+    def test_columnar_binary_output(self, valid_employee_stable, valid_employee_at_risk):
+        """Vérifie le format binaire (uint8 puis float64)."""
+        import numpy as np
+
+        payload = {"employees": [valid_employee_stable, valid_employee_at_risk]}
+        json_data = client.post("/predict/batch/columnar", json=payload).json()
+        response = client.post("/predict/batch/columnar", json=payload,
+                               headers={"Accept": "application/octet-stream"})
+        assert response.status_code == 200
+        assert response.headers["X-Total"] == "2"
+        predictions = np.frombuffer(response.content[:2], dtype="u1")
+        probabilities = np.frombuffer(response.content[2:], dtype="<f8")
+        assert predictions.tolist() == json_data["predictions"]
+        assert probabilities.tolist() == pytest.approx(json_data["probabilities"])
+
+    def test_columnar_empty_list(self):
+        """Vérifie le comportement avec une liste vide."""
+        response = client.post("/predict/batch/columnar", json={"employees": []})
+        assert response.status_code == 200
+        assert response.json()["total"] == 0
+
+
+class TestArrowBatchEndpoint:
+    """Tests pour l'endpoint /predict/batch/arrow (Arrow IPC / Parquet)."""
+
+    ARROW = "application/vnd.apache.arrow.stream"
+    PARQUET = "application/vnd.apache.parquet"
+
+    @pytest.fixture
+    def table(self, valid_employee_stable, valid_employee_at_risk):
+        pa = pytest.importorskip("pyarrow")
+        return pa.Table.from_pylist([valid_employee_stable, valid_employee_at_risk])
+
+    @staticmethod
+    def _to_stream(table):
+        import pyarrow as pa
+
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    def test_arrow_stream_roundtrip(self, table, valid_employee_stable, valid_employee_at_risk):
+        """Vérifie qu'un flux Arrow est scoré et renvoyé avec les colonnes de résultat."""
+        import pyarrow as pa
+
+        response = client.post("/predict/batch/arrow", content=self._to_stream(table),
+                               headers={"Content-Type": self.ARROW})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == self.ARROW
+
+        result = pa.ipc.open_stream(response.content).read_all()
+        assert result.num_rows == 2
+        assert result.column_names[-2:] == ["prediction", "probability"]
+
+        expected = client.post(
+            "/predict/batch/columnar", json={"employees": [valid_employee_stable, valid_employee_at_risk]}
+        ).json()
+        assert result.column("prediction").to_pylist() == expected["predictions"]
+        assert result.column("probability").to_pylist() == pytest.approx(expected["probabilities"])
+
+    def test_parquet_input_arrow_output(self, table):
+        """Vérifie l'entrée Parquet avec une sortie Arrow demandée par Accept."""
+        import io
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        sink = io.BytesIO()
+        pq.write_table(table, sink)
+        response = client.post("/predict/batch/arrow", content=sink.getvalue(),
+                               headers={"Content-Type": self.PARQUET, "Accept": self.ARROW})
+        assert response.status_code == 200
+        result = pa.ipc.open_stream(response.content).read_all()
+        assert "probability" in result.column_names
+
+    def test_arrow_reports_errors_per_row(self, table):
+        """Vérifie les erreurs de validation par ligne."""
+        import pyarrow as pa
+
+        ages = pa.array([35, 10], type=pa.int64())
+        table = table.set_column(table.column_names.index("age"), "age", ages)
+        response = client.post("/predict/batch/arrow", content=self._to_stream(table),
+                               headers={"Content-Type": self.ARROW})
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body", 1, "age"]
+
+    def test_arrow_rejects_unknown_content_type(self):
+        """Vérifie qu'un Content-Type non supporté est refusé."""
+        response = client.post("/predict/batch/arrow", content=b"{}",
+                               headers={"Content-Type": "application/json"})
+        assert response.status_code == 415
+
+
+class TestModelVersions:
+    """Tests pour la sélection de version de modèle et /models."""
+
+    def test_prediction_reports_model_version(self, valid_employee_stable):
+        """Vérifie que la réponse indique la version du modèle utilisé."""
+        active = client.get("/models").json()["active"]
+        response = client.post("/predict", json=valid_employee_stable)
+        assert response.json()["model_version"] == active
+
+    def test_pinned_model_version(self, valid_employee_stable):
+        """Vérifie qu'une version existante peut être épinglée."""
+        active = client.get("/models").json()["active"]
+        response = client.post(f"/predict?model_version={active}", json=valid_employee_stable)
+        assert response.status_code == 200
+        assert response.json()["model_version"] == active
+
+    def test_unknown_model_version_returns_404(self, valid_employee_stable):
+        """Vérifie qu'une version inconnue est refusée."""
+        response = client.post("/predict?model_version=0.0.0-inconnue", json=valid_employee_stable)
+        assert response.status_code == 404
+
+    def test_models_endpoint_structure(self):
+        """Vérifie la structure de /models."""
+        data = client.get("/models").json()
+        for key in ("active", "candidate", "versions", "resident", "shadow"):
+            assert key in data
+
+
+class TestImportanceEndpoint:
+    """Tests pour l'endpoint /models/{version}/importance."""
+
+    def test_unknown_version_returns_404(self):
+        """Vérifie qu'une version inconnue est refusée."""
+        assert client.get("/models/0.0.0-inconnue/importance").status_code == 404
+
+    def test_serves_cached_importance(self, tmp_path, monkeypatch):
+        """Vérifie que l'importance enregistrée avec la version est servie telle quelle."""
+        import numpy as np
+        from src.api import model_router
+        from src.importance import cached_importance
+        from src.registry import ModelRegistry
+        from src.scoring import CompiledModel, FeatureEncoder
+
+        encoder = FeatureEncoder(['age'], ['age'], [''])
+        model = CompiledModel(encoder, np.zeros(1), np.ones(1), np.ones(1), 0.0)
+        registry = ModelRegistry(tmp_path / 'models')
+        directory = registry.publish('1.0.0', model, {})
+        monkeypatch.setattr(model_router, "get_registry", lambda: registry)
+
+        assert client.get("/models/1.0.0/importance").status_code == 404
+        X = np.arange(20, dtype=float).reshape(-1, 1)
+        report, _ = cached_importance(directory, model, X, (X[:, 0] > 9).astype(int), '1.0.0', 'abc', n_jobs=1)
+        response = client.get("/models/1.0.0/importance")
+        assert response.status_code == 200
+        assert response.json()["fields"] == report["fields"]
+        assert response.json()["data_hash"] == 'abc'
+
+
+class TestExplainEndpoint:
+    """Tests pour les endpoints /predict/explain."""
+
+    def test_explain_matches_prediction(self, valid_employee_at_risk):
+        """Vérifie que l'explication reprend la même probabilité que /predict."""
+        expected = client.post("/predict", json=valid_employee_at_risk).json()
+        response = client.post("/predict/explain?top_k=3", json=valid_employee_at_risk)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["probability"] == pytest.approx(expected["probability"])
+        assert data["prediction"] == expected["prediction"]
+        assert len(data["contributions"]) == 3
+        magnitudes = [abs(c["contribution"]) for c in data["contributions"]]
+        assert magnitudes == sorted(magnitudes, reverse=True)
+
+    def test_explain_batch(self, valid_employee_stable, valid_employee_at_risk):
+        """Vérifie les explications batch."""
+        employees = {"employees": [valid_employee_stable, valid_employee_at_risk]}
+        response = client.post("/predict/explain/batch", json=employees)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        assert all(len(e["contributions"]) == 5 for e in data["explanations"])
+
+    def test_explain_validates_top_k(self, valid_employee_stable):
+        """Vérifie que top_k est borné."""
+        response = client.post("/predict/explain?top_k=0", json=valid_employee_stable)
+        assert response.status_code == 422
+
+
+class TestSimulateEndpoint:
+    """Tests pour l'endpoint /simulate."""
+
+    def test_simulate_grid_shape(self, valid_employee_stable, valid_employee_at_risk):
+        """Vérifie la forme de la grille (employés x axes)."""
+        payload = {
+            "employees": [valid_employee_stable, valid_employee_at_risk],
+            "perturbations": [
+                {"feature": "revenu_mensuel", "operation": "multiply", "values": [1.0, 1.1, 1.2]},
+                {"feature": "heure_supplementaires", "values": ["Oui", "Non"]}
+            ]
+        }
+        response = client.post("/simulate", json=payload)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["shape"] == [2, 3, 2]
+        assert data["total_variants"] == 12
+        assert len(data["probabilities"][1][2]) == 2
+
+    def test_simulate_identity_equals_base(self, valid_employee_at_risk):
+        """Vérifie qu'une perturbation neutre redonne la probabilité de base."""
+        payload = {
+            "employees": [valid_employee_at_risk],
+            "perturbations": [{"feature": "revenu_mensuel", "operation": "multiply", "values": [1.0]}]
+        }
+        data = client.post("/simulate", json=payload).json()
+        expected = client.post("/predict", json=valid_employee_at_risk).json()["probability"]
+        assert data["base_probabilities"][0] == pytest.approx(expected)
+        assert data["probabilities"][0][0] == pytest.approx(expected)
+
+    def test_simulate_overtime_effect(self, valid_employee_at_risk):
+        """Vérifie que supprimer les heures sup. réduit le risque (coefficient appris positif)."""
+        payload = {
+            "employees": [valid_employee_at_risk],
+            "perturbations": [{"feature": "heure_supplementaires", "values": ["Oui", "Non"]}]
+        }
+        with_overtime, without_overtime = client.post("/simulate", json=payload).json()["probabilities"][0]
+        assert without_overtime < with_overtime
+
+    def test_simulate_one_hot_integer_field(self, valid_employee_stable):
+        """Vérifie qu'une grille 'set' sur l'augmentation (one-hot "15 %" à l'entraînement) change le score."""
+        payload = {
+            "employees": [valid_employee_stable],
+            "perturbations": [{"feature": "augementation_salaire_precedente", "values": [11, 15, 25]}]
+        }
+        probabilities = client.post("/simulate", json=payload).json()["probabilities"][0]
+        assert len(set(probabilities)) == 3
+        expected = client.post("/predict", json={**valid_employee_stable, "augementation_salaire_precedente": 25})
+        assert probabilities[2] == pytest.approx(expected.json()["probability"])
+
+    @pytest.mark.parametrize("perturbation, loc", [
+        ({"feature": "inconnu", "values": [1]}, ["body", "perturbations", 0, "feature"]),
+        ({"feature": "poste", "operation": "add", "values": [1]}, ["body", "perturbations", 0, "operation"]),
+        ({"feature": "augementation_salaire_precedente", "operation": "add", "values": [5]},
+         ["body", "perturbations", 0, "operation"]),
+        ({"feature": "poste", "values": ["Astronaute"]}, ["body", "perturbations", 0, "values", 0]),
+        ({"feature": "age", "values": [30, 10]}, ["body", "perturbations", 0, "values", 1]),
+    ])
+    def test_simulate_validates_perturbations(self, valid_employee_stable, perturbation, loc):
+        """Vérifie les erreurs de validation des perturbations."""
+        payload = {"employees": [valid_employee_stable], "perturbations": [perturbation]}
+        response = client.post("/simulate", json=payload)
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == loc
+
+    def test_simulate_rejects_too_many_variants(self, valid_employee_stable, monkeypatch):
+        """Vérifie la limite du nombre de variantes."""
+        from src.api import simulation_router
+        monkeypatch.setattr(simulation_router, "MAX_SIMULATION_VARIANTS", 2)
+        payload = {
+            "employees": [valid_employee_stable],
+            "perturbations": [{"feature": "age", "values": [30, 40, 50]}]
+        }
+        assert client.post("/simulate", json=payload).status_code == 413
+
+
+class TestDriftEndpoint:
+    """Tests pour l'endpoint /drift."""
+
+    def test_drift_counts_predictions(self, valid_employee_stable):
+        """Vérifie que les prédictions alimentent le moniteur de dérive."""
+        before = client.get("/drift")
+        if before.status_code == 404:
+            pytest.skip("Aucune référence de dérive (modèle entraîné sans train.py récent)")
+        client.post("/predict/batch", json={"employees": [valid_employee_stable] * 3})
+        after = client.get("/drift").json()
+        assert after["observed"] == before.json()["observed"] + 3
+        assert "age" in after["features"]
+
+    def test_warmup_is_not_observed(self):
+        """Vérifie que la prédiction factice du démarrage n'est pas comptée comme trafic."""
+        from src.api import model_loader
+
+        before = client.get("/drift")
+        if before.status_code == 404:
+            pytest.skip("Aucune référence de dérive (modèle entraîné sans train.py récent)")
+        model_loader.warmup()
+        assert client.get("/drift").json()["observed"] == before.json()["observed"]
+
+    def test_drift_failure_does_not_fail_prediction(self, monkeypatch, valid_employee_stable, caplog):
+        """Vérifie qu'une erreur du moniteur de dérive est journalisée sans renvoyer de 500."""
+        from src.api import model_loader
+
+        def broken_monitor(version=None):
+            raise ValueError("référence de dérive illisible")
+
+        monkeypatch.setattr(model_loader, "DRIFT_ENABLED", True)
+        monkeypatch.setattr(model_loader, "get_drift_monitor", broken_monitor)
+        response = client.post("/predict", json=valid_employee_stable)
+        assert response.status_code == 200
+        assert "prediction" in response.json()
+        assert "Surveillance de dérive en échec" in caplog.text
+
+    def test_training_data_replay_does_not_drift(self, monkeypatch):
+        """Vérifie que rejouer les données d'entraînement (format API) ne déclenche aucune alerte."""
+        from pathlib import Path
+        from src.api import model_loader
+        from src.api.schemas import EmployeeInput
+        from src.data_processing import load_data, process_and_merge
+
+        monkeypatch.setattr(model_loader, "_drift_monitors", {})
+        if model_loader.get_drift_monitor() is None:
+            pytest.skip("Aucune référence de dérive (modèle entraîné sans train.py récent)")
+
+        data = Path(__file__).parent.parent / "data"
+        df = process_and_merge(*load_data(
+            data / "extrait_sirh.csv", data / "extrait_eval.csv", data / "extrait_sondage.csv"
+        ))
+        df["augementation_salaire_precedente"] = df["augementation_salaire_precedente"].str.rstrip(" %").astype(int)
+        columns = {field: df[field].tolist() for field in EmployeeInput.model_fields}
+        response = client.post("/predict/batch/columnar", json={"columns": columns})
+        assert response.status_code == 200
+
+        report = client.get("/drift").json()
+        assert report["observed"] == len(df)
+        assert report["drifted"] == []
+        assert report["features"]["augementation_salaire_precedente"]["status"] != "drift"
+
+
+class TestEmployeeScoringEndpoint:
+    """Tests pour l'endpoint /employees/score."""
+
+    @pytest.fixture
+    def engine(self, tmp_path, valid_employee_stable):
+        from sqlalchemy import create_engine, insert
+        from src.database.connection import Base
+        from src.database.models import Employee
+        from src.api.employee_router import get_engine
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'hr.db'}")
+        Base.metadata.create_all(engine)
+        columns = set(Employee.__table__.columns.keys())
+        row = {k: v for k, v in valid_employee_stable.items() if k in columns}
+        with engine.begin() as conn:
+            conn.execute(insert(Employee), [row] * 5)
+        app.dependency_overrides[get_engine] = lambda: engine
+        yield engine
+        app.dependency_overrides.pop(get_engine, None)
+
+    def test_score_stored_employees(self, engine):
+        """Vérifie que les employés stockés sont scorés et leurs prédictions enregistrées."""
+        from sqlalchemy import func, select
+        from src.database.models import Prediction
+
+        response = client.post("/employees/score", params={"departement": "Consulting"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["scored"] == 5
+        with engine.connect() as conn:
+            assert conn.execute(select(func.count()).select_from(Prediction)).scalar() == 5
+
+    def test_unknown_model_version(self, engine):
+        """Vérifie le 404 pour une version inconnue."""
+        response = client.post("/employees/score", params={"model_version": "0.0.0-inconnue"})
+        assert response.status_code == 404
+
+    @staticmethod
+    def use_async_session(path):
+        """Sert get_async_session depuis une base SQLite (aiosqlite)."""
+        pytest.importorskip("aiosqlite")
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from src.database.connection import Base
+        from src.api.employee_router import get_async_session
+
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+        async def override():
+            async with async_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            async with async_sessionmaker(async_engine)() as db:
+                yield db
+
+        app.dependency_overrides[get_async_session] = override
+
+    def test_statistics_with_async_session(self, tmp_path):
+        """Vérifie l'endpoint de statistiques servi par la session asynchrone."""
+        from src.api.employee_router import get_async_session
+
+        self.use_async_session(tmp_path / 'async.db')
+        try:
+            response = client.get("/employees/statistics")
+        finally:
+            app.dependency_overrides.pop(get_async_session, None)
+        assert response.status_code == 200
+        assert response.json()["total_predictions"] == 0
+
+    def test_top_at_risk_after_scoring(self, engine, tmp_path):
+        """Vérifie le classement des employés par dernière probabilité."""
+        from src.api.employee_router import get_async_session
+
+        assert client.post("/employees/score").status_code == 200
+        self.use_async_session(tmp_path / 'hr.db')
+        try:
+            response = client.get("/employees/at-risk", params={"k": 3, "departement": "Consulting"})
+            other = client.get("/employees/at-risk", params={"departement": "Commercial"})
+        finally:
+            app.dependency_overrides.pop(get_async_session, None)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 3
+        assert [e["rank"] for e in data["employees"]] == [1, 2, 3]
+        assert all(e["departement"] == "Consulting" and e["model_version"] for e in data["employees"])
+        assert other.json()["total"] == 0
+
+    def test_trajectory(self, engine, tmp_path):
+        """Vérifie la trajectoire de risque d'un employé scoré."""
+        from src.api.employee_router import get_async_session
+
+        assert client.post("/employees/score").status_code == 200
+        self.use_async_session(tmp_path / 'hr.db')
+        try:
+            response = client.get("/employees/1/trajectory", params={"interval": "day"})
+            invalid = client.get("/employees/1/trajectory", params={"interval": "month"})
+        finally:
+            app.dependency_overrides.pop(get_async_session, None)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_predictions"] == 1 and data["bucket_seconds"] == 86400
+        assert data["points"][0]["count"] == 1
+        assert invalid.status_code == 422
+
+
+class TestJobsEndpoint:
+    """Tests pour les endpoints /jobs."""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        from src.api import jobs
+
+        manager = jobs.JobManager(jobs.MemoryJobStore(), tmp_path, workers=0, max_queued=2, chunk_size=2)
+        app.dependency_overrides[jobs.get_job_manager] = lambda: manager
+        yield manager
+        app.dependency_overrides.pop(jobs.get_job_manager, None)
+        manager.shutdown()
+
+    def wait(self, job_id):
+        import time
+
+        for _ in range(600):
+            data = client.get(f"/jobs/{job_id}").json()
+            if data["status"] not in ("queued", "running"):
+                return data
+            time.sleep(0.05)
+        raise AssertionError("job non terminé")
+
+    def test_submit_poll_and_download(self, manager, valid_employee_stable, valid_employee_at_risk):
+        """Vérifie le cycle complet : soumission CSV, suivi, téléchargement."""
+        import csv
+        import io
+
+        rows = [valid_employee_stable, valid_employee_at_risk, valid_employee_stable]
+        body = io.StringIO()
+        writer = csv.DictWriter(body, fieldnames=list(valid_employee_stable))
+        writer.writeheader()
+        writer.writerows(rows)
+
+        response = client.post("/jobs", content=body.getvalue(), headers={"Content-Type": "text/csv"})
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        status = self.wait(job_id)
+        assert status["status"] == "succeeded" and status["progress"] == 1.0
+        assert status["processed_rows"] == 3
+
+        result = client.get(f"/jobs/{job_id}/result")
+        assert result.status_code == 200
+        lines = list(csv.DictReader(io.StringIO(result.text)))
+        expected = client.post("/predict/batch", json={"employees": rows}).json()["predictions"]
+        assert [float(r["probability"]) for r in lines] == pytest.approx([p["probability"] for p in expected])
+        assert client.get("/jobs").json()["total"] == 1
+
+    def test_rejections(self, manager, monkeypatch):
+        """Vérifie les erreurs : format, job inconnu, chemin serveur désactivé, file pleine."""
+        assert client.post("/jobs", content="x", headers={"Content-Type": "text/plain"}).status_code == 415
+        assert client.get("/jobs/inconnu").status_code == 404
+        assert client.post("/jobs", params={"path": "lot.csv"}).status_code == 403
+
+        with monkeypatch.context() as patch:
+            patch.setattr(manager, "input_path", lambda job_id, fmt: manager.spool_dir / "absent" / "input.csv")
+            with pytest.raises(FileNotFoundError):
+                client.post("/jobs", content="age\n", headers={"Content-Type": "text/csv"})
+        # Envoi en échec : réservation et répertoire supprimés
+        assert manager.store.list() == [] and list(manager.spool_dir.iterdir()) == []
+
+        manager.store.create({"job_id": "a", "status": "running", "created_at": "1"})
+        manager.store.create({"job_id": "b", "status": "queued", "created_at": "2"})
+        response = client.post("/jobs", content="[]", headers={"Content-Type": "application/json"})
+        assert response.status_code == 429
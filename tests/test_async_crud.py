@@ -0,0 +1,171 @@
+"""
+Tests pour l'accès asynchrone à la base (src/database/connection.py, async_crud.py).
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from src.database import async_crud, connection, crud
+from src.database.connection import Base
+from src.database.models import Employee, Prediction
+
+
+EMPLOYEE = {
+    'age': 35, 'genre': 'M', 'revenu_mensuel': 5000.0, 'statut_marital': 'Marié(e)',
+    'departement': 'Consulting', 'poste': 'Consultant', 'heure_supplementaires': 'Non',
+}
+
+
+def run(coroutine_fn, tmp_path):
+    """Exécute un scénario avec une session aiosqlite sur une base neuve."""
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'hr.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                return await coroutine_fn(db)
+        finally:
+            await engine.dispose()
+    return asyncio.run(scenario())
+
+
+def test_to_async_url():
+    """Vérifie la conversion des URL vers les pilotes asynchrones."""
+    assert connection.to_async_url("postgresql://u:p@h:5432/db") == "postgresql+asyncpg://u:p@h:5432/db"
+    assert connection.to_async_url("sqlite:///hr.db") == "sqlite+aiosqlite:///hr.db"
+    with pytest.raises(ValueError):
+        connection.to_async_url("mysql://u:p@h/db")
+
+
+def test_engine_options_configure_pool_and_timeouts(monkeypatch):
+    """Vérifie les options de pool, délais et cache selon le pilote."""
+    monkeypatch.setattr(connection, "DB_STATEMENT_TIMEOUT_MS", 5000)
+    options = connection.engine_options("postgresql+asyncpg://u:p@h/db")
+    assert options["pool_size"] == connection.DB_POOL_SIZE
+    assert options["connect_args"]["statement_cache_size"] == connection.DB_STATEMENT_CACHE_SIZE
+    assert options["connect_args"]["server_settings"] == {"statement_timeout": "5000"}
+
+    sync_options = connection.engine_options("postgresql://u:p@h/db")
+    assert sync_options["connect_args"]["options"] == "-c statement_timeout=5000"
+    assert "pool_size" not in connection.engine_options("sqlite+aiosqlite:///hr.db")
+
+
+def test_create_and_read_employee_with_prediction(tmp_path):
+    """Vérifie la création et la lecture asynchrones d'un employé et de sa prédiction."""
+    async def scenario(db):
+        employee, prediction = await async_crud.create_employee_with_prediction(
+            db, EMPLOYEE, prediction=1, probability=0.8, label="Risque de départ", model_version="2.0.0"
+        )
+        fetched = await async_crud.get_employee(db, employee.id)
+        history = await async_crud.get_predictions_by_employee(db, employee.id)
+        by_department = await async_crud.get_employees_by_department(db, "Consulting")
+        return employee, prediction, fetched, history, by_department
+
+    employee, prediction, fetched, history, by_department = run(scenario, tmp_path)
+    assert fetched.poste == "Consultant"
+    assert prediction.content_hash == employee.content_hash
+    assert [p.model_version for p in history] == ["2.0.0"]
+    assert len(by_department) == 1
+
+
+def test_statistics(tmp_path):
+    """Vérifie les statistiques calculées en une requête."""
+    async def scenario(db):
+        empty = await async_crud.get_statistics(db)
+        employee = await async_crud.create_employee(db, EMPLOYEE)
+        for prediction, probability in ((1, 0.9), (0, 0.2), (0, 0.1)):
+            await async_crud.create_prediction(db, employee.id, prediction, probability, "x")
+        return empty, await async_crud.get_statistics(db), await async_crud.get_high_risk_predictions(db)
+
+    empty, stats, high_risk = run(scenario, tmp_path)
+    assert empty == {"total_predictions": 0, "at_risk": 0, "stable": 0, "risk_ratio": 0}
+    assert stats["total_predictions"] == 3 and stats["at_risk"] == 1 and stats["stable"] == 2
+    assert len(high_risk) == 1
+
+
+@pytest.fixture
+def history(tmp_path):
+    """Un employé et 1000 prédictions horaires à partir du 1er janvier 2024."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'hr.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Employee), [{**EMPLOYEE, 'id': 1}])
+        conn.execute(insert(Prediction), [
+            {'employee_id': 1, 'prediction': 0, 'probability': (i % 10) / 10, 'label': 'Stable',
+             'predicted_at': datetime(2024, 1, 1) + timedelta(hours=i)}
+            for i in range(1000)
+        ])
+    return engine
+
+
+def test_trajectory_is_bucketed_by_the_database(history, tmp_path):
+    """Vérifie le sous-échantillonnage (au plus max_points) et l'égalité sync/async."""
+    with Session(history) as db:
+        auto = crud.get_risk_trajectory(db, 1, max_points=10)
+        daily = crud.get_risk_trajectory(db, 1, interval='day')
+        window = crud.get_risk_trajectory(
+            db, 1, start=datetime(2024, 1, 3), end=datetime(2024, 1, 3, 23), interval='hour'
+        )
+        assert crud.get_risk_trajectory(db, 2)['points'] == []
+
+    assert auto['total_predictions'] == 1000 and len(auto['points']) == 10
+    assert sum(p['count'] for p in auto['points']) == 1000
+    assert daily['bucket_seconds'] == 86400 and len(daily['points']) == 42
+    assert daily['points'][0]['count'] == 24 and daily['points'][0]['max_probability'] == 0.9
+    assert [p['count'] for p in window['points']] == [1] * 24
+    assert window['points'][0]['bucket_start'].isoformat() == '2024-01-03T00:00:00+00:00'
+
+    async def from_history():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'hr.db'}")
+        try:
+            async with async_sessionmaker(engine)() as db:
+                return await async_crud.get_risk_trajectory(db, 1, max_points=10)
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(from_history()) == auto
+
+
+def test_trajectory_bucket_boundaries_are_floored(tmp_path):
+    """Vérifie qu'une prédiction à 23:59:59.6 reste dans son jour (origine et base arrondies à l'inférieur)."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'boundary.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Employee), [{'id': 1, **EMPLOYEE}])
+        conn.execute(insert(Prediction), [
+            {'employee_id': 1, 'prediction': 0, 'probability': probability, 'label': 'Stable', 'predicted_at': at}
+            for probability, at in [
+                (0.1, datetime(2024, 1, 1, 0, 0, 0, 400000)),
+                (0.2, datetime(2024, 1, 1, 23, 59, 59, 600000)),
+                (0.3, datetime(2024, 1, 2)),
+            ]
+        ])
+    with Session(engine) as db:
+        daily = crud.get_risk_trajectory(db, 1, interval='day')
+    engine.dispose()
+
+    assert crud.epoch_seconds(datetime(2024, 1, 1, 23, 59, 59, 600000)) == crud.epoch_seconds(datetime(2024, 1, 2)) - 1
+    assert [(p['bucket_start'].isoformat(), p['count']) for p in daily['points']] == [
+        ('2024-01-01T00:00:00+00:00', 2), ('2024-01-02T00:00:00+00:00', 1),
+    ]
+    stmt = crud.trajectory_query(1, None, None, 0, 86400)
+    assert 'floor(EXTRACT(epoch FROM predictions.predicted_at))' in str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_trajectory_query_uses_composite_index(history):
+    """Vérifie que la trajectoire est un parcours de plage de l'index (employee_id, predicted_at)."""
+    stmt = crud.trajectory_query(1, datetime(2024, 1, 3), None, 0, 3600)
+    sql = str(stmt.compile(history, compile_kwargs={"literal_binds": True}))
+    with history.connect() as conn:
+        plan = " ".join(str(row) for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+    assert 'idx_predictions_employee_predicted_at (employee_id=? AND predicted_at>?)' in plan
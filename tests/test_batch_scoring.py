@@ -0,0 +1,196 @@
+"""
+Tests pour le scoring des employés stockés (src/database/batch_scoring.py).
+"""
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, insert, select, update
+
+from src.database.connection import Base
+from src.database.models import Employee, Prediction
+from src.database.batch_scoring import score_employees
+from src.scoring import CompiledModel, FeatureEncoder
+
+
+def make_model() -> CompiledModel:
+    """Modèle synthétique : âge, heures sup, département, note (NULL) et un champ absent de la table."""
+    names = ['age', 'heure_supplementaires', 'departement_Consulting', 'note_evaluation_actuelle', 'score_engagement']
+    fields = ['age', 'heure_supplementaires', 'departement', 'note_evaluation_actuelle', 'score_engagement']
+    levels = ['', '', 'Consulting', '', '']
+    encoder = FeatureEncoder(names, fields, levels)
+    return CompiledModel(
+        encoder,
+        mean=np.array([40.0, 0.3, 0.5, 3.0, 2.0]),
+        scale=np.ones(5),
+        coef=np.array([-0.1, 2.0, 0.5, 1.0, 1.0]),
+        intercept=0.0,
+    )
+
+
+def employee(i: int, departement: str, heure_supplementaires='Non') -> dict:
+    return {
+        'id': i, 'age': 20 + i % 40, 'genre': 'M', 'revenu_mensuel': 3000.0,
+        'statut_marital': 'Célibataire', 'departement': departement, 'poste': 'Consultant',
+        'heure_supplementaires': heure_supplementaires,
+    }
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'hr.db'}")
+    Base.metadata.create_all(engine)
+    rows = [employee(i, 'Consulting' if i % 2 else 'Commercial') for i in range(1, 1001)]
+    rows[0]['heure_supplementaires'] = None
+    with engine.begin() as conn:
+        conn.execute(insert(Employee), rows)
+    return engine
+
+
+def stored_predictions(engine) -> dict:
+    with engine.connect() as conn:
+        rows = conn.execute(select(Prediction.employee_id, Prediction.probability, Prediction.model_version))
+        return {employee_id: (probability, version) for employee_id, probability, version in rows}
+
+
+def test_scores_all_employees_in_chunks(engine):
+    """Vérifie que chaque employé reçoit une prédiction, bloc par bloc."""
+    stats = score_employees(engine, make_model(), '2.0.0', chunk_size=300)
+    assert stats['scored'] == 1000
+    assert stats['chunks'] == 4
+    assert stats['imputed_fields'] == ['score_engagement']
+
+    predictions = stored_predictions(engine)
+    assert len(predictions) == 1000
+    assert {version for _, version in predictions.values()} == {'2.0.0'}
+
+
+def test_probabilities_match_vectorized_scorer(engine):
+    """Vérifie les probabilités enregistrées contre un scoring direct (champ absent = moyenne)."""
+    model = make_model()
+    score_employees(engine, model, '2.0.0')
+    predictions = stored_predictions(engine)
+
+    X = model.encode([{'age': 23, 'heure_supplementaires': 'Non', 'departement': 'Consulting',
+                       'note_evaluation_actuelle': 3.0, 'score_engagement': 2.0}])
+    assert predictions[3][0] == pytest.approx(model.predict_proba(X)[0])
+
+
+def test_null_values_are_imputed(engine):
+    """Vérifie qu'une valeur NULL ne contribue pas au score."""
+    model = make_model()
+    score_employees(engine, model, '2.0.0', id_max=1)
+    X = model.encode([{'age': 21, 'heure_supplementaires': 'Non', 'departement': 'Consulting',
+                       'note_evaluation_actuelle': 3.0, 'score_engagement': 2.0}])
+    X[0, 1] = model.mean[1]
+    assert stored_predictions(engine)[1][0] == pytest.approx(model.predict_proba(X)[0])
+
+
+def test_filters_by_department_and_id_range(engine):
+    """Vérifie les filtres département et plage d'identifiants."""
+    stats = score_employees(engine, make_model(), '2.0.0', departement='Consulting', id_min=101, id_max=200)
+    assert stats['scored'] == 50
+    assert all(i % 2 and 101 <= i <= 200 for i in stored_predictions(engine))
+
+
+def test_feature_vectors_are_stored_and_reused(engine):
+    """Vérifie que les vecteurs encodés sont stockés puis relus sans ré-encodage."""
+    model = make_model()
+    first = score_employees(engine, model, '2.0.0')
+    second = score_employees(engine, model, '2.0.0')
+    assert first['encoded'] == 1000
+    assert second['encoded'] == 0
+
+    with engine.connect() as conn:
+        row = conn.execute(select(Employee.features, Employee.encoder_version).where(Employee.id == 3)).one()
+    assert row.encoder_version == model.encoder.version
+    assert len(row.features) == 4 * model.encoder.n_features
+
+    with engine.connect() as conn:
+        probabilities = conn.execute(
+            select(Prediction.probability).where(Prediction.employee_id == 3)
+        ).scalars().all()
+    assert probabilities[0] == probabilities[1]
+
+
+def test_encoder_change_triggers_reencoding(engine):
+    """Vérifie que les vecteurs d'une autre version d'encodeur sont recalculés."""
+    score_employees(engine, make_model(), '2.0.0')
+    names = ['age', 'genre']
+    other = CompiledModel(FeatureEncoder(names, names, ['', '']), np.zeros(2), np.ones(2), np.ones(2), 0.0)
+    stats = score_employees(engine, other, '3.0.0', id_max=10)
+    assert stats['encoded'] == 10
+
+
+def test_empty_selection(engine):
+    """Vérifie qu'une sélection vide n'écrit rien."""
+    stats = score_employees(engine, make_model(), '2.0.0', departement='Inconnu')
+    assert stats['scored'] == 0
+    assert stats['chunks'] == 0
+    assert stored_predictions(engine) == {}
+
+
+def test_incremental_rescoring_only_changed_employees(engine):
+    """Vérifie que le mode incrémental ne rescore que les employés modifiés."""
+    model = make_model()
+    first = score_employees(engine, model, '2.0.0', incremental=True)
+    assert (first['scored'], first['skipped']) == (1000, 0)
+
+    unchanged = score_employees(engine, model, '2.0.0', incremental=True)
+    assert (unchanged['scored'], unchanged['skipped']) == (0, 1000)
+
+    # Modification de deux employés : leur vecteur et leur empreinte sont invalidés
+    with engine.begin() as conn:
+        conn.execute(
+            update(Employee).where(Employee.id.in_([5, 6])).values(age=60, features=None, content_hash=None)
+        )
+        conn.execute(insert(Employee), [employee(1001, 'Consulting')])
+    delta = score_employees(engine, model, '2.0.0', incremental=True)
+    assert (delta['scored'], delta['skipped']) == (3, 998)
+
+
+def test_incremental_rescoring_after_model_change(engine):
+    """Vérifie qu'un changement de version du modèle rescore tout le monde."""
+    model = make_model()
+    score_employees(engine, model, '2.0.0', incremental=True)
+    stats = score_employees(engine, model, '2.1.0', incremental=True)
+    assert (stats['scored'], stats['skipped']) == (1000, 0)
+
+
+def test_content_hash_matches_crud(engine):
+    """Vérifie que le job et crud.create_employee calculent la même empreinte."""
+    from sqlalchemy.orm import Session
+    from src.database.crud import create_employee
+
+    with Session(engine) as db:
+        created = create_employee(db, {k: v for k, v in employee(2000, 'Consulting').items() if k != 'id'})
+        employee_id, expected = created.id, created.content_hash
+        created.content_hash = None
+        db.commit()
+
+    score_employees(engine, make_model(), '2.0.0', id_min=employee_id)
+    with engine.connect() as conn:
+        assert conn.execute(select(Employee.content_hash).where(Employee.id == employee_id)).scalar() == expected
+
+
+def test_latest_probability_serves_top_k_ranking(engine):
+    """Vérifie le classement top-K sur la dernière prédiction, servi par l'index."""
+    from sqlalchemy.orm import Session
+    from src.database.crud import get_top_at_risk, top_at_risk_query
+
+    score_employees(engine, make_model(), '1.0.0')
+    with engine.begin() as conn:
+        conn.execute(update(Employee).where(Employee.id == 2).values(heure_supplementaires='Oui', features=None))
+    score_employees(engine, make_model(), '2.0.0', id_min=2, id_max=2)
+
+    with Session(engine) as db:
+        top = get_top_at_risk(db, k=10, departement='Commercial')
+        assert top[0].id == 2 and top[0].risk_model_version == '2.0.0'
+        probabilities = [e.risk_probability for e in top]
+        assert len(top) == 10 and probabilities == sorted(probabilities, reverse=True)
+        assert {e.departement for e in top} == {'Commercial'}
+
+    with engine.connect() as conn:
+        sql = str(top_at_risk_query(10, 'Commercial').compile(engine, compile_kwargs={"literal_binds": True}))
+        plan = " ".join(str(row) for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+    assert 'idx_employees_departement_risk' in plan
+    assert 'TEMP B-TREE' not in plan  # pas de tri
@@ -0,0 +1,91 @@
+"""
+Tests pour la surveillance de dérive (src/drift.py).
+"""
+
+import numpy as np
+import pytest
+
+from src.drift import DriftBaseline, DriftMonitor, psi, REFERENCE_LEVEL
+from src.scoring import FeatureEncoder
+
+
+@pytest.fixture
+def encoder():
+    # age (numérique), genre (binaire), poste (famille one-hot, 'Consultant' en référence)
+    return FeatureEncoder(
+        ['age', 'genre', 'poste_Manager', 'poste_Tech Lead'],
+        ['age', 'genre', 'poste', 'poste'],
+        ['', '', 'Manager', 'Tech Lead']
+    )
+
+
+def make_matrix(rng, n, age_mean=40.0, poste_p=(0.5, 0.3, 0.2)):
+    poste = rng.choice(3, size=n, p=poste_p)
+    return np.column_stack([
+        rng.normal(age_mean, 8.0, n),
+        rng.integers(0, 2, n),
+        poste == 1,
+        poste == 2,
+    ]).astype(float)
+
+
+@pytest.fixture
+def baseline(encoder):
+    return DriftBaseline.from_matrix(make_matrix(np.random.default_rng(0), 5000), encoder)
+
+
+def test_streaming_moments_match_numpy(baseline):
+    """Vérifie que la fusion par lots (Welford/Chan) donne la moyenne et la variance exactes."""
+    X = make_matrix(np.random.default_rng(1), 1000)
+    monitor = DriftMonitor(baseline, buffer_size=64)
+    for start in range(0, 1000, 37):
+        monitor.observe(X[start:start + 37])
+    monitor.observe(X[:0])
+
+    report = monitor.report()
+    assert report["observed"] == 1000
+    np.testing.assert_allclose(monitor.mean, X.mean(axis=0))
+    np.testing.assert_allclose(monitor.m2 / monitor.count, X.var(axis=0))
+
+
+def test_no_drift_on_same_population(baseline):
+    """Vérifie qu'un trafic issu de la même population n'est pas signalé."""
+    monitor = DriftMonitor(baseline)
+    monitor.observe(make_matrix(np.random.default_rng(2), 3000))
+    report = monitor.report()
+    assert report["drifted"] == []
+    assert report["features"]["age"]["psi"] < 0.1
+
+
+def test_detects_numeric_and_categorical_drift(baseline):
+    """Vérifie la détection d'un décalage d'âge et de la répartition des postes."""
+    monitor = DriftMonitor(baseline)
+    monitor.observe(make_matrix(np.random.default_rng(3), 3000, age_mean=55.0, poste_p=(0.1, 0.1, 0.8)))
+    report = monitor.report()
+    assert set(report["drifted"]) == {"age", "poste"}
+    assert report["features"]["age"]["ks"] > 0.5
+    frequencies = report["features"]["poste"]["frequencies"]
+    assert frequencies["Tech Lead"]["observed"] == pytest.approx(0.8, abs=0.03)
+    assert frequencies[REFERENCE_LEVEL]["baseline"] == pytest.approx(0.5, abs=0.03)
+
+
+def test_report_without_traffic(baseline):
+    """Vérifie le rapport avant toute requête."""
+    report = DriftMonitor(baseline).report()
+    assert report["observed"] == 0
+    assert report["features"]["age"]["status"] == "no_data"
+
+
+def test_baseline_save_load(baseline, tmp_path):
+    """Vérifie la sérialisation JSON de la référence."""
+    path = tmp_path / 'baseline.json'
+    baseline.save(path)
+    loaded = DriftBaseline.load(path)
+    assert loaded.feature_names == baseline.feature_names
+    np.testing.assert_allclose(loaded.mean, baseline.mean)
+    assert loaded.histograms.keys() == baseline.histograms.keys()
+
+
+def test_psi_identical_distributions_is_zero():
+    """Vérifie que le PSI est nul pour deux distributions identiques."""
+    assert psi([10, 20, 30], [1, 2, 3]) == pytest.approx(0.0)
@@ -0,0 +1,127 @@
+"""
+Tests pour le rapport d'évaluation (src/evaluation.py).
+"""
+
+import json
+
+import numpy as np
+import pytest
+from sklearn.metrics import average_precision_score, f1_score, precision_score, recall_score, roc_auc_score
+
+from src.evaluation import (
+    calibration_bins,
+    evaluation_report,
+    group_metrics,
+    metrics_at,
+    pick_threshold,
+    save_report,
+    threshold_curve,
+)
+
+
+@pytest.fixture
+def scores():
+    """Cibles déséquilibrées (~16 % de départs) et probabilités arrondies (ex aequo)."""
+    rng = np.random.default_rng(0)
+    y = (rng.random(2000) < 0.16).astype(int)
+    probabilities = np.clip(0.3 * y + rng.normal(0.3, 0.15, y.size), 0, 1).round(2)
+    groups = rng.choice(['Commercial', 'Consulting', 'Ressources Humaines'], size=y.size)
+    return y, probabilities, groups
+
+
+def test_curve_matches_per_threshold_metrics(scores):
+    """Vérifie chaque point de la courbe contre un recalcul par seuil."""
+    y, probabilities, _ = scores
+    curve = threshold_curve(y, probabilities, cost_fp=1, cost_fn=5)
+    assert np.all(np.diff(curve["thresholds"]) < 0)
+    for i in (0, 10, len(curve["thresholds"]) // 2, -1):
+        predicted = probabilities > curve["thresholds"][i]
+        assert curve["precision"][i] == pytest.approx(precision_score(y, predicted, zero_division=0))
+        assert curve["recall"][i] == pytest.approx(recall_score(y, predicted))
+        assert curve["f1"][i] == pytest.approx(f1_score(y, predicted))
+        assert curve["cost"][i] == np.sum(predicted & (y == 0)) + 5 * np.sum(~predicted & (y == 1))
+
+
+def test_ranking_metrics_match_sklearn(scores):
+    """Vérifie ROC AUC et précision moyenne contre scikit-learn."""
+    y, probabilities, _ = scores
+    report = evaluation_report(y, probabilities)
+    assert report["roc_auc"] == pytest.approx(roc_auc_score(y, probabilities), abs=1e-4)
+    assert report["average_precision"] == pytest.approx(average_precision_score(y, probabilities), abs=1e-4)
+
+
+def test_pick_threshold(scores):
+    """Vérifie le choix du seuil (F1 max, coût min, contrainte de rappel) sans rescorer."""
+    y, probabilities, _ = scores
+    curve = threshold_curve(y, probabilities)
+    best = pick_threshold(curve, "f1")
+    assert best["f1"] == pytest.approx(max(
+        f1_score(y, probabilities > t) for t in np.unique(probabilities)
+    ))
+    assert pick_threshold(curve, "cost")["cost"] == curve["cost"].min()
+    constrained = pick_threshold(curve, "f1", min_recall=0.95)
+    assert constrained["recall"] >= 0.95
+    assert pick_threshold(curve, "f1", min_precision=1.1) is None
+    with pytest.raises(ValueError):
+        pick_threshold(curve, "accuracy")
+
+
+def test_curve_starts_with_nobody_flagged(scores):
+    """Vérifie le point « personne n'est signalé », que le choix par coût peut retenir."""
+    y, probabilities, _ = scores
+    curve = threshold_curve(y, probabilities, cost_fp=1, cost_fn=0)
+    assert curve["thresholds"][0] == probabilities.max()
+    assert curve["tp"][0] == curve["fp"][0] == 0
+    assert curve["tp"][-1] + curve["fp"][-1] == y.size
+    best = pick_threshold(curve, "cost")
+    assert best["recall"] == 0.0 and best["cost"] == 0
+    assert not np.any(probabilities > best["threshold"])
+
+
+def test_ties_at_threshold_follow_serving_rule():
+    """Vérifie qu'une probabilité égale au seuil n'est pas signalée, comme à la prédiction (> 0.5)."""
+    y = np.array([1, 0, 1, 0])
+    probabilities = np.array([0.9, 0.5, 0.5, 0.2])
+    curve = threshold_curve(y, probabilities)
+    at_half = metrics_at(curve, 0.5)
+    assert at_half["recall"] == 0.5 and at_half["precision"] == 1.0
+    assert group_metrics(y, probabilities, ['A'] * 4)['A']['predicted_positive'] == 1
+
+
+def test_metrics_at_arbitrary_threshold(scores):
+    """Vérifie les métriques entre deux seuils de la courbe et au-dessus du maximum."""
+    y, probabilities, _ = scores
+    curve = threshold_curve(y, probabilities)
+    assert metrics_at(curve, 0.505)["recall"] == pytest.approx(recall_score(y, probabilities > 0.505))
+    assert metrics_at(curve, -1.0)["recall"] == 1.0
+    above = metrics_at(curve, 2.0)
+    assert above["recall"] == 0.0 and above["cost"] == 5 * y.sum()
+
+
+def test_calibration_and_groups(scores):
+    """Vérifie les classes de calibration et les métriques par département."""
+    y, probabilities, groups = scores
+    calibration = calibration_bins(y, probabilities, n_bins=10)
+    assert sum(b["count"] for b in calibration["bins"]) == y.size
+    first = calibration["bins"][0]
+    in_bin = probabilities < first["upper"]
+    assert first["observed_rate"] == pytest.approx(y[in_bin].mean())
+    assert calibration["brier"] == pytest.approx(np.mean((probabilities - y) ** 2))
+
+    by_group = group_metrics(y, probabilities, groups)
+    mask = groups == 'Consulting'
+    assert by_group['Consulting']['count'] == mask.sum()
+    assert by_group['Consulting']['recall'] == pytest.approx(recall_score(y[mask], probabilities[mask] > 0.5))
+    assert by_group['Consulting']['f1'] == pytest.approx(f1_score(y[mask], probabilities[mask] > 0.5))
+
+
+def test_report_is_compact_json(scores, tmp_path):
+    """Vérifie que le rapport est sérialisable et de taille bornée."""
+    y, probabilities, groups = scores
+    report = evaluation_report(y, probabilities, groups=groups, max_curve_points=50)
+    assert len(report["curve"]["threshold"]) <= 52
+    assert report["best_f1"]["threshold"] in report["curve"]["threshold"]
+    assert set(report["by_group"]) == {'Commercial', 'Consulting', 'Ressources Humaines'}
+
+    save_report(report, tmp_path / "evaluation_report.json")
+    assert json.loads((tmp_path / "evaluation_report.json").read_text()) == report
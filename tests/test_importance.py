@@ -0,0 +1,105 @@
+"""
+Tests pour l'importance par permutation (src/importance.py).
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.importance import (
+    IMPORTANCE_FILE, cached_importance, feature_families, importance_report, permutation_importance,
+)
+from src.scoring import CompiledModel, FeatureEncoder
+
+
+@pytest.fixture
+def model():
+    """Modèle linéaire : âge très influent, famille poste_* modérée, revenu sans effet."""
+    names = ['age', 'revenu_mensuel', 'poste_Consultant', 'poste_Manager']
+    encoder = FeatureEncoder(names, ['age', 'revenu_mensuel', 'poste', 'poste'], ['', '', 'Consultant', 'Manager'])
+    return CompiledModel(encoder, np.zeros(4), np.ones(4), np.array([3.0, 0.0, 1.0, -1.0]), 0.0)
+
+
+@pytest.fixture
+def data(model):
+    rng = np.random.default_rng(0)
+    X = np.c_[rng.normal(size=(400, 2)), np.eye(2)[rng.integers(0, 2, 400)]]
+    y = (rng.random(400) < model.predict_proba(X)).astype(int)
+    return X, y
+
+
+class PipelineLike:
+    """Même modèle sans les poids exposés : chemin générique (predict_proba sur la matrice permutée)."""
+
+    def __init__(self, model):
+        self.model = model
+        self.encoder = model.encoder
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(X)
+
+
+def test_feature_families_group_one_hot_columns(model):
+    """Vérifie que les colonnes one-hot d'un même champ forment une famille."""
+    assert feature_families(model.encoder) == {'age': [0], 'revenu_mensuel': [1], 'poste': [2, 3]}
+
+
+def test_importance_ranks_features(model, data):
+    """Vérifie l'ordre des importances et l'absence d'effet d'une feature inutilisée."""
+    report = importance_report(model, *data, model_version='1.0.0', data_hash='abc', n_jobs=1)
+    assert [row['name'] for row in report['fields']] == ['age', 'poste', 'revenu_mensuel']
+    assert report['fields'][1]['features'] == ['poste_Consultant', 'poste_Manager']
+    assert report['fields'][-1]['importance'] == 0.0
+    assert len(report['features']) == 4
+    assert 0.5 < report['baseline'] <= 1
+
+
+def test_single_column_fields_are_not_permuted_twice(model, data, monkeypatch):
+    """Vérifie que seules les familles one-hot sont regroupées et qu'un champ numérique reprend sa feature."""
+    from src import importance
+
+    permuted = []
+    original = importance.permutation_importance
+
+    def spy(model, X, y, groups, *args):
+        permuted.extend(groups)
+        return original(model, X, y, groups, *args)
+
+    monkeypatch.setattr(importance, 'permutation_importance', spy)
+    report = importance_report(model, *data, model_version='1.0.0', data_hash='abc', n_jobs=1)
+    assert len(permuted) == 5
+    assert [kind for kind, _ in permuted].count('field') == 1
+    fields = {row['name']: row for row in report['fields']}
+    features = {row['name']: row for row in report['features']}
+    assert fields['age']['importance'] == features['age']['importance']
+    assert fields['age']['std'] == features['age']['std']
+
+
+def test_linear_shortcut_matches_generic_path(model, data):
+    """Vérifie que le raccourci linéaire donne les mêmes baisses que la permutation de la matrice."""
+    groups = {'age': [0], 'poste': [2, 3]}
+    linear = permutation_importance(model, *data, groups, n_repeats=3, n_jobs=1)
+    generic = permutation_importance(PipelineLike(model), *data, groups, n_repeats=3, n_jobs=1)
+    assert linear[0] == pytest.approx(generic[0])
+    for name in groups:
+        assert linear[1][name] == pytest.approx(generic[1][name])
+
+
+def test_parallel_matches_serial(model, data):
+    """Vérifie que le découpage entre workers ne change pas le résultat."""
+    groups = feature_families(model.encoder)
+    assert permutation_importance(model, *data, groups, n_jobs=1) == permutation_importance(model, *data, groups, n_jobs=2)
+
+
+def test_cache_is_keyed_by_version_and_data_hash(model, data, tmp_path):
+    """Vérifie la réutilisation du cache et le recalcul quand les données changent."""
+    first, cached = cached_importance(tmp_path, model, *data, '1.0.0', 'abc', n_jobs=1)
+    assert not cached and (tmp_path / IMPORTANCE_FILE).exists()
+
+    again, cached = cached_importance(tmp_path, model, *data, '1.0.0', 'abc', n_jobs=1)
+    assert cached and again == json.loads(json.dumps(first))
+
+    _, cached = cached_importance(tmp_path, model, *data, '1.0.0', 'def', n_jobs=1)
+    assert not cached
+    assert json.loads((tmp_path / IMPORTANCE_FILE).read_text())['data_hash'] == 'def'
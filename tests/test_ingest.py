@@ -0,0 +1,163 @@
+"""
+Tests pour l'import des extraits RH (src/database/ingest.py).
+"""
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, inspect, select, update
+
+from src.data_processing import load_data, prepare_features, process_and_merge
+from src.database import ingest
+from src.database.batch_scoring import score_employees
+from src.database.connection import Base
+from src.api.main import app
+from src.api.model_loader import get_registry, load_scorer
+from src.api.schemas import EmployeeInput
+from src.database.models import Employee, Prediction
+from src.scoring import CompiledModel, FeatureEncoder
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return ingest.prepare_frame(process_and_merge(*load_data(*ingest.DATA_FILES)))
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'hr.db'}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def count_employees(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(Employee)).scalar()
+
+
+def test_prepare_frame_normalizes_extracts(frame):
+    """Vérifie l'alignement sur la table employees (pourcentages, identifiants, empreintes)."""
+    assert list(frame.columns) == ingest.STAGED_COLUMNS
+    assert frame['id_employee'].is_unique
+    assert frame['augementation_salaire_precedente'].dtype == 'Int64'
+    assert frame['content_hash'].str.len().eq(32).all()
+
+
+def test_ingest_inserts_then_skips_unchanged(engine, frame):
+    """Vérifie l'import initial puis un réimport sans changement."""
+    first = ingest.ingest_frame(engine, frame, 'source', batch_size=500)
+    assert (first['loaded'], first['upserted'], first['batches']) == (len(frame), len(frame), 3)
+    assert count_employees(engine) == len(frame)
+
+    again = ingest.ingest_frame(engine, frame, 'source', batch_size=500)
+    assert again['loaded'] == 0  # source déjà importée
+
+    restarted = ingest.ingest_frame(engine, frame, 'source', batch_size=500, restart=True)
+    assert (restarted['upserted'], restarted['unchanged']) == (0, len(frame))
+
+
+def test_ingest_updates_changed_rows_and_invalidates_features(engine, frame):
+    """Vérifie qu'un employé modifié est mis à jour et son vecteur invalidé."""
+    ingest.ingest_frame(engine, frame, 'janvier')
+    with engine.begin() as conn:
+        conn.execute(update(Employee).values(features=b'x', encoder_version='ancien'))
+
+    changed = frame.copy()
+    changed.loc[0, 'age'] = 60
+    changed = ingest.prepare_frame(changed.drop(columns='content_hash').rename(columns={'id_employee': 'id'}))
+    stats = ingest.ingest_frame(engine, changed, 'fevrier')
+    assert (stats['upserted'], stats['unchanged']) == (1, len(frame) - 1)
+
+    with engine.connect() as conn:
+        rows = conn.execute(select(Employee.id_employee, Employee.age, Employee.features)).all()
+    assert count_employees(engine) == len(frame)
+    invalidated = [r for r in rows if r.features is None]
+    assert len(invalidated) == 1 and invalidated[0].age == 60
+
+
+def test_ingest_resumes_after_failure(engine, frame, monkeypatch):
+    """Vérifie qu'un import interrompu reprend au premier lot non validé."""
+    upsert = ingest._upsert_staged
+    calls = []
+
+    def failing_upsert(conn):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("connexion perdue")
+        return upsert(conn)
+
+    monkeypatch.setattr(ingest, '_upsert_staged', failing_upsert)
+    with pytest.raises(RuntimeError):
+        ingest.ingest_frame(engine, frame, 'source', batch_size=500)
+    assert count_employees(engine) == 500
+
+    monkeypatch.setattr(ingest, '_upsert_staged', upsert)
+    stats = ingest.ingest_frame(engine, frame, 'source', batch_size=500)
+    assert stats['resumed_from_row'] == 500
+    assert stats['loaded'] == len(frame) - 500
+    assert count_employees(engine) == len(frame)
+
+
+def test_ingested_hash_matches_scoring_job(engine, frame):
+    """Vérifie que l'empreinte calculée à l'import est celle recalculée par le scoring."""
+    ingest.ingest_frame(engine, frame, 'source')
+    with engine.begin() as conn:
+        expected = conn.execute(select(Employee.content_hash).where(Employee.id == 1)).scalar()
+        conn.execute(update(Employee).where(Employee.id == 1).values(content_hash=None))
+
+    names = ['age']
+    model = CompiledModel(FeatureEncoder(names, names, ['']), np.zeros(1), np.ones(1), np.ones(1), 0.0)
+    score_employees(engine, model, '1.0.0', id_max=1)
+    with engine.connect() as conn:
+        assert conn.execute(select(Employee.content_hash).where(Employee.id == 1)).scalar() == expected
+
+
+def test_staging_table_is_private_to_each_ingest(engine, frame, monkeypatch):
+    """Vérifie qu'un import lancé pendant un autre n'écrase pas son lot de staging."""
+    first_half, second_half = frame.iloc[:700], frame.iloc[700:]
+    stage = ingest._stage_rows
+    nested = {}
+
+    def stage_then_interleave(conn, batch):
+        stage(conn, batch)
+        if 'stats' not in nested:
+            # Deuxième import, sur une autre connexion, entre staging et upsert du premier
+            nested['stats'] = None
+            nested['stats'] = ingest.ingest_frame(engine, second_half, 'deuxieme')
+
+    monkeypatch.setattr(ingest, '_stage_rows', stage_then_interleave)
+    stats = ingest.ingest_frame(engine, first_half, 'premier')
+    assert stats['upserted'] == len(first_half)
+    assert nested['stats']['upserted'] == len(second_half)
+    assert count_employees(engine) == len(frame)
+    assert 'employees_staging' not in inspect(engine).get_table_names()
+
+
+def test_db_scoring_matches_predict_endpoint(engine, frame):
+    """
+    Vérifie que le scoring des employés importés donne la probabilité de /predict (même ligne CSV),
+    et celle du modèle sur l'encodage d'entraînement (prepare_features).
+    """
+    ingest.ingest_frame(engine, frame, 'source')
+    version = get_registry().config()["active"]
+    scorer = load_scorer(version)
+    score_employees(engine, scorer, version)
+
+    df_merged = process_and_merge(*load_data(*ingest.DATA_FILES))
+    X, _ = prepare_features(df_merged)
+    X = X.reindex(columns=scorer.feature_names, fill_value=0).to_numpy(dtype=float)
+    reference = dict(zip(df_merged['id'], scorer.predict_proba(X)))
+
+    with engine.connect() as conn:
+        stored = dict(conn.execute(
+            select(Employee.id_employee, Prediction.probability).join(Prediction, Prediction.employee_id == Employee.id)
+        ).all())
+
+    client = TestClient(app)
+    for row in frame.head(20).to_dict(orient="records"):
+        payload = {field: row[field] for field in EmployeeInput.model_fields}
+        payload = {k: int(v) if isinstance(v, (np.integer, int)) else v for k, v in payload.items()}
+        response = client.post("/predict", json=payload, params={"model_version": version})
+        assert response.status_code == 200, response.text
+        assert stored[row["id_employee"]] == pytest.approx(response.json()["probability"], rel=1e-6)
+        assert stored[row["id_employee"]] == pytest.approx(reference[row["id_employee"]], rel=1e-6)
@@ -0,0 +1,213 @@
+"""
+Tests pour les jobs de scoring asynchrones (src/api/jobs.py).
+"""
+
+import csv
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from src.api import jobs
+from src.api.model_loader import get_registry, predict_batch
+from src.api.schemas import EmployeeInput
+
+
+EMPLOYEE = EmployeeInput.model_config["json_schema_extra"]["examples"][0]
+
+
+def employees(n: int) -> list:
+    return [{**EMPLOYEE, "age": 20 + i % 40, "heure_supplementaires": "Oui" if i % 3 else "Non"} for i in range(n)]
+
+
+def write_csv(path, rows: list) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def read_result(manager, job_id: str) -> list:
+    with open(manager.result_path(job_id), newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def wait(manager, job_id: str, timeout: float = 60) -> dict:
+    deadline = time.monotonic() + timeout
+    while (job := manager.store.get(job_id))["status"] in jobs.ACTIVE_STATUSES:
+        assert time.monotonic() < deadline, "job non terminé"
+        time.sleep(0.05)
+    return job
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def manager(request, tmp_path):
+    store = jobs.SQLiteJobStore(tmp_path / "jobs.db") if request.param == "sqlite" else jobs.MemoryJobStore()
+    manager = jobs.JobManager(store, tmp_path / "spool", workers=0, max_running=1, max_queued=3, chunk_size=40)
+    yield manager
+    manager.shutdown()
+
+
+def submit(manager, rows: list, input_format: str = "csv") -> str:
+    job_id = manager.new_job_id(input_format, get_registry().config()["active"])
+    path = manager.input_path(job_id, input_format)
+    if input_format == "csv":
+        write_csv(path, rows)
+    elif input_format == "ndjson":
+        path.write_text("\n".join(json.dumps(row) for row in rows) + "\n")
+    else:
+        path.write_text(json.dumps({"employees": rows}))
+    manager.submit(job_id, path)
+    return job_id
+
+
+@pytest.mark.parametrize("input_format", ["csv", "ndjson", "json"])
+def test_job_scores_in_chunks_like_batch_endpoint(manager, input_format):
+    """Vérifie résultats, ordre et progression d'un job lu par blocs."""
+    rows = employees(100)
+    job_id = submit(manager, rows, input_format)
+    job = wait(manager, job_id)
+    assert job["status"] == "succeeded"
+    assert (job["total_rows"], job["processed_rows"], job["failed_rows"]) == (100, 100, 0)
+
+    result = read_result(manager, job_id)
+    expected = predict_batch(rows)
+    assert [int(r["row"]) for r in result] == list(range(100))
+    np.testing.assert_allclose([float(r["probability"]) for r in result], [p for _, p in expected])
+    assert [int(r["prediction"]) for r in result] == [p for p, _ in expected]
+
+
+def test_invalid_rows_are_reported_not_scored(manager):
+    """Vérifie qu'une ligne invalide est signalée sans faire échouer le job."""
+    rows = employees(50)
+    rows[7]["age"] = 12
+    rows[45]["departement"] = ""
+    job = wait(manager, submit(manager, rows))
+    assert job["status"] == "succeeded" and job["failed_rows"] == 2
+
+    result = read_result(manager, job["job_id"])
+    assert result[7]["prediction"] == "" and result[7]["error"].startswith("age:")
+    assert result[45]["error"].startswith("departement:")
+    assert result[8]["error"] == "" and result[8]["label"]
+
+
+def queued_job(manager, rows: list, **fields) -> str:
+    """Enregistre un job en attente sans le lancer."""
+    job_id = manager.new_job_id("csv", get_registry().config()["active"])
+    path = manager.input_path(job_id, "csv")
+    write_csv(path, rows)
+    manager.store.update(job_id, status="queued", input_path=str(path), **fields)
+    return job_id
+
+
+def test_cancel_queued_and_running_jobs(manager):
+    """Vérifie l'annulation d'un job en attente, et l'arrêt d'un job en cours avant le bloc suivant."""
+    queued = queued_job(manager, employees(10))
+    assert manager.cancel(queued)["status"] == "cancelled"
+    manager.run(queued)
+    assert manager.store.get(queued)["processed_rows"] == 0
+
+    running = queued_job(manager, employees(200), cancel_requested=True)
+    manager.run(running)
+    job = manager.store.get(running)
+    assert job["status"] == "cancelled" and job["processed_rows"] == 0
+    assert not manager.result_path(running).exists()
+
+
+def test_queue_limit(manager):
+    """Vérifie le refus des soumissions au-delà de max_queued."""
+    for i in range(3):
+        manager.store.create({**dict.fromkeys(jobs.JOB_FIELDS), "job_id": str(i), "status": "running",
+                              "worker_pid": 1, "cancel_requested": False, "created_at": str(i)})
+    with pytest.raises(jobs.JobQueueFull):
+        manager.new_job_id("csv", "1.0.0")
+
+
+def test_queue_limit_holds_under_concurrent_submissions(tmp_path):
+    """Vérifie que des réservations simultanées (deux workers SQLite) ne dépassent pas max_queued."""
+    managers = [
+        jobs.JobManager(jobs.SQLiteJobStore(tmp_path / "jobs.db"), tmp_path / "spool", workers=0, max_queued=5)
+        for _ in range(2)
+    ]
+
+    def reserve(i):
+        try:
+            return managers[i % 2].new_job_id("csv", "1.0.0")
+        except jobs.JobQueueFull:
+            return None
+
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            reserved = [job_id for job_id in pool.map(reserve, range(40)) if job_id]
+        assert len(reserved) == 5
+        assert managers[0].store.count(jobs.ACTIVE_STATUSES) == 5
+        assert {job["status"] for job in managers[1].store.list()} == {"uploading"}
+    finally:
+        for manager in managers:
+            manager.shutdown()
+
+
+def test_cancel_during_upload(manager):
+    """Vérifie qu'un job annulé pendant l'envoi n'est pas lancé."""
+    job_id = manager.new_job_id("csv", get_registry().config()["active"])
+    assert manager.cancel(job_id)["status"] == "cancelled"
+    path = manager.input_path(job_id, "csv")
+    write_csv(path, employees(5))
+    assert manager.submit(job_id, path)["status"] == "cancelled"
+    assert manager.store.get(job_id)["processed_rows"] == 0
+
+
+def test_finished_jobs_are_purged_after_retention(manager):
+    """Vérifie la suppression des jobs terminés trop anciens (répertoire et état), pas des jobs actifs."""
+    from datetime import datetime, timedelta
+
+    done = wait(manager, submit(manager, employees(5)))["job_id"]
+    active = queued_job(manager, employees(5))
+    assert manager.result_path(done).exists()
+
+    assert manager.purge_expired() == 0
+    later = datetime.utcnow() + timedelta(hours=manager.retention_hours + 1)
+    assert manager.purge_expired(now=later) == 1
+    assert manager.store.get(done) is None and not (manager.spool_dir / done).exists()
+    assert manager.store.get(active)["status"] == "queued"
+
+
+def test_sqlite_store_recovers_interrupted_jobs(tmp_path):
+    """Vérifie qu'un job actif d'un processus disparu est marqué en échec au redémarrage."""
+    store = jobs.SQLiteJobStore(tmp_path / "jobs.db")
+    store.create({**dict.fromkeys(jobs.JOB_FIELDS), "job_id": "a", "status": "running",
+                  "worker_pid": 2 ** 22 + 1, "cancel_requested": False, "created_at": "1"})
+    manager = jobs.JobManager(jobs.SQLiteJobStore(tmp_path / "jobs.db"), tmp_path / "spool", workers=0)
+    job = manager.store.get("a")
+    assert job["status"] == "failed" and "Interrompu" in job["error"]
+    manager.shutdown()
+
+
+def test_process_pool_reuses_model_in_workers(tmp_path):
+    """Vérifie le scoring dans un pool de processus (modèle chargé par chaque processus)."""
+    manager = jobs.JobManager(jobs.MemoryJobStore(), tmp_path / "spool", workers=2, chunk_size=25)
+    try:
+        rows = employees(120)
+        job = wait(manager, submit(manager, rows))
+        assert job["status"] == "succeeded", job["error"]
+        result = read_result(manager, job["job_id"])
+        np.testing.assert_allclose([float(r["probability"]) for r in result], [p for _, p in predict_batch(rows)])
+    finally:
+        manager.shutdown()
+
+
+def test_resolve_input_path(tmp_path, monkeypatch):
+    """Vérifie que seuls les fichiers de JOB_INPUT_DIR sont acceptés."""
+    (tmp_path / "lot.csv").write_text("age\n")
+    monkeypatch.setattr(jobs, "JOB_INPUT_DIR", "")
+    with pytest.raises(PermissionError):
+        jobs.resolve_input_path("lot.csv")
+
+    monkeypatch.setattr(jobs, "JOB_INPUT_DIR", str(tmp_path))
+    assert jobs.resolve_input_path("lot.csv") == (tmp_path / "lot.csv").resolve()
+    with pytest.raises(PermissionError):
+        jobs.resolve_input_path("../etc/passwd")
+    with pytest.raises(FileNotFoundError):
+        jobs.resolve_input_path("absent.csv")
@@ -0,0 +1,40 @@
+"""
+Tests de cohérence de la migration d'une base existante (scripts/migrate.sql).
+"""
+
+import re
+from pathlib import Path
+
+from src.database.models import Employee, Prediction
+
+SCRIPTS = Path(__file__).parent.parent / "scripts"
+MIGRATION = (SCRIPTS / "migrate.sql").read_text(encoding="utf-8")
+INIT = (SCRIPTS / "init.sql").read_text(encoding="utf-8")
+
+
+def added_columns(sql: str) -> set:
+    return set(re.findall(r"ADD COLUMN IF NOT EXISTS (\w+)", sql))
+
+
+def test_added_columns_exist_in_models():
+    """Vérifie que chaque colonne ajoutée par la migration est déclarée dans les modèles."""
+    model_columns = {column.name for table in (Employee.__table__, Prediction.__table__) for column in table.columns}
+    assert added_columns(MIGRATION)
+    assert added_columns(MIGRATION) <= model_columns
+
+
+def test_migration_is_idempotent():
+    """Vérifie que chaque instruction peut être rejouée (IF [NOT] EXISTS)."""
+    assert not re.search(r"ADD COLUMN (?!IF NOT EXISTS)", MIGRATION)
+    assert not re.search(r"CREATE (UNIQUE )?INDEX (?!IF NOT EXISTS)", MIGRATION)
+    assert not re.search(r"DROP INDEX (?!IF EXISTS)", MIGRATION)
+    assert not re.search(r"CREATE INDEX (?!IF NOT EXISTS)", INIT)
+
+
+def test_model_indexes_are_migrated():
+    """Vérifie que chaque index déclaré dans les modèles est créé par la migration."""
+    indexes = {index.name for table in (Employee.__table__, Prediction.__table__) for index in table.indexes
+               if index.name.startswith("idx_")}
+    created = set(re.findall(r"CREATE INDEX IF NOT EXISTS (\w+)", MIGRATION))
+    assert indexes
+    assert indexes <= created
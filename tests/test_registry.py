@@ -0,0 +1,145 @@
+"""
+Tests pour le registre de modèles versionnés (src/registry.py).
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.registry import ModelRegistry, hash_files, model_nbytes
+from src.scoring import CompiledModel, FeatureEncoder
+
+
+def make_model(coef: float, n_features: int = 2) -> CompiledModel:
+    """Modèle compilé synthétique : proba = sigmoid(coef * age)."""
+    names = ['age', 'revenu_mensuel'][:n_features]
+    encoder = FeatureEncoder(names, names, [''] * n_features)
+    coefs = np.zeros(n_features)
+    coefs[0] = coef
+    return CompiledModel(encoder, np.zeros(n_features), np.ones(n_features), coefs, 0.0)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = ModelRegistry(tmp_path / 'models')
+    registry.publish('1.0.0', make_model(0.1), {'metrics': {'accuracy': 0.8}})
+    registry.publish('1.1.0', make_model(-0.1), {'metrics': {'accuracy': 0.9}}, activate=False)
+    return registry
+
+
+def test_publish_sets_active_and_candidate(registry):
+    """Vérifie la configuration après publication."""
+    config = registry.config()
+    assert config['active'] == '1.0.0'
+    assert config['candidate'] == '1.1.0'
+    assert registry.versions() == ['1.0.0', '1.1.0']
+    assert registry.metadata('1.1.0')['features'] == ['age', 'revenu_mensuel']
+
+
+def test_publish_refuses_existing_version(registry):
+    """Vérifie qu'une version publiée est immuable."""
+    with pytest.raises(ValueError):
+        registry.publish('1.0.0', make_model(0.2), {})
+
+
+def test_get_loads_requested_version(registry):
+    """Vérifie que chaque version charge son propre artefact."""
+    X = np.array([[10.0, 0.0]])
+    assert registry.get('1.0.0').predict_proba(X)[0] > 0.5
+    assert registry.get('1.1.0').predict_proba(X)[0] < 0.5
+    assert registry.get().predict_proba(X)[0] > 0.5  # version active
+
+
+def test_lru_eviction_respects_budget(registry):
+    """Vérifie que le cache évince le modèle le moins récemment utilisé."""
+    registry.max_bytes = 1  # Budget minimal : un seul modèle résident
+    registry.get('1.0.0')
+    registry.get('1.1.0')
+    assert registry.resident() == ['1.1.0']
+
+
+def test_model_nbytes_counts_retained_objects():
+    """Vérifie que l'empreinte inclut l'encodeur et un éventuel pipeline retenu, pas seulement les vecteurs."""
+    model = make_model(0.1)
+    vectors = sum(a.nbytes for a in (model.mean, model.scale, model.coef, model.weights))
+    assert model_nbytes(model) > vectors
+
+    class PipelineScorer:
+        def __init__(self, pipeline):
+            self.pipeline = pipeline
+
+    pipeline = {'coef': np.zeros(100_000)}
+    assert model_nbytes(PipelineScorer(pipeline)) > 800_000
+
+
+def test_lru_budget_on_real_footprint(registry):
+    """Vérifie l'éviction avec un budget d'un modèle et demi (empreinte réelle)."""
+    registry.max_bytes = model_nbytes(make_model(0.1)) * 3 // 2
+    registry.get('1.0.0')
+    registry.get('1.1.0')
+    assert registry.resident() == ['1.1.0']
+
+
+def test_concurrent_first_requests_load_once(registry, monkeypatch):
+    """Vérifie qu'une version demandée par plusieurs threads n'est chargée qu'une fois."""
+    loads = []
+    original = registry._load
+
+    def slow_load(version):
+        loads.append(version)
+        time.sleep(0.05)
+        return original(version)
+
+    monkeypatch.setattr(registry, '_load', slow_load)
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(registry.get('1.0.0'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loads == ['1.0.0']
+    assert len(models) == 8 and all(model is models[0] for model in models)
+
+
+def test_resolve_pinned_and_unknown_version(registry):
+    """Vérifie la résolution d'une version épinglée."""
+    assert registry.resolve('1.1.0') == '1.1.0'
+    with pytest.raises(KeyError):
+        registry.resolve('9.9.9')
+
+
+def test_resolve_canary_fraction(registry):
+    """Vérifie le routage canary vers le candidat."""
+    assert registry.resolve() == '1.0.0'
+    config = registry.config()
+    config['canary_fraction'] = 1.0
+    registry.save_config(config)
+    assert registry.resolve() == '1.1.0'
+
+
+def test_shadow_stats(registry):
+    """Vérifie l'accumulation des écarts shadow."""
+    registry.record_shadow([0.9, 0.2], [0.4, 0.3])
+    shadow = registry.status()['shadow']
+    assert shadow['rows'] == 2
+    assert shadow['disagreements'] == 1
+    assert shadow['mean_abs_diff'] == pytest.approx(0.3)
+
+
+def test_fallback_when_registry_empty(tmp_path):
+    """Vérifie que le modèle historique est servi quand le registre est vide."""
+    model = make_model(0.1)
+    registry = ModelRegistry(tmp_path / 'empty', fallback=('1.0.0', lambda: model))
+    assert registry.resolve() == '1.0.0'
+    assert registry.get() is model
+
+
+def test_hash_files_depends_on_content(tmp_path):
+    """Vérifie que le hash des données change avec le contenu."""
+    path = tmp_path / 'data.csv'
+    path.write_text('a,b\n1,2\n')
+    first = hash_files([path])
+    path.write_text('a,b\n1,3\n')
+    assert hash_files([path]) != first
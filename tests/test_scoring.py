@@ -0,0 +1,229 @@
+"""
+Tests pour le scoring vectorisé (src/scoring.py).
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from imblearn.over_sampling import SMOTE
+from imblearn.pipeline import Pipeline as ImbPipeline
+
+from src.data_processing import load_data, prepare_features, process_and_merge
+from src.scoring import (
+    CompiledModel, FeatureEncoder, content_hash, level_key, pack_features, top_k_indices, unpack_features,
+)
+
+
+ROOT = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def raw_df():
+    """Petit jeu de données brut avec champs numériques, binaires et catégoriels."""
+    rng = np.random.default_rng(0)
+    n = 60
+    return pd.DataFrame({
+        'id': range(n),
+        'age': rng.integers(18, 60, n),
+        'genre': rng.choice(['M', 'F'], n),
+        'heure_supplementaires': rng.choice(['Oui', 'Non'], n),
+        'poste': rng.choice(['Consultant', 'Manager', 'Tech Lead'], n),
+        'revenu_mensuel': rng.uniform(1500, 9000, n),
+        'a_quitte_l_entreprise': rng.choice(['Oui', 'Non'], n, p=[0.3, 0.7]),
+    })
+
+
+@pytest.fixture
+def pipeline_and_data(raw_df):
+    X, y = prepare_features(raw_df)
+    pipeline = ImbPipeline([
+        ('scaler', StandardScaler()),
+        ('smote', SMOTE(random_state=42, k_neighbors=3)),
+        ('classifier', LogisticRegression(max_iter=1000, random_state=42))
+    ])
+    pipeline.fit(X, y)
+    return pipeline, raw_df, X
+
+
+def test_encoder_resolves_fields_and_levels():
+    """Vérifie la correspondance nom de feature -> (champ, modalité)."""
+    encoder = FeatureEncoder.from_feature_names(
+        ['age', 'poste_Consultant', 'annees_dans_le_poste_actuel', 'inconnue'],
+        ['age', 'poste', 'annees_dans_le_poste_actuel']
+    )
+    assert encoder.numeric == {'age': 0, 'annees_dans_le_poste_actuel': 2}
+    assert encoder.categorical == {'poste': {'Consultant': 1}}
+    assert encoder.fields[3] == ''
+
+
+def test_encoder_matches_prepare_features(pipeline_and_data):
+    """Vérifie que l'encodage vectorisé reproduit celui de l'entraînement."""
+    pipeline, raw_df, X = pipeline_and_data
+    encoder = FeatureEncoder.from_feature_names(X.columns, raw_df.columns)
+    encoded = encoder.encode(raw_df.to_dict(orient='records'))
+    np.testing.assert_array_equal(encoded, X.to_numpy(dtype=float))
+
+
+def test_encoder_matches_prepare_features_on_training_data():
+    """Vérifie la parité d'encodage sur les vrais CSV, valeurs brutes ou converties comme l'API et la base."""
+    df = process_and_merge(*load_data(*(ROOT / 'data' / name for name in (
+        'extrait_sirh.csv', 'extrait_eval.csv', 'extrait_sondage.csv'
+    ))))
+    X, _ = prepare_features(df)
+    expected = X.to_numpy(dtype=float)
+    encoder = FeatureEncoder.from_feature_names(X.columns, df.columns)
+    assert encoder.categorical['augementation_salaire_precedente']['15'] >= 0
+
+    np.testing.assert_array_equal(encoder.encode(df.to_dict(orient='records')), expected)
+
+    # L'API et la table employees transmettent l'augmentation en entier ("15 %" -> 15)
+    as_int = df.assign(augementation_salaire_precedente=df['augementation_salaire_precedente']
+                       .str.rstrip(' %').astype(int))
+    np.testing.assert_array_equal(encoder.encode(as_int.to_dict(orient='records')), expected)
+    columns = {field: as_int[field].tolist() for field in encoder.input_fields}
+    np.testing.assert_array_equal(encoder.encode_columns(columns), expected)
+
+
+def test_level_key_normalizes_numeric_levels():
+    """Vérifie que « 15 % », "15", 15 et 15.0 désignent la même modalité."""
+    assert {level_key(v) for v in ('15 %', '15', 15, 15.0, ' 15% ')} == {'15'}
+    assert level_key('Consultant') == 'Consultant'
+
+
+def test_compiled_model_matches_pipeline(pipeline_and_data):
+    """Vérifie que le modèle compilé donne les mêmes probabilités que le pipeline."""
+    pipeline, raw_df, X = pipeline_and_data
+    model = CompiledModel.from_pipeline(pipeline, raw_df.columns)
+    encoded = model.encode(raw_df.to_dict(orient='records'))
+
+    np.testing.assert_allclose(model.predict_proba(encoded), pipeline.predict_proba(X)[:, 1])
+    np.testing.assert_array_equal(model.predict(encoded), pipeline.predict(X))
+
+
+def test_compiled_model_save_load_roundtrip(pipeline_and_data, tmp_path):
+    """Vérifie la sauvegarde et le rechargement de l'artefact .npz."""
+    pipeline, raw_df, _ = pipeline_and_data
+    model = CompiledModel.from_pipeline(pipeline, raw_df.columns)
+    path = tmp_path / 'model.npz'
+    model.save(path)
+
+    loaded = CompiledModel.load(path)
+    records = raw_df.to_dict(orient='records')
+    assert loaded.feature_names == model.feature_names
+    np.testing.assert_allclose(loaded.predict_proba(loaded.encode(records)),
+                               model.predict_proba(model.encode(records)))
+
+
+def test_from_pipeline_rejects_unsupported_model():
+    """Vérifie qu'un pipeline sans scaler est refusé."""
+    with pytest.raises(ValueError):
+        CompiledModel.from_pipeline(LogisticRegression(), [])
+
+
+def test_serving_path_does_not_import_pandas(pipeline_and_data, tmp_path):
+    """Vérifie qu'avec un artefact compilé, l'API n'importe ni pandas, ni imblearn, ni pyarrow, ni joblib."""
+    pipeline, raw_df, _ = pipeline_and_data
+    path = tmp_path / 'model.npz'
+    CompiledModel.from_pipeline(pipeline, raw_df.columns).save(path)
+
+    script = (
+        "import sys\n"
+        "from pathlib import Path\n"
+        "import src.api.main\n"
+        "from src.api import model_loader\n"
+        f"model_loader.COMPILED_MODEL_PATH = Path({str(path)!r})\n"
+        f"model_loader.REGISTRY_DIR = Path({str(tmp_path / 'registry')!r})\n"
+        "model_loader.warmup()\n"
+        "print(sorted(m for m in ('pandas', 'sklearn', 'imblearn', 'pyarrow', 'joblib') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == '[]'
+
+
+def test_contributions_sum_to_decision(pipeline_and_data):
+    """Vérifie que les contributions + intercept redonnent le logit."""
+    pipeline, raw_df, _ = pipeline_and_data
+    model = CompiledModel.from_pipeline(pipeline, raw_df.columns)
+    X = model.encode(raw_df.to_dict(orient='records'))
+    np.testing.assert_allclose(model.contributions(X).sum(axis=1) + model.intercept, model.decision_function(X))
+
+
+def test_explain_returns_sorted_top_k(pipeline_and_data):
+    """Vérifie le top-k trié par contribution absolue décroissante."""
+    pipeline, raw_df, _ = pipeline_and_data
+    model = CompiledModel.from_pipeline(pipeline, raw_df.columns)
+    X = model.encode(raw_df.to_dict(orient='records'))
+
+    probabilities, top, contributions = model.explain(X, top_k=2)
+    np.testing.assert_allclose(probabilities, model.predict_proba(X))
+    assert top.shape == (len(X), 2)
+
+    full = np.abs(model.contributions(X))
+    np.testing.assert_allclose(np.abs(contributions[:, 0]), full.max(axis=1))
+    assert np.all(np.abs(contributions[:, 0]) >= np.abs(contributions[:, 1]))
+
+
+def test_simulate_matches_materialized_variants(pipeline_and_data):
+    """Vérifie que la simulation par broadcasting égale le scoring de toutes les variantes."""
+    pipeline, raw_df, _ = pipeline_and_data
+    model = CompiledModel.from_pipeline(pipeline, raw_df.columns)
+    records = raw_df.head(4).to_dict(orient='records')
+    X = model.encode(records)
+    blocks = [
+        model.encoder.perturbation_block(X, 'revenu_mensuel', 'multiply', [0.9, 1.0, 1.1]),
+        model.encoder.perturbation_block(X, 'poste', 'set', ['Consultant', 'Manager']),
+        model.encoder.perturbation_block(X, 'heure_supplementaires', 'set', ['Non']),
+    ]
+
+    grid = model.simulate(X, blocks)
+    assert grid.shape == (4, 3, 2, 1)
+    variants = model.encoder.expand_variants(X, blocks)
+    np.testing.assert_allclose(grid.ravel(), model.predict_proba(variants))
+
+    # Vérification directe d'une variante : employé 2, revenu x1.1, Manager, sans heures sup.
+    expected = dict(records[2], revenu_mensuel=records[2]['revenu_mensuel'] * 1.1,
+                    poste='Manager', heure_supplementaires='Non')
+    np.testing.assert_allclose(grid[2, 2, 1, 0], model.predict_proba(model.encode([expected]))[0])
+
+
+def test_pack_unpack_features_roundtrip(pipeline_and_data):
+    """Vérifie le stockage compact float32 des vecteurs de features."""
+    _, _, X = pipeline_and_data
+    matrix = X.to_numpy(dtype=float)[:10]
+    packed = pack_features(matrix)
+    assert len(packed) == 10 and len(packed[0]) == 4 * matrix.shape[1]
+    np.testing.assert_allclose(unpack_features(packed, matrix.shape[1]), matrix, rtol=1e-6)
+
+
+def test_encoder_version_tracks_feature_space():
+    """Vérifie que la version de l'encodeur ne dépend que de l'espace de features."""
+    names = ['age', 'poste_Manager']
+    a = FeatureEncoder(names, ['age', 'poste'], ['', 'Manager'])
+    b = FeatureEncoder(names, ['age', 'poste'], ['', 'Manager'])
+    c = FeatureEncoder(names + ['genre'], ['age', 'poste', 'genre'], ['', 'Manager', ''])
+    assert a.version == b.version != c.version
+
+
+def test_content_hash_is_stable():
+    """Vérifie que l'empreinte ignore l'ordre des champs et le type des nombres."""
+    fields = ['age', 'revenu_mensuel', 'poste']
+    a = content_hash({'age': 30, 'revenu_mensuel': 3000, 'poste': 'Manager'}, fields)
+    b = content_hash({'poste': 'Manager', 'revenu_mensuel': 3000.0, 'age': np.int64(30)}, fields)
+    c = content_hash({'age': 31, 'revenu_mensuel': 3000, 'poste': 'Manager'}, fields)
+    assert a == b != c
+
+
+def test_top_k_indices_matches_full_sort():
+    """Vérifie la sélection partielle contre un tri complet."""
+    probabilities = np.random.default_rng(0).random(1000)
+    expected = np.argsort(-probabilities)
+    np.testing.assert_array_equal(top_k_indices(probabilities, 50), expected[:50])
+    np.testing.assert_array_equal(top_k_indices(probabilities, 5000), expected)
+    assert top_k_indices(probabilities, 0).size == 0